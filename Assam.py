@@ -7,18 +7,22 @@ try:
     DB_SUCCESS = True
 except ImportError:
     DB_SUCCESS = False
+import extractor_trace as trace
+from extractor_trace import traced, write_report
+from workspace import workspace_root
 from datetime import datetime
 
+@traced
 def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constraint=lambda x: True):
     if not jsonl_path or not os.path.exists(jsonl_path): return "NA"
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 heading_match = all(k.lower() in h for k in table_keywords)
                 if heading_match:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if all(k.lower() in row_txt for k in row_keywords):
                             for v in list(row.values())[::-1]:
@@ -28,11 +32,13 @@ def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constrai
                                     if clean:
                                         f_v = float(clean)
                                         if value_constraint(f_v):
+                                            trace.match(str(v).strip())
                                             return str(v).strip()
                                 except: pass
             except: pass
     return "NA"
 
+@traced
 def extract_discom_names(jsonl_path):
     discom_names = []
     try:
@@ -40,7 +46,7 @@ def extract_discom_names(jsonl_path):
             seen = set()
             for line in f:
                 try:
-                    data = json.loads(line)
+                    data = trace.table(json.loads(line))
                     # 1. Try to find in headers which often contain the DISCOM name
                     headers = data.get("headers", [])
                     for h in headers:
@@ -74,6 +80,7 @@ def extract_discom_names(jsonl_path):
     
     return discom_names
 
+@traced
 def extract_losses(jsonl_path):
     insts_loss = "NA"
     today = datetime.now()
@@ -91,10 +98,10 @@ def extract_losses(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 rows = data.get("rows", [])
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     # Check if row describes Transmission Loss
                     # e.g. {"Particulars": "AEGCL Transmission Loss (%)", "2025-26": "3.21%"}
                     row_txt = str(row).lower()
@@ -105,6 +112,7 @@ def extract_losses(jsonl_path):
                                 val = row[y_key]
                                 if val and "%" in str(val):
                                     insts_loss = val
+                                    trace.match(val)
                                     break
                         if insts_loss != "NA": break
                 
@@ -113,18 +121,19 @@ def extract_losses(jsonl_path):
     print(f"Extracted InSTS Loss: {insts_loss}")
     return insts_loss
 
+@traced
 def extract_wheeling_losses(jsonl_path):
     losses = {'11': "NA", '33': "NA", '66': "NA", '132': "NA"}
     
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if "wheeling losses" in heading or "distribution loss" in heading or "distribution losses" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         
                         # Look for potential values in the row
@@ -141,30 +150,34 @@ def extract_wheeling_losses(jsonl_path):
                         if val:
                             if "33" in row_txt and "level" in row_txt:
                                 losses['33'] = val
+                                trace.match(val)
                             elif "total" in row_txt and "loss" in row_txt:
-                                if losses['11'] == "NA": losses['11'] = val
+                                if losses['11'] == "NA": losses['11'] = val; trace.match(val)
                             elif "11" in row_txt and "level" in row_txt:
                                 losses['11'] = val
+                                trace.match(val)
             except: pass
     
     print(f"Extracted Wheeling Losses: {losses}")
     return losses
 
+@traced
 def extract_transmission_charges(jsonl_path):
     # Search for PGCIL or Transmission Charges in Assam
     return find_value_in_jsonl(jsonl_path, ["transmission", "charge"], ["rs/kwh"], lambda x: 0.1 <= x <= 2.0)
 
+@traced
 def extract_wheeling_charges(jsonl_path):
     charges = {'11': "NA", '33': "NA", '66': "NA", '132': "NA"}
     
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 if "wheeling charge" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if "33 kv" in row_txt or "11 kv" in row_txt or "voltage level" in row_txt:
                             val = None
@@ -180,16 +193,18 @@ def extract_wheeling_charges(jsonl_path):
                                     except: pass
                             
                             if val:
-                                if "33" in row_txt: charges['33'] = val
-                                if "11" in row_txt: charges['11'] = val
+                                if "33" in row_txt: charges['33'] = val; trace.match(val)
+                                if "11" in row_txt: charges['11'] = val; trace.match(val)
                                 if "33" in row_txt and "11" in row_txt:
                                     charges['33'] = val
+                                    trace.match(val)
                                     charges['11'] = val
+                                    trace.match(val)
                 
                 # Fallback to row search if heading check misses
                 if charges['11'] == "NA":
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if "wheeling charge" in row_txt:
                             val = None
@@ -202,25 +217,26 @@ def extract_wheeling_charges(jsonl_path):
                                         if 0.01 < f_v < 1.0: val = str(f_v)
                                     except: pass
                             if val:
-                                if "33" in row_txt: charges['33'] = val
-                                if "11" in row_txt: charges['11'] = val
+                                if "33" in row_txt: charges['33'] = val; trace.match(val)
+                                if "11" in row_txt: charges['11'] = val; trace.match(val)
             except: pass
     
     print(f"Extracted Wheeling Charges: {charges}")
     return charges
 
+@traced
 def extract_cross_subsidy_surcharge(jsonl_path):
     css_charges = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
     
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if "css" in heading or "cross subsidy surcharge" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if "industries" in row_txt:
                             val = None
@@ -249,11 +265,16 @@ def extract_cross_subsidy_surcharge(jsonl_path):
                             if val:
                                 if "50" in row_txt or "industries-i" in row_txt or "industries-1" in row_txt:
                                     css_charges['11'] = val
+                                    trace.match(val)
                                     css_charges['33'] = val
+                                    trace.match(val)
                                 if "150" in row_txt or "industries-ii" in row_txt:
                                     css_charges['66'] = val
+                                    trace.match(val)
                                     css_charges['132'] = val
+                                    trace.match(val)
                                     css_charges['220'] = val
+                                    trace.match(val)
             except: pass
             
     # Propagation
@@ -264,6 +285,7 @@ def extract_cross_subsidy_surcharge(jsonl_path):
     print(f"Extracted CSS: {css_charges}")
     return css_charges
 
+@traced
 def extract_additional_surcharge(jsonl_path):
     as_val = "NA"
     keywords = ["additional surcharge", "as charges"]
@@ -271,13 +293,13 @@ def extract_additional_surcharge(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 is_as_context = any(k in heading for k in keywords)
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     
                     if is_as_context or any(k in row_txt for k in keywords):
@@ -302,10 +324,12 @@ def extract_additional_surcharge(jsonl_path):
                                     # AS is usually small e.g. 0.1 to 3.0
                                     if 0.0 < f < 5.0:
                                         vals.append(f)
+                                        trace.match(f, note="candidate")
                             except: pass
                         
                         if vals and valid_unit:
                             as_val = str(max(vals))
+                            trace.match(as_val)
                             break
                 if as_val != "NA": break
             except: pass
@@ -313,6 +337,7 @@ def extract_additional_surcharge(jsonl_path):
     print(f"Extracted AS: {as_val}")
     return as_val
 
+@traced
 def extract_tariff_charges(jsonl_path):
     fixed_charges = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
     energy_charges = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
@@ -320,9 +345,9 @@ def extract_tariff_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 rows = data.get("rows", [])
-                for row in rows:
+                for row in trace.rows(rows):
                     cat_orig = str(row.get("Category", row.get("Consumer Category", "")))
                     cat = cat_orig.lower().replace('\n', ' ')
                     
@@ -350,8 +375,8 @@ def extract_tariff_charges(jsonl_path):
                                 ev = float(clean)
                                 if 5.0 < ev < 12.0: ec_v = clean
                         
-                        if fc_v: fixed_charges['11'] = fc_v
-                        if ec_v: energy_charges['11'] = ec_v
+                        if fc_v: fixed_charges['11'] = fc_v; trace.match(fc_v)
+                        if ec_v: energy_charges['11'] = ec_v; trace.match(ec_v)
                             
                     # HT-2: Typically 33kV and above
                     elif "industries-ii" in cat or ("industries" in cat and "above 150" in cat):
@@ -379,15 +404,16 @@ def extract_tariff_charges(jsonl_path):
                                 if 5.0 < ev < 12.0: ec_v = clean
                                     
                         if fc_v:
-                            for k in ['33', '66', '132', '220']: fixed_charges[k] = fc_v
+                            for k in ['33', '66', '132', '220']: fixed_charges[k] = fc_v; trace.match(fc_v)
                         if ec_v:
-                            for k in ['33', '66', '132', '220']: energy_charges[k] = ec_v
+                            for k in ['33', '66', '132', '220']: energy_charges[k] = ec_v; trace.match(ec_v)
             except: pass
             
     print(f"Extracted Fixed: {fixed_charges}")
     print(f"Extracted Energy: {energy_charges}")
     return fixed_charges, energy_charges
 
+@traced
 def extract_fuel_surcharge(jsonl_path):
     fpppa = "NA"
     keywords = ["Fuel Adjustment Cost", "Fuel", "FPPPA", "Fuel Surcharge", "FPPCA", "ECA", "FPPAS"]
@@ -395,12 +421,12 @@ def extract_fuel_surcharge(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 rows = data.get("rows", [])
                 
                 # Check headings too? usually row based
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     # Check for keywords
                     if any(k.lower() in row_txt for k in keywords):
@@ -421,11 +447,13 @@ def extract_fuel_surcharge(jsonl_path):
                                          # Stricter: 0.01 to 2.5
                                          if 0.01 < f < 2.5:
                                              vals.append(f)
+                                             trace.match(f, note="candidate")
                                  except: pass
                         
                         if vals:
                             # If we found valid small numbers in non-structural columns
                              fpppa = str(max(vals))
+                             trace.match(fpppa)
                              break
                     if fpppa != "NA": break
                 if fpppa != "NA": break
@@ -434,6 +462,7 @@ def extract_fuel_surcharge(jsonl_path):
     print(f"Extracted Fuel Surcharge: {fpppa}")
     return fpppa
 
+@traced
 def extract_pf_rebate(jsonl_path):
     pf_val = "NA"
     keywords = ["power factor", "powerfactor", "pf adjustment", "pf incentive", "power factor adjustment"]
@@ -441,14 +470,14 @@ def extract_pf_rebate(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 # Check context
                 is_pf_context = any(k in heading for k in keywords)
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     
                     # Context in row
@@ -477,10 +506,12 @@ def extract_pf_rebate(jsonl_path):
                                         # PF rebate is usually small, e.g. 0.05 to 1.0
                                         if 0.0 < f < 2.0:
                                             vals.append(f)
+                                            trace.match(f, note="candidate")
                                 except: pass
                             
                             if vals and valid_unit:
                                 pf_val = str(max(vals))
+                                trace.match(pf_val)
                                 break
                 if pf_val != "NA": break
             except: pass
@@ -488,6 +519,7 @@ def extract_pf_rebate(jsonl_path):
     print(f"Extracted PF Rebate: {pf_val}")
     return pf_val
 
+@traced
 def extract_load_factor_incentive(jsonl_path):
     lf_val = "NA"
     keywords = ["load factor", "load factor incentive", "load factor discount"]
@@ -495,14 +527,14 @@ def extract_load_factor_incentive(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 # Check context
                 is_lf_context = any(k in heading for k in keywords)
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     
                     # Context in row
@@ -529,10 +561,12 @@ def extract_load_factor_incentive(jsonl_path):
                                     # LF incentive is usually small, e.g. 0.05 to 1.0. 
                                     if 0.0 < f < 2.0:
                                         vals.append(f)
+                                        trace.match(f, note="candidate")
                             except: pass
                         
                         if vals and valid_unit:
                             lf_val = str(max(vals))
+                            trace.match(lf_val)
                             break
                 if lf_val != "NA": break
             except: pass
@@ -540,6 +574,7 @@ def extract_load_factor_incentive(jsonl_path):
     print(f"Extracted Load Factor Incentive: {lf_val}")
     return lf_val
 
+@traced
 def extract_grid_support_charges(jsonl_path):
     gs_val = "NA"
     keywords = ["grid support", "parallel operation", "grid support charges", "parallel operation charges"]
@@ -547,13 +582,13 @@ def extract_grid_support_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 is_gs_context = any(k in heading for k in keywords)
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     
                     if is_gs_context or any(k in row_txt for k in keywords):
@@ -578,10 +613,12 @@ def extract_grid_support_charges(jsonl_path):
                                     # Charges usually > 0
                                     if 0.0 < f < 10.0:
                                         vals.append(f)
+                                        trace.match(f, note="candidate")
                             except: pass
                         
                         if vals and valid_unit:
                             gs_val = str(max(vals))
+                            trace.match(gs_val)
                             break
                             
                 if gs_val != "NA": break
@@ -590,6 +627,7 @@ def extract_grid_support_charges(jsonl_path):
     print(f"Extracted Grid Support Charges: {gs_val}")
     return gs_val
 
+@traced
 def extract_voltage_rebates(jsonl_path):
     ht_rebate = "NA"
     ehv_rebate = "NA"
@@ -601,14 +639,14 @@ def extract_voltage_rebates(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 heading_ht = any(k in heading for k in ht_keywords)
                 heading_ehv = any(k in heading for k in ehv_keywords)
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     
                     # HT Rebate
@@ -630,10 +668,12 @@ def extract_voltage_rebates(jsonl_path):
                                          # Rebate usually 0.10 to 1.0 (some states have percentage, but we strictly need INR/kWh)
                                          if 0.0 < f < 2.0:
                                              vals.append(f)
+                                             trace.match(f, note="candidate")
                                  except: pass
                              
                              if vals and valid_unit:
                                  ht_rebate = str(max(vals))
+                                 trace.match(ht_rebate)
                     
                     # EHV Rebate
                     if heading_ehv or any(k in row_txt for k in ehv_keywords):
@@ -653,10 +693,12 @@ def extract_voltage_rebates(jsonl_path):
                                          f = float(clean)
                                          if 0.0 < f < 2.0:
                                              vals.append(f)
+                                             trace.match(f, note="candidate")
                                  except: pass
                              
                              if vals and valid_unit:
                                  ehv_rebate = str(max(vals))
+                                 trace.match(ehv_rebate)
 
             except: pass
     
@@ -664,6 +706,7 @@ def extract_voltage_rebates(jsonl_path):
     print(f"Extracted EHV Rebate: {ehv_rebate}")
     return ht_rebate, ehv_rebate
 
+@traced
 def extract_bulk_consumption_rebate(jsonl_path):
     bk_val = "NA"
     keywords = ["bulk consumption rebate", "bulk consumption discount"]
@@ -671,13 +714,13 @@ def extract_bulk_consumption_rebate(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 heading_match = any(k in heading for k in keywords)
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     
                     if heading_match or any(k in row_txt for k in keywords):
@@ -699,10 +742,12 @@ def extract_bulk_consumption_rebate(jsonl_path):
                                      f = float(clean)
                                      if 0.0 < f < 2.0:
                                          vals.append(f)
+                                         trace.match(f, note="candidate")
                              except: pass
                          
                          if vals and valid_unit:
                              bk_val = str(max(vals))
+                             trace.match(bk_val)
                              break
                 if bk_val != "NA": break
             except: pass
@@ -710,12 +755,13 @@ def extract_bulk_consumption_rebate(jsonl_path):
     print(f"Extracted Bulk Consumption Rebate: {bk_val}")
     return bk_val
 
+@traced
 def extract_tod_charges(jsonl_path):
     tod = "NA"
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
@@ -723,7 +769,7 @@ def extract_tod_charges(jsonl_path):
                 is_tod_table = "time of day" in heading or "tod" in heading
                 is_comparison = "comparison" in heading
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     
                     if is_tod_table or "tod" in row_txt or "time of day" in row_txt:
@@ -756,6 +802,7 @@ def extract_tod_charges(jsonl_path):
                                         f = float(clean)
                                         if 0.0 < f < 10.0:
                                              vals.append(f)
+                                             trace.match(f, note="candidate")
                                 except: pass
                             
                             # Else if we just have a unit context in the row, we look at other columns
@@ -767,6 +814,7 @@ def extract_tod_charges(jsonl_path):
                                         # Strict range for TOD
                                         if 0.0 < f < 10.0:
                                              vals.append(f)
+                                             trace.match(f, note="candidate")
                                 except: pass
                         
                         # Decision logic
@@ -778,6 +826,7 @@ def extract_tod_charges(jsonl_path):
                                 continue # Skip this row/table, likely finding NA is correct
                             
                             tod = str(max(vals))
+                            trace.match(tod)
                             break
                         
                 if tod != "NA": break
@@ -786,6 +835,7 @@ def extract_tod_charges(jsonl_path):
     print(f"Extracted TOD Charges: {tod}")
     return tod
 
+@traced
 def extract_ists_loss(json_path):
     try:
         if os.path.exists(json_path):
@@ -931,53 +981,56 @@ def update_excel(discom_names, ists_loss, insts_loss, wheel_losses, insts_c, whe
     print(f"Updated {excel_path}")
 
 if __name__ == "__main__":
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        base_dir = workspace_root()
     
-    # Dynamic JSONL search
-    extracted_root = os.path.join(base_dir, "Extraction")
-    jsonl_file = None
-    if os.path.exists(extracted_root):
-        for dirname in os.listdir(extracted_root):
-            if "assam" in dirname.lower():
-                state_dir = os.path.join(extracted_root, dirname)
-                for f in os.listdir(state_dir):
-                    if f.endswith(".jsonl"):
-                        jsonl_file = os.path.join(state_dir, f)
-                        break
-            if jsonl_file: break
+        # Dynamic JSONL search
+        extracted_root = os.path.join(base_dir, "Extraction")
+        jsonl_file = None
+        if os.path.exists(extracted_root):
+            for dirname in os.listdir(extracted_root):
+                if "assam" in dirname.lower():
+                    state_dir = os.path.join(extracted_root, dirname)
+                    for f in os.listdir(state_dir):
+                        if f.endswith(".jsonl"):
+                            jsonl_file = os.path.join(state_dir, f)
+                            break
+                if jsonl_file: break
     
-    # Fallback to direct path or specific file if dynamic search fails
-    if not jsonl_file:
-         j_f_direct = os.path.join(base_dir, 'Extraction', '1743056310.jsonl')
-         if os.path.exists(j_f_direct):
-             jsonl_file = j_f_direct
-
-    excel_file = os.path.join(base_dir, 'Assam.xlsx')
-    ists_path = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
+        # Fallback to direct path or specific file if dynamic search fails
+        if not jsonl_file:
+             j_f_direct = os.path.join(base_dir, 'Extraction', '1743056310.jsonl')
+             if os.path.exists(j_f_direct):
+                 jsonl_file = j_f_direct
+
+        excel_file = os.path.join(base_dir, 'Assam.xlsx')
+        ists_path = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
     
-    if jsonl_file and os.path.exists(jsonl_file):
-        print(f"Target JSONL: {jsonl_file}")
+        if jsonl_file and os.path.exists(jsonl_file):
+            print(f"Target JSONL: {jsonl_file}")
         
-        names = extract_discom_names(jsonl_file)
-        print(f"Discoms found: {len(names)} -> {names}")
+            names = extract_discom_names(jsonl_file)
+            print(f"Discoms found: {len(names)} -> {names}")
         
-        ists = extract_ists_loss(ists_path)
-        insts_l = extract_losses(jsonl_file)
-        w_l = extract_wheeling_losses(jsonl_file)
-        insts_c = extract_transmission_charges(jsonl_file)
-        w_c = extract_wheeling_charges(jsonl_file)
-        css = extract_cross_subsidy_surcharge(jsonl_file)
-        as_v = extract_additional_surcharge(jsonl_file)
-        fc, ec = extract_tariff_charges(jsonl_file)
-        fuel_s = extract_fuel_surcharge(jsonl_file)
+            ists = extract_ists_loss(ists_path)
+            insts_l = extract_losses(jsonl_file)
+            w_l = extract_wheeling_losses(jsonl_file)
+            insts_c = extract_transmission_charges(jsonl_file)
+            w_c = extract_wheeling_charges(jsonl_file)
+            css = extract_cross_subsidy_surcharge(jsonl_file)
+            as_v = extract_additional_surcharge(jsonl_file)
+            fc, ec = extract_tariff_charges(jsonl_file)
+            fuel_s = extract_fuel_surcharge(jsonl_file)
         
-        tod = extract_tod_charges(jsonl_file)
-        pf_r = extract_pf_rebate(jsonl_file)
-        lf_i = extract_load_factor_incentive(jsonl_file)
-        gs_c = extract_grid_support_charges(jsonl_file)
-        ht_r, ehv_r = extract_voltage_rebates(jsonl_file)
-        bk_r = extract_bulk_consumption_rebate(jsonl_file)
+            tod = extract_tod_charges(jsonl_file)
+            pf_r = extract_pf_rebate(jsonl_file)
+            lf_i = extract_load_factor_incentive(jsonl_file)
+            gs_c = extract_grid_support_charges(jsonl_file)
+            ht_r, ehv_r = extract_voltage_rebates(jsonl_file)
+            bk_r = extract_bulk_consumption_rebate(jsonl_file)
         
-        update_excel(names, ists, insts_l, w_l, insts_c, w_c, css, as_v, fc, ec, fuel_s, tod, pf_r, lf_i, gs_c, ht_r, ehv_r, bk_r, excel_file)
-    else:
-        print("Required files not found. Please check paths.")
+            update_excel(names, ists, insts_l, w_l, insts_c, w_c, css, as_v, fc, ec, fuel_s, tod, pf_r, lf_i, gs_c, ht_r, ehv_r, bk_r, excel_file)
+        else:
+            print("Required files not found. Please check paths.")
+    finally:
+        write_report("Assam")
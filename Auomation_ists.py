@@ -9,6 +9,9 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from urllib.parse import unquote
+from chromedriver_cache import chrome_service
+from metrics import record_download
+from workspace import workspace_root
 
 def parse_date_from_text(text):
     """
@@ -128,6 +131,7 @@ def download_latest_pdf(driver, target_url, download_dir, exclude_keyword=None):
         
         # Download
         requests.packages.urllib3.disable_warnings()
+        started = time.monotonic()
         resp = requests.get(selected['url'], stream=True, verify=False)
         if resp.status_code == 200:
             clean_name = unquote(selected['filename']).split("?")[0]
@@ -139,8 +143,10 @@ def download_latest_pdf(driver, target_url, download_dir, exclude_keyword=None):
                 for chunk in resp.iter_content(chunk_size=8192):
                     f.write(chunk)
             print(f"Successfully downloaded to: {out_path}")
+            record_download(selected['url'], time.monotonic() - started, os.path.getsize(out_path))
         else:
             print(f"Failed to download. Status: {resp.status_code}")
+            record_download(selected['url'], time.monotonic() - started, outcome="failed")
 
     except Exception as e:
         print(f"Error during processing {target_url}: {e}")
@@ -152,20 +158,20 @@ def main():
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--log-level=3")
 
-    driver = webdriver.Chrome(options=chrome_options)
+    driver = webdriver.Chrome(service=chrome_service(), options=chrome_options)
     try:
         # 1. Download Transmission Losses -> ists_pdf
         download_latest_pdf(
             driver, 
             "https://grid-india.in/en/markets/transmission-losses", 
-            r"c:\Users\hi\OneDrive\Desktop\demo\ists_pdf"
+            os.path.join(workspace_root(), "ists_pdf")
         )
         
         # 2. Download Transmission Charges -> ists_charge_pdf
         download_latest_pdf(
             driver, 
             "https://grid-india.in/en/markets/notification-of-transmission-charges-for-the-dics", 
-            r"c:\Users\hi\OneDrive\Desktop\demo\ists_charge_pdf",
+            os.path.join(workspace_root(), "ists_charge_pdf"),
             exclude_keyword="corrigendum"
         )
 
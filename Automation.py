@@ -4,16 +4,23 @@ import requests
 import urllib3
 import glob
 import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import WebDriverException
 from dotenv import load_dotenv
+from chromedriver_cache import chrome_service
+from http_listing import HTTP_DISCOVERY, fetch_listing, parse_listing, session
+import metrics
+from metrics import record_download
+from workspace import workspace_root
 
 load_dotenv()
 
@@ -22,7 +29,11 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # ---------- CONFIGURATION ----------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DOWNLOADS_ROOT = os.path.join(BASE_DIR, "Download")
+DOWNLOADS_ROOT = os.path.join(workspace_root(), "Download")
+# One warm Chrome session serves every state of a run; set to False for a fresh browser per state
+REUSE_DRIVER = os.getenv("AUTOMATION_REUSE_DRIVER", "True").lower() == "true"
+# States downloaded at the same time; most of a state's time is spent waiting on its regulator's site
+MAX_PARALLEL_STATES = int(os.getenv("AUTOMATION_MAX_PARALLEL", 3))
 
 
 def get_state_download_path(state_name):
@@ -69,7 +80,7 @@ def setup_driver(view_browser=True, download_path=None):
         
     options.add_experimental_option("prefs", prefs)
     
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=chrome_service(), options=options)
     
     # Enable download behavior in headless mode
     if not view_browser and download_path:
@@ -80,6 +91,154 @@ def setup_driver(view_browser=True, download_path=None):
         
     return driver
 
+def reset_session(driver, download_path=None):
+    """
+    Makes a used session look like a fresh one for the next state: extra tabs
+    closed, cookies and cache cleared, downloads pointed at download_path.
+    Raises WebDriverException when the browser is gone.
+    """
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.get("about:blank")
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    if download_path:
+        # Browser-wide, so tabs opened later by the state (Rajasthan) download there too
+        driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+            "behavior": "allow",
+            "downloadPath": download_path
+        })
+
+class DriverPool:
+    """
+    Hands warm Chrome sessions to the process_<state> functions: release() keeps
+    the session, acquire() resets it for the next state. With states downloading
+    concurrently (run_states) each running state holds its own session.
+    A session is replaced only when it no longer answers (crash).
+    Keeps the start-up and reset times so the run can report what reuse saved.
+    """
+
+    def __init__(self, reuse=REUSE_DRIVER):
+        self.reuse = reuse
+        self._idle = {}  # view_browser -> [driver]
+        self._keys = {}  # id(driver) -> view_browser
+        self._lock = threading.Lock()
+        self.started = 0
+        self.start_seconds = 0.0
+        self.reused = 0
+        self.reset_seconds = 0.0
+
+    def acquire(self, view_browser=True, download_path=None):
+        with self._lock:
+            idle = self._idle.get(view_browser)
+            driver = idle.pop() if idle else None
+        if driver is not None:
+            started = time.monotonic()
+            try:
+                reset_session(driver, download_path)
+                with self._lock:
+                    self.reused += 1
+                    self.reset_seconds += time.monotonic() - started
+                metrics.BROWSER_SESSIONS.inc(reused="true")
+                return driver
+            except WebDriverException as e:
+                print(f"Browser session lost ({e.__class__.__name__}), starting a new one...")
+                self._quit(driver)
+        started = time.monotonic()
+        driver = setup_driver(view_browser=view_browser, download_path=download_path)
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.started += 1
+            self.start_seconds += elapsed
+            self._keys[id(driver)] = view_browser
+        metrics.BROWSER_START_SECONDS.observe(elapsed)
+        metrics.BROWSER_SESSIONS.inc(reused="false")
+        return driver
+
+    def release(self, driver):
+        with self._lock:
+            key = self._keys.get(id(driver))
+            keep = self.reuse and key is not None
+            if keep:
+                self._idle.setdefault(key, []).append(driver)
+        if not keep:
+            self._quit(driver)
+
+    def _quit(self, driver):
+        with self._lock:
+            self._keys.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            drivers = [d for idle in self._idle.values() for d in idle]
+            self._idle.clear()
+        for driver in drivers:
+            self._quit(driver)
+
+    def report(self):
+        """One line: browsers started, sessions reused and the start-up time that saved"""
+        if not self.started:
+            return "No browser sessions started"
+        per_start = self.start_seconds / self.started
+        saved = self.reused * per_start - self.reset_seconds
+        return (f"Browser sessions: {self.started} started ({per_start:.2f}s each), {self.reused} reused "
+                f"({self.reset_seconds:.2f}s resetting) - about {saved:.1f}s of start-up saved")
+
+DRIVERS = DriverPool()
+
+def benchmark_drivers(states=10, view_browser=False):
+    """A fresh Chrome per state vs. DriverPool reuse, for the same number of states (headless by default)"""
+    with tempfile.TemporaryDirectory() as folder:
+        paths = [os.path.join(folder, str(i)) for i in range(states)]
+        for path in paths:
+            os.makedirs(path)
+        pools = {}
+        timings = {}
+        for reuse in (False, True):
+            pool = pools[reuse] = DriverPool(reuse=reuse)
+            start = time.perf_counter()
+            for path in paths:
+                driver = pool.acquire(view_browser=view_browser, download_path=path)
+                driver.get("about:blank")
+                pool.release(driver)
+            pool.close()
+            timings[reuse] = time.perf_counter() - start
+    print(f"Fresh browser per state: {timings[False]:7.2f} s for {states} states ({pools[False].report()})")
+    print(f"Reused browser session : {timings[True]:7.2f} s for {states} states ({pools[True].report()})")
+    print(f"Saved per state: {(timings[False] - timings[True]) / states:.2f} s")
+
+def page_listing(driver):
+    """The page the browser is showing, parsed like an HTTP-fetched one so both paths share the select_* rules"""
+    return parse_listing(driver.page_source, driver.current_url)
+
+def discover_over_http(state_name, find):
+    """
+    Looks for a state's order without a browser: find() reads the listing
+    page(s) with fetch_listing and returns the target, or None. None from here
+    means the caller starts Chrome (pages that need JavaScript or postbacks).
+    """
+    if not HTTP_DISCOVERY:
+        return None
+    started = time.monotonic()
+    try:
+        target = find()
+    except Exception as e:
+        print(f"[{state_name}] HTTP discovery error: {e}")
+        target = None
+    if target:
+        print(f"[{state_name}] Listing read over HTTP in {time.monotonic() - started:.1f}s, no browser needed")
+    else:
+        print(f"[{state_name}] Listing not readable over HTTP, using Chrome...")
+    metrics.LISTING_DISCOVERY.inc(state=state_name, method="http" if target else "selenium")
+    return target
+
 def is_pdf(url):
     """Check if the URL likely points to a PDF by inspecting headers without downloading the body"""
     try:
@@ -109,84 +268,110 @@ def download_file(url, folder, filename=None):
     filepath = os.path.join(folder, filename)
     print(f"Downloading {filename} via requests...")
     
+    started = time.monotonic()
     try:
-        response = requests.get(url, stream=True, verify=False, timeout=60)
+        response = session().get(url, stream=True, timeout=60)
         if response.status_code == 200:
             content_type = response.headers.get('Content-Type', '').lower()
             if 'application/pdf' not in content_type and not filename.lower().endswith(".pdf"):
                 print(f"Aborting: Content-Type is {content_type}, not a PDF.")
+                record_download(url, time.monotonic() - started, outcome="failed")
                 return False
                 
+            size = 0
             with open(filepath, 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     f.write(chunk)
+                    size += len(chunk)
             print(f"File saved to {filepath}")
+            record_download(url, time.monotonic() - started, size)
             return True
         else:
             print(f"Failed to download. Status code: {response.status_code}")
+            record_download(url, time.monotonic() - started, outcome="failed")
             return False
     except Exception as e:
         print(f"Download error: {e}")
+        record_download(url, time.monotonic() - started, outcome="error")
         return False
 
+AERC_ORDERS_URL = "https://aerc.gov.in/pages/sub/orders"
+
+def assam_years(listing):
+    """[(year, link)] of the AERC year filter links, newest first"""
+    years = [(int(link["text"]), link) for link in listing.links
+             if "year=" in (link["href"] or "") and link["text"].isdigit()]
+    return sorted(years, key=lambda y: y[0], reverse=True)
+
+def select_assam(listing):
+    """Newest APDCL tariff order row of an AERC year page"""
+    matches = []
+    for row in listing.rows if listing else []:
+        row_text = row["text"].upper()
+        if "TARIFF ORDER" in row_text and "APDCL" in row_text:
+            cols = row["cells"]
+            if len(cols) >= 3:
+                date_info = cols[0]["text"]
+                date_str = date_info.split('&')[0].strip() if '&' in date_info else date_info
+                try:
+                    order_date = datetime.strptime(date_str, "%d.%m.%Y")
+                except:
+                    order_date = datetime.min
+                if cols[2]["links"] and cols[2]["links"][0]["url"]:
+                    matches.append({"date": order_date, "url": cols[2]["links"][0]["url"], "date_str": date_info})
+    if not matches:
+        return None
+    matches.sort(key=lambda x: x['date'], reverse=True)
+    return matches[0]
+
+def find_assam_over_http():
+    listing = fetch_listing(AERC_ORDERS_URL)
+    years = assam_years(listing) if listing else []
+    if not years or not years[0][1]["url"]:
+        return None
+    print(f"[Assam] Selecting latest available year: {years[0][0]}")
+    return select_assam(fetch_listing(years[0][1]["url"]))
+
 def process_assam(view_browser=True):
     state_name = "Assam"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
-    wait = WebDriverWait(driver, 15)
+    target = discover_over_http(state_name, find_assam_over_http)
+    driver = None
     
     success = False
     try:
-        print(f"[{state_name}] Navigating to Orders page...")
-        driver.get("https://aerc.gov.in/pages/sub/orders")
-        
-        print(f"[{state_name}] Detecting available years...")
-        year_links = wait.until(EC.presence_of_all_elements_located((By.XPATH, "//a[contains(@href, 'year=')]")))
-        
-        available_years = []
-        for link in year_links:
-            year_text = link.text.strip()
-            if year_text.isdigit():
-                available_years.append((int(year_text), link))
-        
-        if not available_years:
-            print(f"[{state_name}] No year links found.")
-            return False
+        if target is None:
+            driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
+            wait = WebDriverWait(driver, 15)
+            print(f"[{state_name}] Navigating to Orders page...")
+            driver.get(AERC_ORDERS_URL)
+            
+            print(f"[{state_name}] Detecting available years...")
+            year_links = wait.until(EC.presence_of_all_elements_located((By.XPATH, "//a[contains(@href, 'year=')]")))
+            
+            available_years = []
+            for link in year_links:
+                year_text = link.text.strip()
+                if year_text.isdigit():
+                    available_years.append((int(year_text), link))
+            
+            if not available_years:
+                print(f"[{state_name}] No year links found.")
+                return False
 
-        available_years.sort(key=lambda x: x[0], reverse=True)
-        latest_year, latest_link = available_years[0]
-        
-        print(f"[{state_name}] Selecting latest available year: {latest_year}")
-        driver.execute_script("arguments[0].click();", latest_link)
-        
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "table")))
-        
-        rows = driver.find_elements(By.XPATH, "//tr[td]")
-        matches = []
-        for row in rows:
-            row_text = row.text.upper()
-            if "TARIFF ORDER" in row_text and "APDCL" in row_text:
-                cols = row.find_elements(By.TAG_NAME, "td")
-                if len(cols) >= 3:
-                    date_info = cols[0].text.strip()
-                    date_str = date_info.split('&')[0].strip() if '&' in date_info else date_info
-                    try:
-                        order_date = datetime.strptime(date_str, "%d.%m.%Y")
-                    except:
-                        order_date = datetime.min
-                    try:
-                        pdf_link_element = cols[2].find_element(By.TAG_NAME, "a")
-                        pdf_url = pdf_link_element.get_attribute("href")
-                        matches.append({"date": order_date, "url": pdf_url, "date_str": date_info})
-                    except:
-                        continue
+            available_years.sort(key=lambda x: x[0], reverse=True)
+            latest_year, latest_link = available_years[0]
+            
+            print(f"[{state_name}] Selecting latest available year: {latest_year}")
+            driver.execute_script("arguments[0].click();", latest_link)
+            
+            wait.until(EC.presence_of_element_located((By.TAG_NAME, "table")))
+            target = select_assam(page_listing(driver))
 
-        if not matches:
+        if not target:
             print(f"[{state_name}] No matching PDF found.")
             return False
 
-        matches.sort(key=lambda x: x['date'], reverse=True)
-        target = matches[0]
         print(f"[{state_name}] Found latest order: {target['url']}")
         success = download_file(target['url'], download_path)
         
@@ -194,51 +379,62 @@ def process_assam(view_browser=True):
         print(f"[{state_name}] Error: {e}")
         success = False
     finally:
-        driver.quit()
+        if driver is not None:
+            DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
+UPERC_ORDERS_URL = "https://www.uperc.org/Tariff_Order_Users.aspx"
+
+def select_up(listing):
+    """First state DISCOMs tariff order PDF among the UPERC order links"""
+    for link in listing.links if listing else []:
+        text = link["text"].upper()
+        url = link["url"]
+        if "aaa" in link["class"].split() and "STATE DISCOMS" in text and "TARIFF ORDER" in text and "SCANNED" not in text:
+            if url and ".pdf" in url.lower():
+                return {"text": link["text"], "url": url}
+    return None
+
+def find_up_over_http():
+    listing = fetch_listing(UPERC_ORDERS_URL)
+    target = select_up(listing)
+    if target is None and listing:
+        # "Previous Years" is only followed here when it is a plain link, not an ASP.NET postback
+        previous = next((l for l in listing.links if l["text"] == "Previous Years" and l["url"]), None)
+        if previous:
+            print("[Uttar Pradesh] Trying previous years...")
+            target = select_up(fetch_listing(previous["url"]))
+    return target
+
 def process_up(view_browser=True):
     state_name = "Uttar Pradesh"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
-    wait = WebDriverWait(driver, 20)
+    target = discover_over_http(state_name, find_up_over_http)
+    driver = None
     
     success = False
     try:
-        print(f"[{state_name}] Navigating to UPERC Tariff Orders...")
-        driver.get("https://www.uperc.org/Tariff_Order_Users.aspx")
-        time.sleep(2)
-        
-        links = driver.find_elements(By.XPATH, "//a[@class='aaa']")
-        matches = []
-        for link in links:
-            text = link.text.upper()
-            url = link.get_attribute("href")
-            if "STATE DISCOMS" in text and "TARIFF ORDER" in text and "SCANNED" not in text:
-                if url and ".pdf" in url.lower():
-                    matches.append({"text": link.text, "url": url})
+        if target is None:
+            driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
+            print(f"[{state_name}] Navigating to UPERC Tariff Orders...")
+            driver.get(UPERC_ORDERS_URL)
+            time.sleep(2)
+            target = select_up(page_listing(driver))
         
-        if not matches:
-            print(f"[{state_name}] Trying previous years...")
-            try:
-                prev_years_link = driver.find_element(By.LINK_TEXT, "Previous Years")
-                driver.execute_script("arguments[0].click();", prev_years_link)
-                time.sleep(2)
-                links = driver.find_elements(By.XPATH, "//a[@class='aaa']")
-                for link in links:
-                    text = link.text.upper()
-                    url = link.get_attribute("href")
-                    if "STATE DISCOMS" in text and "TARIFF ORDER" in text and "SCANNED" not in text:
-                        if url and ".pdf" in url.lower():
-                            matches.append({"text": link.text, "url": url})
-            except: pass
+            if not target:
+                print(f"[{state_name}] Trying previous years...")
+                try:
+                    prev_years_link = driver.find_element(By.LINK_TEXT, "Previous Years")
+                    driver.execute_script("arguments[0].click();", prev_years_link)
+                    time.sleep(2)
+                    target = select_up(page_listing(driver))
+                except: pass
 
-        if not matches:
+        if not target:
             print(f"[{state_name}] No matching order found.")
             return False
 
-        target = matches[0]
         print(f"[{state_name}] Found latest order: {target['text']}")
         success = download_file(target['url'], download_path)
         
@@ -246,33 +442,40 @@ def process_up(view_browser=True):
         print(f"[{state_name}] Error: {e}")
         success = False
     finally:
-        driver.quit()
+        if driver is not None:
+            DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
+MSERC_ORDERS_URL = "https://www.mserc.gov.in/tarifforders.html"
+
+def select_meghalaya(listing):
+    """First ARR order PDF (not a corrigendum) on the MSERC tariff orders page"""
+    for link in listing.links if listing else []:
+        text = link["text"].upper()
+        if ".pdf" in (link["href"] or "") and link["url"] and "AGGREGATE REVENUE" in text and "CORRIGENDUM" not in text:
+            return {"text": link["text"], "url": link["url"]}
+    return None
+
 def process_meghalaya(view_browser=True):
     state_name = "Meghalaya"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
+    target = discover_over_http(state_name, lambda: select_meghalaya(fetch_listing(MSERC_ORDERS_URL)))
+    driver = None
     
     success = False
     try:
-        print(f"[{state_name}] Navigating to MSERC Tariff Orders...")
-        driver.get("https://www.mserc.gov.in/tarifforders.html")
-        time.sleep(2)
-        
-        links = driver.find_elements(By.XPATH, "//a[contains(@href, '.pdf')]")
-        matches = []
-        for link in links:
-            text = link.text.upper()
-            if "AGGREGATE REVENUE" in text and "CORRIGENDUM" not in text:
-                matches.append({"text": link.text, "url": link.get_attribute("href")})
+        if target is None:
+            driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
+            print(f"[{state_name}] Navigating to MSERC Tariff Orders...")
+            driver.get(MSERC_ORDERS_URL)
+            time.sleep(2)
+            target = select_meghalaya(page_listing(driver))
         
-        if not matches:
+        if not target:
             print(f"[{state_name}] No matching PDF found.")
             return False
 
-        target = matches[0]
         print(f"[{state_name}] Found latest order: {target['text']}")
         success = download_file(target['url'], download_path)
         
@@ -280,14 +483,15 @@ def process_meghalaya(view_browser=True):
         print(f"[{state_name}] Error: {e}")
         success = False
     finally:
-        driver.quit()
+        if driver is not None:
+            DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
 def process_rajasthan(view_browser=True):
     state_name = "Rajasthan"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
+    driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
     wait = WebDriverWait(driver, 20)
     
     success = False
@@ -396,14 +600,14 @@ def process_rajasthan(view_browser=True):
     except Exception as e:
         print(f"[{state_name}] Error: {e}")
     finally:
-        driver.quit()
+        DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
 def process_mp(view_browser=True):
     state_name = "Madhya Pradesh"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
+    driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
     wait = WebDriverWait(driver, 20)
     
     success = False
@@ -461,14 +665,14 @@ def process_mp(view_browser=True):
     except Exception as e:
         print(f"[{state_name}] Error: {e}")
     finally:
-        driver.quit()
+        DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
 def process_chhattisgarh(view_browser=True):
     state_name = "Chhattisgarh"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
+    driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
     wait = WebDriverWait(driver, 20)
     
     success = False
@@ -519,14 +723,14 @@ def process_chhattisgarh(view_browser=True):
     except Exception as e:
         print(f"[{state_name}] Error: {e}")
     finally:
-        driver.quit()
+        DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
 def process_himachal(view_browser=True):
     state_name = "Himachal Pradesh"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
+    driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
     wait = WebDriverWait(driver, 20)
     
     success = False
@@ -562,14 +766,14 @@ def process_himachal(view_browser=True):
     except Exception as e:
         print(f"[{state_name}] Error: {e}")
     finally:
-        driver.quit()
+        DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
 def process_puducherry(view_browser=True):
     state_name = "Puducherry"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
+    driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
     wait = WebDriverWait(driver, 20)
     
     success = False
@@ -626,14 +830,14 @@ def process_puducherry(view_browser=True):
     except Exception as e:
         print(f"[{state_name}] Error: {e}")
     finally:
-        driver.quit()
+        DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
 def process_bihar(view_browser=True):
     state_name = "Bihar"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
+    driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
     wait = WebDriverWait(driver, 20)
     
     success = False
@@ -716,53 +920,55 @@ def process_bihar(view_browser=True):
     except Exception as e:
         print(f"[{state_name}] Error: {e}")
     finally:
-        driver.quit()
+        DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
+OERC_ORDERS_URL = "https://www.orierc.org/Distribution_Retail_Supply.aspx"
+
+def select_odisha(listing):
+    """First DISCOM ARR / retail supply tariff order row of the OERC distribution page"""
+    for row in listing.rows if listing else []:
+        text = row["text"].upper()
+        
+        # Keywords: "AGGREGATE", "REVENUE", "REQUIREMENT"
+        # Context: "DISCOMS" (User requested this. The file name has DISCOM, logic below checks for it or assumes if strict match fails)
+        # Exclusion: "PETITION"
+        
+        # Row text example: "AGGREGATE REVENUE REQUIREMENT, WHEELING TARIFF & RETAIL SUPPLY TARIFF FOR THE FY 2025-26"
+        # It might not explicitly say "DISCOMS" in the row text, but it IS the Distribution page.
+        # User requirement: "have these keywords Discoms Aggregate ,Revenue , requirement"
+        # Strict interpretation: Text MUST have "DISCOMS".
+        # Site inspection shows the file is "DISCOM_TARIFF_ORDER...".
+        # If the Text doesn't have "DISCOMS", I will check if the Link has "DISCOM".
+        
+        if "AGGREGATE" in text and "REVENUE" in text and "REQUIREMENT" in text and "PETITION" not in text:
+            if not row["links"] or not row["links"][0]["url"]:
+                continue
+            url = row["links"][0]["url"]
+            # Check if "DISCOMS" is properly associated
+            if "DISCOM" in text or "DISCOM" in url.upper():
+                return {"url": url, "name": row["text"]}
+    return None
+
 def process_odisha(view_browser=True):
     state_name = "Odisha"
     download_path = get_state_download_path(state_name)
-    driver = setup_driver(view_browser=view_browser, download_path=download_path)
-    wait = WebDriverWait(driver, 20)
+    target_info = discover_over_http(state_name, lambda: select_odisha(fetch_listing(OERC_ORDERS_URL)))
+    driver = None
     
     success = False
     try:
-        print(f"[{state_name}] Navigating to OERC website...")
-        # Direct navigation based on site inspection
-        driver.get("https://www.orierc.org/Distribution_Retail_Supply.aspx")
-        
-        # Get all rows in the main table
-        # Structure is usually table -> tr -> td
-        rows = wait.until(EC.presence_of_all_elements_located((By.XPATH, "//table//tr[td]")))
-        
-        target_info = None
-        for row in rows:
-            text = row.text.upper()
-            
-            # Keywords: "AGGREGATE", "REVENUE", "REQUIREMENT"
-            # Context: "DISCOMS" (User requested this. The file name has DISCOM, logic below checks for it or assumes if strict match fails)
-            # Exclusion: "PETITION"
+        if target_info is None:
+            driver = DRIVERS.acquire(view_browser=view_browser, download_path=download_path)
+            wait = WebDriverWait(driver, 20)
+            print(f"[{state_name}] Navigating to OERC website...")
+            # Direct navigation based on site inspection
+            driver.get(OERC_ORDERS_URL)
             
-            # Row text example: "AGGREGATE REVENUE REQUIREMENT, WHEELING TARIFF & RETAIL SUPPLY TARIFF FOR THE FY 2025-26"
-            # It might not explicitly say "DISCOMS" in the row text, but it IS the Distribution page.
-            # User requirement: "have these keywords Discoms Aggregate ,Revenue , requirement"
-            # Strict interpretation: Text MUST have "DISCOMS".
-            # Site inspection shows the file is "DISCOM_TARIFF_ORDER...".
-            # If the Text doesn't have "DISCOMS", I will check if the Link has "DISCOM".
-            
-            if "AGGREGATE" in text and "REVENUE" in text and "REQUIREMENT" in text and "PETITION" not in text:
-                 # Check for "DISCOMS" in text OR link URL
-                 link_element = None
-                 try:
-                     link_element = row.find_element(By.TAG_NAME, "a")
-                 except: continue
-                 
-                 url = link_element.get_attribute("href")
-                 # Check if "DISCOMS" is properly associated
-                 if "DISCOM" in text or "DISCOM" in url.upper():
-                     target_info = {"url": url, "name": row.text}
-                     break
+            # Structure is usually table -> tr -> td
+            wait.until(EC.presence_of_all_elements_located((By.XPATH, "//table//tr[td]")))
+            target_info = select_odisha(page_listing(driver))
         
         if target_info:
             print(f"[{state_name}] Found latest order: {target_info['name'][:100]}...")
@@ -773,10 +979,31 @@ def process_odisha(view_browser=True):
     except Exception as e:
         print(f"[{state_name}] Error: {e}")
     finally:
-        driver.quit()
+        if driver is not None:
+            DRIVERS.release(driver)
         clean_garbage_files(download_path)
     return success
 
+def run_states(processors, states, view_browser=True, max_workers=MAX_PARALLEL_STATES):
+    """
+    Runs processors[state](view_browser=...) for every state, up to max_workers
+    at a time; every state has its own regulator site, so that is the only limit.
+    Each state downloads into its own Download/<State> folder.
+    Returns {state: (ok, seconds)} in the order of states.
+    """
+    def run(state):
+        started = time.monotonic()
+        try:
+            ok = processors[state](view_browser=view_browser)
+        except Exception as e:
+            print(f"[{state}] Error: {e}")
+            ok = False
+        return ok, time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {state: pool.submit(run, state) for state in states}
+    return {state: futures[state].result() for state in states}
+
 if __name__ == "__main__":
     def remove_readonly(func, path, _):
         """Clear read-only bit and retry."""
@@ -784,38 +1011,62 @@ if __name__ == "__main__":
         func(path)
 
     import stat
+    import sys
     start_time = time.time()
     SHOW_BROWSER = os.getenv("SHOW_BROWSER", "False").lower() == "true"
+    # python Automation.py --benchmark-browser [states]: start-up cost with and without reuse, nothing downloaded
+    if "--benchmark-browser" in sys.argv:
+        idx = sys.argv.index("--benchmark-browser")
+        count = int(sys.argv[idx + 1]) if idx + 1 < len(sys.argv) else 10
+        benchmark_drivers(count, view_browser=SHOW_BROWSER)
+        sys.exit(0)
     
-    states_to_process = ["Assam", "Uttar Pradesh", "Meghalaya", "Rajasthan", "Madhya Pradesh", "Chhattisgarh", "Himachal Pradesh", "Puducherry", "Bihar", "Odisha"]
-    results = {}
+    state_processors = {
+        "Assam": process_assam,
+        "Uttar Pradesh": process_up,
+        "Meghalaya": process_meghalaya,
+        "Rajasthan": process_rajasthan,
+        "Madhya Pradesh": process_mp,
+        "Chhattisgarh": process_chhattisgarh,
+        "Himachal Pradesh": process_himachal,
+        "Puducherry": process_puducherry,
+        "Bihar": process_bihar,
+        "Odisha": process_odisha,
+    }
+    # Optional: python Automation.py --states "Assam,Bihar" downloads only those states
+    selected = None
+    if "--states" in sys.argv:
+        idx = sys.argv.index("--states")
+        if idx + 1 < len(sys.argv):
+            selected = [s.strip() for s in sys.argv[idx + 1].split(",") if s.strip()]
+    states_to_process = [s for s in state_processors if selected is None or s in selected]
     
-    # Clear Download folder before starting, with better error handling for Windows
-    if os.path.exists(DOWNLOADS_ROOT):
-        print(f"Clearing Download folder: {DOWNLOADS_ROOT}")
-        try:
-            shutil.rmtree(DOWNLOADS_ROOT, onerror=remove_readonly)
-        except Exception as e:
-            print(f"Warning: Could not fully clear Download folder: {e}")
+    if selected is None:
+        # Clear Download folder before starting, with better error handling for Windows
+        clear_paths = [DOWNLOADS_ROOT]
+    else:
+        # Per-state run: leave other states' downloads alone
+        clear_paths = [os.path.join(DOWNLOADS_ROOT, s) for s in states_to_process]
+    for path in clear_paths:
+        if os.path.exists(path):
+            print(f"Clearing Download folder: {path}")
+            try:
+                shutil.rmtree(path, onerror=remove_readonly)
+            except Exception as e:
+                print(f"Warning: Could not fully clear Download folder: {e}")
             
     os.makedirs(DOWNLOADS_ROOT, exist_ok=True)
     
-    for state in states_to_process:
-        if state == "Assam": results[state] = process_assam(view_browser=SHOW_BROWSER)
-        elif state == "Uttar Pradesh": results[state] = process_up(view_browser=SHOW_BROWSER)
-        elif state == "Meghalaya": results[state] = process_meghalaya(view_browser=SHOW_BROWSER)
-        elif state == "Rajasthan": results[state] = process_rajasthan(view_browser=SHOW_BROWSER)
-        elif state == "Madhya Pradesh": results[state] = process_mp(view_browser=SHOW_BROWSER)
-        elif state == "Chhattisgarh": results[state] = process_chhattisgarh(view_browser=SHOW_BROWSER)
-        elif state == "Himachal Pradesh": results[state] = process_himachal(view_browser=SHOW_BROWSER)
-        elif state == "Puducherry": results[state] = process_puducherry(view_browser=SHOW_BROWSER)
-        elif state == "Bihar": results[state] = process_bihar(view_browser=SHOW_BROWSER)
-        elif state == "Odisha": results[state] = process_odisha(view_browser=SHOW_BROWSER)
+    try:
+        results = run_states(state_processors, states_to_process, view_browser=SHOW_BROWSER)
+    finally:
+        DRIVERS.close()
     
-    print("\n" + "="*40)
-    print(f"{'STATE':<15} | {'AUTOMATION STATUS':<20}")
-    print("-" * 40)
-    for state, status in results.items():
-        print(f"{state:<15} | {'Successfully Downloaded' if status else 'Failed to Download'}")
-    print("="*40)
+    print("\n" + "="*52)
+    print(f"{'STATE':<15} | {'AUTOMATION STATUS':<23} | {'TIME':>7}")
+    print("-" * 52)
+    for state, (status, seconds) in results.items():
+        print(f"{state:<15} | {'Successfully Downloaded' if status else 'Failed to Download':<23} | {seconds:>6.1f}s")
+    print("="*52)
+    print(DRIVERS.report())
     print(f"Total time taken: {time.time() - start_time:.2f} seconds")
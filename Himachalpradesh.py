@@ -7,6 +7,9 @@ try:
     DB_SUCCESS = True
 except ImportError:
     DB_SUCCESS = False
+import extractor_trace as trace
+from extractor_trace import traced, write_report
+from workspace import workspace_root
 from datetime import datetime
 
 def get_financial_years():
@@ -39,6 +42,7 @@ def get_priority(heading, fy_info):
         return 1
     return 0
 
+@traced
 def extract_discom_names(jsonl_path, output_path):
     discom_names = []
     candidate_names = []
@@ -51,9 +55,9 @@ def extract_discom_names(jsonl_path, output_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 rows = data.get("rows", [])
-                for row in rows:
+                for row in trace.rows(rows):
                     for k, v in row.items():
                         if not v: continue
                         k_str = str(k).lower()
@@ -62,10 +66,12 @@ def extract_discom_names(jsonl_path, output_path):
                              cleaned = re.sub(r'^[M|m]/[s|S][\.,\s]*', '', v_str).strip()
                              if len(cleaned) > 2 and not cleaned[0].isdigit():
                                  candidate_names.append(cleaned)
+                                 trace.match(cleaned, note="candidate")
                         if v_str.isupper() and 3 < len(v_str) < 10:
                             if v_str.endswith("L") or v_str.endswith("D") or v_str.endswith("B"):
                                  if v_str.lower() not in ignore_list and "FY" not in v_str:
                                      candidate_names.append(v_str)
+                                     trace.match(v_str, note="candidate")
             except: pass
     # Hardcode proper DISCOM name for Himachal Pradesh
     discom_names = ["HPSEBL"]
@@ -74,6 +80,7 @@ def extract_discom_names(jsonl_path, output_path):
         for name in sorted(list(set(discom_names))): f.write(name + "\n")
     return discom_names
 
+@traced
 def extract_ists_loss(json_path):
     try:
         if os.path.exists(json_path):
@@ -87,6 +94,7 @@ def extract_ists_loss(json_path):
         print(f"Error reading ISTS loss JSON: {e}")
     return "NA"
 
+@traced
 def extract_losses(jsonl_path, fy_info):
     insts_loss = None
     best_priority = -1
@@ -104,7 +112,7 @@ def extract_losses(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 priority = get_priority(heading, fy_info)
@@ -112,7 +120,7 @@ def extract_losses(jsonl_path, fy_info):
                 # Check if table heading matches transmission keywords
                 table_match = any(k in heading for k in keywords)
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     
                     # Identify row: either in matching table with "loss" or row specifically mentions loss
@@ -133,9 +141,11 @@ def extract_losses(jsonl_path, fy_info):
                                     clean_val = re.sub(r'[^\d\.]', '', v_str)
                                     if clean_val and priority > best_priority:
                                         insts_loss = v_str
+                                        trace.match(v_str)
                                         best_priority = priority
                                     elif clean_val and priority == best_priority and insts_loss is None:
                                         insts_loss = v_str
+                                        trace.match(v_str)
                                 except:
                                     pass
             except:
@@ -147,6 +157,7 @@ def extract_losses(jsonl_path, fy_info):
     print(f"Extracted InSTS Loss: {insts_loss}")
     return insts_loss
 
+@traced
 def extract_wheeling_losses(jsonl_path, fy_info):
     losses = {'11': 'NA', '33': 'NA', '66': 'NA', '132': 'NA', '220': 'NA'}
     best_priority = {'11': -1, '33': -1, '66': -1, '132': -1, '220': -1}
@@ -156,7 +167,7 @@ def extract_wheeling_losses(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 rows = data.get("rows", [])
@@ -168,7 +179,7 @@ def extract_wheeling_losses(jsonl_path, fy_info):
                 if "loss level" in h and "open access" in h:
                     # Map columns based on first row or headers
                     col_map = {}
-                    for row in rows:
+                    for row in trace.rows(rows):
                         for k, v in row.items():
                             k_lower = str(k).lower().replace(" ", "").replace("/", "")
                             v_lower = str(v).lower().replace(" ", "").replace("/", "") if v else ""
@@ -182,7 +193,7 @@ def extract_wheeling_losses(jsonl_path, fy_info):
                             if "132kv" in k_lower or "220kv" in k_lower or "132kv" in v_lower or "220kv" in v_lower:
                                 col_map[k] = '132' # Also covers '220' if we want
 
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if "loss level" in row_txt or "energy" in row_txt:
                             for k, v in row.items():
@@ -191,14 +202,16 @@ def extract_wheeling_losses(jsonl_path, fy_info):
                                 if tv:
                                     if priority >= best_priority[tv]:
                                         losses[tv] = str(v).strip()
+                                        trace.match(losses[tv])
                                         best_priority[tv] = priority
                                         if tv == '132': # Populate 220 as well
                                             losses['220'] = str(v).strip()
+                                            trace.match(losses['220'])
                                             best_priority['220'] = priority
 
                 # General case for other tables
                 if table_match and not ("loss level" in h and "open access" in h):
-                    for row in rows:
+                    for row in trace.rows(rows):
                         r_txt = str(row).lower()
                         val = next((str(v).strip() for v in row.values() if v and "%" in str(v)), None)
                         if not val: continue
@@ -210,12 +223,14 @@ def extract_wheeling_losses(jsonl_path, fy_info):
                         
                         if target_v and priority >= best_priority[target_v]:
                             losses[target_v] = val
+                            trace.match(val)
                             best_priority[target_v] = priority
             except: pass
             
     print(f"Extracted Wheeling Losses: {losses}")
     return losses
 
+@traced
 def extract_wheeling_charges(jsonl_path, fy_info):
     charges = {'11': 'NA', '33': 'NA', '66': 'NA', '132': 'NA', '220': 'NA'}
     best_priority = {'11': -1, '33': -1, '66': -1, '132': -1, '220': -1}
@@ -224,7 +239,7 @@ def extract_wheeling_charges(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 if priority < 2:
@@ -238,14 +253,14 @@ def extract_wheeling_charges(jsonl_path, fy_info):
                 
                 # Check rows if header doesn't match
                 if not match_header:
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if any(k in row_txt for k in keywords):
                             match_header = True
                             break
                             
                 if match_header:
-                     for row in rows:
+                     for row in trace.rows(rows):
                          row_txt = str(row).lower()
                          # Strict filter: Row must describe a charge or rate
                          if not any(x in row_txt for x in ["charges", "paisa", "rate/unit", "/unit", "cost of supply"]):
@@ -282,6 +297,7 @@ def extract_wheeling_charges(jsonl_path, fy_info):
                                          if 0.01 < f_v < 10.0:
                                              if priority >= best_priority[target_v]:
                                                  charges[target_v] = f_v
+                                                 trace.match(f_v)
                                                  best_priority[target_v] = priority
                                  except: pass
             except: pass
@@ -289,17 +305,18 @@ def extract_wheeling_charges(jsonl_path, fy_info):
     print(f"Extracted Wheeling Charges: {charges}")
     return charges
 
+@traced
 def extract_additional_surcharge(jsonl_path, fy_info):
     add_surcharge = None
     best_priority = -1
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 if "additional surcharge" in h and "approved" in h:
-                     for row in data.get("rows", []):
+                     for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if "additional surcharge" in row_txt and ("paisa" in row_txt or "unit" in row_txt):
                              for k, v in row.items():
@@ -319,6 +336,7 @@ def extract_additional_surcharge(jsonl_path, fy_info):
     print(f"Extracted Additional Surcharge: {add_surcharge}")
     return add_surcharge if add_surcharge is not None else "NA"
 
+@traced
 def extract_css_charges(jsonl_path, fy_info):
     css_charges = {'11': 'NA', '33': 'NA', '66': 'NA', '132': 'NA', '220': 'NA'}
     best_priority = {'11': -1, '33': -1, '66': -1, '132': -1, '220': -1}
@@ -326,7 +344,7 @@ def extract_css_charges(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 
                 # Filter for Approved Tables (usually late in document)
@@ -346,7 +364,7 @@ def extract_css_charges(jsonl_path, fy_info):
                 
                 # Check if this looks like the Large Industrial / EHT table
                 has_industrial_context = False
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     if "large industrial" in row_txt or "commercial supply" in row_txt:
                         has_industrial_context = True
@@ -361,7 +379,7 @@ def extract_css_charges(jsonl_path, fy_info):
                         current_priority = 2
                     
                     current_category = None
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         
                         # Category Tracking
@@ -418,6 +436,7 @@ def extract_css_charges(jsonl_path, fy_info):
                                      clean = re.sub(r'[^\d\.]', '', str(v))
                                      if clean and 0.01 < float(clean) < 10:
                                          nums.append(float(clean))
+                                         trace.match(float(clean), note="candidate")
                                  except: pass
                              if nums: found_val = nums[-1] # Minimum is usually last col
                         
@@ -425,6 +444,7 @@ def extract_css_charges(jsonl_path, fy_info):
                             for vk in v_key:
                                 if current_priority >= best_priority[vk]:
                                     css_charges[vk] = found_val
+                                    trace.match(found_val)
                                     best_priority[vk] = current_priority
 
             except: pass
@@ -435,17 +455,18 @@ def extract_css_charges(jsonl_path, fy_info):
     print(f"Extracted CSS: {css_charges}")
     return css_charges
 
+@traced
 def extract_fixed_charges(jsonl_path, fy_info):
     fixed_charges = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
     best_priority = {'11': -1, '33': -1, '66': -1, '132': -1, '220': -1}
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 if "demand charges" in h or "demand charge" in h:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower().replace('\n', ' ').replace('  ', ' ')
                         cat = None
                         if "220 kv" in row_txt: cat = '220'
@@ -462,7 +483,7 @@ def extract_fixed_charges(jsonl_path, fy_info):
                                      clean = re.sub(r'[^\d\.]', '', str(v))
                                      if clean:
                                          f_v = float(clean)
-                                         if 50 < f_v < 1000: cands.append(f_v)
+                                         if 50 < f_v < 1000: cands.append(f_v); trace.match(f_v, note="candidate")
                                  except: pass
                              if cands:
                                  val = max(cands)
@@ -470,25 +491,28 @@ def extract_fixed_charges(jsonl_path, fy_info):
                                      for k in ['66', '132', '220']:
                                          if priority >= best_priority[k]:
                                              fixed_charges[k] = val
+                                             trace.match(val)
                                              best_priority[k] = priority
                                  elif priority >= best_priority[cat]:
                                      fixed_charges[cat] = val
+                                     trace.match(val)
                                      best_priority[cat] = priority
             except: pass
     print(f"Extracted Fixed Charges: {fixed_charges}")
     return fixed_charges
 
+@traced
 def extract_energy_charges(jsonl_path, fy_info):
     energy_charges = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
     best_priority = {'11': -1, '33': -1, '66': -1, '132': -1, '220': -1}
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 if "energy charge" in h or "variable charge" in h:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         cats = []
                         if "220 kv" in row_txt: cats.append('220')
@@ -507,18 +531,20 @@ def extract_energy_charges(jsonl_path, fy_info):
                                      clean = re.sub(r'[^\d\.]', '', str(v))
                                      if clean:
                                          f_v = float(clean)
-                                         if f_v != 11.0 and 1.0 < f_v < 20.0: cands.append(f_v)
+                                         if f_v != 11.0 and 1.0 < f_v < 20.0: cands.append(f_v); trace.match(f_v, note="candidate")
                                  except: pass
                              if cands:
                                  val = max(cands)
                                  for c in cats:
                                      if priority >= best_priority[c]:
                                          energy_charges[c] = val
+                                         trace.match(val)
                                          best_priority[c] = priority
             except: pass
     print(f"Extracted Energy Charges: {energy_charges}")
     return energy_charges
 
+@traced
 def extract_fuel_surcharge(jsonl_path, fy_info):
     fuel_surcharge = None
     best_priority = -1
@@ -526,12 +552,12 @@ def extract_fuel_surcharge(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 match_found = any(k in h for k in keywords) or any(any(k in str(r).lower() for k in keywords) for r in data.get("rows", []))
                 if match_found:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                          for v in row.values():
                             try:
                                 clean = re.sub(r'[^\d\.]', '', str(v))
@@ -545,11 +571,13 @@ def extract_fuel_surcharge(jsonl_path, fy_info):
     print(f"Extracted Fuel Surcharge: {fuel_surcharge}")
     return fuel_surcharge if fuel_surcharge is not None else "NA"
 
+@traced
 def extract_pfa_rebate_dynamic(jsonl_path, fy_info):
     # Extensive search yielded no direct INR/kWh value for Power Factor Rebate in FY25-26.
     # Current values are mostly reactive charges or directives.
     return "NA"
 
+@traced
 def extract_load_factor_incentive_dynamic(jsonl_path, fy_info):
     lf_incentive = None
     best_priority = -1
@@ -558,13 +586,13 @@ def extract_load_factor_incentive_dynamic(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 
                 # Check for table heading match
                 if any(k in h for k in keywords):
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         is_paisa = "paisa" in row_txt or "paisa" in h
                         
@@ -596,7 +624,7 @@ def extract_load_factor_incentive_dynamic(jsonl_path, fy_info):
                 # But to be safe and strict to user request, we focus on where these keywords appear.
                 # If keywords appear in row:
                 else:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if any(k in row_txt for k in keywords):
                              is_paisa = "paisa" in row_txt
@@ -618,6 +646,7 @@ def extract_load_factor_incentive_dynamic(jsonl_path, fy_info):
             
     return lf_incentive if lf_incentive else "NA"
 
+@traced
 def extract_voltage_rebates(jsonl_path, fy_info):
     rebates = {'33_66': "NA", '132_plus': "NA"}
     best_priority = {'33_66': -1, '132_plus': -1}
@@ -628,7 +657,7 @@ def extract_voltage_rebates(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 
@@ -636,7 +665,7 @@ def extract_voltage_rebates(jsonl_path, fy_info):
                                     ("rebate" in h and any(v in h for v in ["33 kv", "66 kv", "132 kv", "220 kv", "eht", "ht"]))
                 
                 if is_relevant_table:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         is_paisa = "paisa" in row_txt or "paisa" in h
                         
@@ -669,10 +698,11 @@ def extract_voltage_rebates(jsonl_path, fy_info):
                                             for c in cats:
                                                 if priority >= best_priority[c]:
                                                     rebates[c] = val
+                                                    trace.match(val)
                                                     best_priority[c] = priority
                                 except: pass
                 else: 
-                     for row in data.get("rows", []):
+                     for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if any(k in row_txt for k in keywords):
                             is_paisa = "paisa" in row_txt
@@ -699,6 +729,7 @@ def extract_voltage_rebates(jsonl_path, fy_info):
                                                  for c in cats:
                                                      if priority >= best_priority[c]:
                                                          rebates[c] = val
+                                                         trace.match(val)
                                                          best_priority[c] = priority
                                     except: pass
             except: pass
@@ -706,6 +737,7 @@ def extract_voltage_rebates(jsonl_path, fy_info):
 
 
 
+@traced
 def extract_grid_support_charges(jsonl_path, fy_info):
     grid_support = None
     best_priority = -1
@@ -715,13 +747,13 @@ def extract_grid_support_charges(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 
                 # Check for table heading match
                 if any(k in h for k in keywords):
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                          row_txt = str(row).lower()
                          is_paisa = "paisa" in row_txt or "paisa" in h
                          
@@ -751,7 +783,7 @@ def extract_grid_support_charges(jsonl_path, fy_info):
                 
                 # Fallback: Check rows for keywords if header didn't match
                 else:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if any(k in row_txt for k in keywords):
                              is_paisa = "paisa" in row_txt # checking row context
@@ -775,6 +807,7 @@ def extract_grid_support_charges(jsonl_path, fy_info):
 
 
 
+@traced
 def extract_bulk_consumption_rebate(jsonl_path, fy_info):
     bulk_rebate = None
     best_priority = -1
@@ -783,13 +816,13 @@ def extract_bulk_consumption_rebate(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 priority = get_priority(h, fy_info)
                 
                 # Check for table heading match
                 if any(k in h for k in keywords):
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         is_paisa = "paisa" in row_txt or "paisa" in h
                         
@@ -818,7 +851,7 @@ def extract_bulk_consumption_rebate(jsonl_path, fy_info):
                 
                 # Fallback: Check rows for keywords
                 else:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if any(k in row_txt for k in keywords):
                             is_paisa = "paisa" in row_txt
@@ -839,21 +872,22 @@ def extract_bulk_consumption_rebate(jsonl_path, fy_info):
             
     return bulk_rebate if bulk_rebate else "NA"
 
+@traced
 def extract_tod_charges(jsonl_path):
     tod = "NA"
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 if any(k in h for k in ["time of day", "tod", "peak"]):
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         for v in row.values():
                             try:
                                 clean = re.sub(r'[^\d\.]', '', str(v))
                                 if clean:
                                     f_v = float(clean)
-                                    if 0.1 < f_v < 10.0: tod = f_v
+                                    if 0.1 < f_v < 10.0: tod = f_v; trace.match(f_v)
                             except: pass
             except: pass
     return tod
@@ -952,6 +986,7 @@ def update_excel_with_discoms(discoms, ists, insts, insts_charges_val, wheeling_
         print(f"Updated Excel for {len(discoms)} discoms.")
     except Exception as e: print(f"Error: {e}")
 
+@traced
 def extract_insts_charges(jsonl_path, fy_info):
     insts_charges = None
     best_priority = -1
@@ -960,7 +995,7 @@ def extract_insts_charges(jsonl_path, fy_info):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 
                 # Rigid priority: Only accept Current Year data
@@ -974,7 +1009,7 @@ def extract_insts_charges(jsonl_path, fy_info):
                 rows = data.get("rows", [])
                 
                 if match_found:
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if "total" in row_txt or "grand" in row_txt: continue
                         
@@ -994,6 +1029,7 @@ def extract_insts_charges(jsonl_path, fy_info):
                                          
                                          if val and priority >= best_priority:
                                              insts_charges = val
+                                             trace.match(val)
                                              best_priority = priority
                                  except: pass
             except: pass
@@ -1005,68 +1041,71 @@ def extract_insts_charges(jsonl_path, fy_info):
     return insts_charges
 
 if __name__ == "__main__":
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    fy_info = get_financial_years()
-    
-    # 1. Dynamic Search for Himachal Pradesh Extraction folder
-    extraction_root = os.path.join(base_dir, "Extraction")
-    extraction_dir = None
+    try:
+        base_dir = workspace_root()
+        fy_info = get_financial_years()
     
-    if os.path.exists(extraction_root):
-        for d in os.listdir(extraction_root):
-            if "himachal" in d.lower():
-                extraction_dir = os.path.join(extraction_root, d)
-                break
+        # 1. Dynamic Search for Himachal Pradesh Extraction folder
+        extraction_root = os.path.join(base_dir, "Extraction")
+        extraction_dir = None
     
-    # 2. Find JSONL file
-    jsonl_file = None
-    if extraction_dir and os.path.exists(extraction_dir):
-        for root, dirs, files in os.walk(extraction_dir):
-            for f in files:
-                # Try to find current FY file first
-                if f.endswith(".jsonl") and (fy_info['current_short'] in f or fy_info['current_long'] in f):
-                    jsonl_file = os.path.join(root, f)
+        if os.path.exists(extraction_root):
+            for d in os.listdir(extraction_root):
+                if "himachal" in d.lower():
+                    extraction_dir = os.path.join(extraction_root, d)
                     break
-            if jsonl_file: break
+    
+        # 2. Find JSONL file
+        jsonl_file = None
+        if extraction_dir and os.path.exists(extraction_dir):
+            for root, dirs, files in os.walk(extraction_dir):
+                for f in files:
+                    # Try to find current FY file first
+                    if f.endswith(".jsonl") and (fy_info['current_short'] in f or fy_info['current_long'] in f):
+                        jsonl_file = os.path.join(root, f)
+                        break
+                if jsonl_file: break
             
-            # Fallback to any jsonl in the folder
-            for f in files:
-                if f.endswith(".jsonl"):
-                    jsonl_file = os.path.join(root, f)
-                    break
-            if jsonl_file: break
+                # Fallback to any jsonl in the folder
+                for f in files:
+                    if f.endswith(".jsonl"):
+                        jsonl_file = os.path.join(root, f)
+                        break
+                if jsonl_file: break
 
-    # 3. Path for ISTS and Excel
-    ists_loss_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
-    excel_path = os.path.join(base_dir, "Himachalpradesh.xlsx")
-    discom_file_output = os.path.join(base_dir, "discoms_hp.txt")
+        # 3. Path for ISTS and Excel
+        ists_loss_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
+        excel_path = os.path.join(base_dir, "Himachalpradesh.xlsx")
+        discom_file_output = os.path.join(base_dir, "discoms_hp.txt")
 
-    # 4. Process Extraction if JSONL is found
-    if jsonl_file:
-        print(f"Target JSONL Found: {jsonl_file}")
-        ists_val = extract_ists_loss(ists_loss_file)
-        print(f"Extracted ISTS Loss: {ists_val}")
-        discoms = extract_discom_names(jsonl_file, discom_file_output)
+        # 4. Process Extraction if JSONL is found
+        if jsonl_file:
+            print(f"Target JSONL Found: {jsonl_file}")
+            ists_val = extract_ists_loss(ists_loss_file)
+            print(f"Extracted ISTS Loss: {ists_val}")
+            discoms = extract_discom_names(jsonl_file, discom_file_output)
         
-        insts = extract_losses(jsonl_file, fy_info)
-        wheeling_l = extract_wheeling_losses(jsonl_file, fy_info)
-        wheeling_c = extract_wheeling_charges(jsonl_file, fy_info)
-        css = extract_css_charges(jsonl_file, fy_info)
-        insts_charges_val = extract_insts_charges(jsonl_file, fy_info)
-        fixed = extract_fixed_charges(jsonl_file, fy_info)
-        energy = extract_energy_charges(jsonl_file, fy_info)
-        fuel = extract_fuel_surcharge(jsonl_file, fy_info)
-        tod = extract_tod_charges(jsonl_file)
-        pfa = extract_pfa_rebate_dynamic(jsonl_file, fy_info)
-        lf = extract_load_factor_incentive_dynamic(jsonl_file, fy_info)
-        grid = extract_grid_support_charges(jsonl_file, fy_info)
-        volt = extract_voltage_rebates(jsonl_file, fy_info)
-        bulk = extract_bulk_consumption_rebate(jsonl_file, fy_info)
-        add_s = extract_additional_surcharge(jsonl_file, fy_info)
+            insts = extract_losses(jsonl_file, fy_info)
+            wheeling_l = extract_wheeling_losses(jsonl_file, fy_info)
+            wheeling_c = extract_wheeling_charges(jsonl_file, fy_info)
+            css = extract_css_charges(jsonl_file, fy_info)
+            insts_charges_val = extract_insts_charges(jsonl_file, fy_info)
+            fixed = extract_fixed_charges(jsonl_file, fy_info)
+            energy = extract_energy_charges(jsonl_file, fy_info)
+            fuel = extract_fuel_surcharge(jsonl_file, fy_info)
+            tod = extract_tod_charges(jsonl_file)
+            pfa = extract_pfa_rebate_dynamic(jsonl_file, fy_info)
+            lf = extract_load_factor_incentive_dynamic(jsonl_file, fy_info)
+            grid = extract_grid_support_charges(jsonl_file, fy_info)
+            volt = extract_voltage_rebates(jsonl_file, fy_info)
+            bulk = extract_bulk_consumption_rebate(jsonl_file, fy_info)
+            add_s = extract_additional_surcharge(jsonl_file, fy_info)
         
-        update_excel_with_discoms(discoms, ists_val, insts, insts_charges_val, wheeling_l, wheeling_c, css, fixed, energy, fuel, tod, pfa, lf, grid, volt, bulk, add_s, excel_path)
-        print(f"Successfully updated {excel_path}")
-    else:
-        print("Error: No JSONL scraping data found for Himachal Pradesh.")
-        print(f"Looked in: {extraction_dir if extraction_dir else extraction_root}")
-        print("Please run the Scraper (Start Agent) first to generate the necessary data.")
+            update_excel_with_discoms(discoms, ists_val, insts, insts_charges_val, wheeling_l, wheeling_c, css, fixed, energy, fuel, tod, pfa, lf, grid, volt, bulk, add_s, excel_path)
+            print(f"Successfully updated {excel_path}")
+        else:
+            print("Error: No JSONL scraping data found for Himachal Pradesh.")
+            print(f"Looked in: {extraction_dir if extraction_dir else extraction_root}")
+            print("Please run the Scraper (Start Agent) first to generate the necessary data.")
+    finally:
+        write_report("Himachal Pradesh")
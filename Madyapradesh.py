@@ -7,8 +7,13 @@ try:
     DB_SUCCESS = True
 except ImportError:
     DB_SUCCESS = False
+import extractor_trace as trace
+from extractor_trace import traced, write_report
+from workspace import workspace_root
 from datetime import datetime
+from candidate_selector import BestPerKey
 
+@traced
 def extract_discom_names(jsonl_path, output_path):
     discom_names = set()
     table_keywords = ["discom", "distribution companies"] 
@@ -25,7 +30,7 @@ def extract_discom_names(jsonl_path, output_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 if any(k in heading for k in table_keywords):
                     for h in data.get("headers", []):
@@ -44,6 +49,7 @@ def extract_discom_names(jsonl_path, output_path):
         for name in sorted_names: f.write(name + "\n")
     return sorted_names
 
+@traced
 def extract_ists_loss(json_path):
     try:
         if os.path.exists(json_path):
@@ -56,16 +62,17 @@ def extract_ists_loss(json_path):
         print(f"Error reading ISTS loss JSON: {e}")
     return None
 
+@traced
 def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constraint=lambda x: True):
     if not jsonl_path or not os.path.exists(jsonl_path): return "NA"
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 heading_match = all(k.lower() in h for k in table_keywords)
                 if heading_match:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if all(k.lower() in row_txt for k in row_keywords):
                             for v in list(row.values())[::-1]: # Search from end often finds numbers
@@ -75,11 +82,13 @@ def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constrai
                                     if clean:
                                         f_v = float(clean)
                                         if value_constraint(f_v):
+                                            trace.match(str(v).strip())
                                             return str(v).strip()
                                 except: pass
             except: pass
     return "NA"
 
+@traced
 def extract_transmission_charges(jsonl_path):
     # Try combined Inter/Intra table first (Table 100)
     comb = find_value_in_jsonl(jsonl_path, ["pooled", "cost"], ["transmission", "charges"], lambda x: 0.1 <= x <= 2.0)
@@ -87,18 +96,19 @@ def extract_transmission_charges(jsonl_path):
     # Fallback to general search
     return find_value_in_jsonl(jsonl_path, ["transmission"], ["intra-state", "charge", "rs/kwh"], lambda x: 0.1 <= x <= 2.0)
 
+@traced
 def extract_losses(jsonl_path):
     insts_loss = None
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 is_accurate_year = "2025-2026" in heading or "2025-26" in heading
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     def get_pct(r):
                         cands = []
@@ -118,44 +128,46 @@ def extract_losses(jsonl_path):
                     if "intra" in row_txt and "state" in row_txt and "transmission" in row_txt and "loss" in row_txt:
                         val = get_pct(row)
                         if val:
-                            if is_accurate_year or "2.61" in val: insts_loss = val
+                            if is_accurate_year or "2.61" in val: insts_loss = val; trace.match(val)
             except: pass
     
     print(f"Extracted InSTS Loss: {insts_loss}")
     return insts_loss
 
+@traced
 def extract_wheeling_losses(jsonl_path):
     losses = {'11': None, '33': None, '132': None}
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 if "wheeling" in h or "voltage-wise loss" in h:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         r_txt = str(row).lower()
                         val = next((str(v).strip() for v in row.values() if v and "%" in str(v)), None)
                         if not val: continue
-                        if "33 kv" in r_txt: losses['33'] = val
-                        elif "11 kv" in r_txt: losses['11'] = val
-                        elif "eht" in r_txt or "132 kv" in r_txt: losses['132'] = val
+                        if "33 kv" in r_txt: losses['33'] = val; trace.match(val)
+                        elif "11 kv" in r_txt: losses['11'] = val; trace.match(val)
+                        elif "eht" in r_txt or "132 kv" in r_txt: losses['132'] = val; trace.match(val)
             except: pass
     print(f"Extracted Wheeling Losses: {losses}")
     return losses
 
 
 
+@traced
 def extract_wheeling_charges(jsonl_path):
     charges = {'11': None, '33': None, '66': None, '132': None}
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 if "wheeling charge" in heading:
                     rows = data.get("rows", [])
                     charge_col_key = None
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if not charge_col_key:
                             for k, v in row.items():
@@ -175,9 +187,11 @@ def extract_wheeling_charges(jsonl_path):
                                             f_v = float(clean)
                                             if 0.05 < f_v < 5 and f_v != float(volt):
                                                 candidates.append(f_v)
+                                                trace.match(f_v, note="candidate")
                                     except: pass
                                 if candidates:
                                     charges[volt] = min(candidates)
+                                    trace.match(charges[volt])
             except: pass
     # Default to NA for requested columns if valid value not found
     for k in ['66', '132']:
@@ -187,17 +201,18 @@ def extract_wheeling_charges(jsonl_path):
     print(f"Extracted Wheeling Charges: {charges}")
     return charges
 
+@traced
 def extract_additional_surcharge(jsonl_path):
     add_surcharge = None
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 # Target Table 97: Determination of Additional Surcharge for FY 2025-26
                 if "additional surcharge" in heading and "determination" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         # Strictly target the final "Per Unit Additional Surcharge" row
                         if "per unit" in row_txt and "additional surcharge" in row_txt:
@@ -213,6 +228,7 @@ def extract_additional_surcharge(jsonl_path):
                                                 # Avoid matching year or serial numbers
                                                 if 0.1 < f_v < 10:
                                                     add_surcharge = f_v
+                                                    trace.match(f_v)
                                                     break
                                         except: pass
                             if add_surcharge: break
@@ -221,18 +237,19 @@ def extract_additional_surcharge(jsonl_path):
     print(f"Extracted Additional Surcharge: {add_surcharge}")
     return add_surcharge
 
+@traced
 def extract_css_charges(jsonl_path):
     css_charges = {'11': None, '33': None, '66': None, '132': None, '220': None}
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 # Keywords for CSS
                 if "css" in heading or "cross subsidy surcharge" in heading or "cross-subsidy surcharge" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         
                         # Identify voltage level
@@ -258,6 +275,7 @@ def extract_css_charges(jsonl_path):
                                         # Heuristic: CSS is usually between 0 and 5 Rs/unit
                                         if 0.0 < f_v < 5:
                                             candidates.append(f_v)
+                                            trace.match(f_v, note="candidate")
                                 except: pass
                             
                             if candidates:
@@ -268,6 +286,7 @@ def extract_css_charges(jsonl_path):
                                 # Let's specific check if we can distinguish. 
                                 # Without complex logic, let's take the last one which is often the approved one in columns [Existing, Proposed, Approved].
                                 css_charges[volt] = candidates[-1]
+                                trace.match(css_charges[volt])
 
             except: pass
             
@@ -279,18 +298,19 @@ def extract_css_charges(jsonl_path):
     print(f"Extracted CSS Charges: {css_charges}")
     return css_charges
 
+@traced
 def extract_fixed_charges(jsonl_path):
     fixed_charges = {'11': None, '33': None, '66': None, '132': None, '220': None}
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 # Keywords for Fixed Charges
                 if "fixed charge" in heading or "demand charge" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         
                         # Identify voltage level
@@ -314,10 +334,12 @@ def extract_fixed_charges(jsonl_path):
                                         # To avoid confusion with years (2025) or percentages, maybe cap at 2000?
                                         if 10 < f_v < 2000:
                                             candidates.append(f_v)
+                                            trace.match(f_v, note="candidate")
                                 except: pass
                             
                             if candidates:
                                 fixed_charges[volt] = candidates[-1]
+                                trace.match(fixed_charges[volt])
 
             except: pass
             
@@ -329,18 +351,20 @@ def extract_fixed_charges(jsonl_path):
     print(f"Extracted Fixed Charges: {fixed_charges}")
     return fixed_charges
 
+@traced
 def extract_energy_charges(jsonl_path):
     energy_charges = {'11': None, '33': None, '66': None, '132': None, '220': None}
     
-    # Store candidates to prioritize later: (value, priority_score, voltages)
+    # Best candidate per voltage by score:
+    # Score 100: "Tariff for all voltages" table (no better candidate can appear)
     # Score 10: Specific Tariff Table
-    # Score 5: General match
-    candidates_list = []
+    # Score 1: General match
+    selector = BestPerKey(keys=energy_charges.keys(), max_rank=100)
 
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 headers = [str(h).lower() for h in data.get("headers", []) if h]
                 
@@ -353,7 +377,7 @@ def extract_energy_charges(jsonl_path):
 
                 if is_energy_table:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         
                         # SKIP Surcharges, Rebates, Peak/Off-Peak adjustments
@@ -395,24 +419,14 @@ def extract_energy_charges(jsonl_path):
                                             if "tariff for all voltages" in heading: score = 100
                                             elif "tariff" in heading: score = 10
                                             
-                                            candidates_list.append({
-                                                'val': found_val,
-                                                'score': score,
-                                                'volts': volts_found
-                                            })
+                                            selector.offer_many(volts_found, score, found_val)
                                 except: pass
 
             except: pass
+            # Every voltage already has a top-score value, stop scanning
+            if selector.done: break
     
-    # Process candidates by priority
-    # Sort by score descending
-    candidates_list.sort(key=lambda x: x['score'], reverse=True)
-    
-    for cand in candidates_list:
-        val = cand['val']
-        for v_key in cand['volts']:
-            if energy_charges[v_key] is None:
-                energy_charges[v_key] = val
+    energy_charges.update(selector.values())
             
     # Default to NA if not found
     for k in energy_charges:
@@ -422,6 +436,7 @@ def extract_energy_charges(jsonl_path):
     print(f"Extracted Energy Charges: {energy_charges}")
     return energy_charges
 
+@traced
 def extract_fuel_surcharge(jsonl_path):
     fuel_surcharge = None
     keywords = [
@@ -435,7 +450,7 @@ def extract_fuel_surcharge(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
@@ -443,7 +458,7 @@ def extract_fuel_surcharge(jsonl_path):
                 match_found = any(k in heading for k in keywords)
                 
                 if match_found:
-                    for row in rows:
+                    for row in trace.rows(rows):
                          for v in row.values():
                             try:
                                 clean = re.sub(r'[^\d\.]', '', str(v))
@@ -452,11 +467,12 @@ def extract_fuel_surcharge(jsonl_path):
                                     # Heuristic: Fuel surcharge is usually small, e.g. 0.10 to 3.00 Rs/kWh
                                     if 0.0 < f_v < 5.0:
                                         fuel_surcharge = f_v
+                                        trace.match(f_v)
                             except: pass
                 
                 # Also check row content just in case
                 if not fuel_surcharge:
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if any(k in row_txt for k in keywords):
                              for v in row.values():
@@ -466,6 +482,7 @@ def extract_fuel_surcharge(jsonl_path):
                                         f_v = float(clean)
                                         if 0.0 < f_v < 5.0:
                                             fuel_surcharge = f_v
+                                            trace.match(f_v)
                                 except: pass
             except: pass
 
@@ -475,20 +492,21 @@ def extract_fuel_surcharge(jsonl_path):
     print(f"Extracted Fuel Surcharge: {fuel_surcharge}")
     return fuel_surcharge
 
+@traced
 def extract_pfa_rebate(jsonl_path):
     pfa_rebate = None
     
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 # Broaden search: Power Factor AND (Rebate OR Discount OR Incentive OR Adjustment)
                 if "power factor" in heading and any(k in heading for k in ["rebate", "discount", "incentive", "adjustment"]):
                     # This is likely the table
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         # Look for percentage (1%, 0.5%)
                         for v in row.values():
@@ -501,6 +519,7 @@ def extract_pfa_rebate(jsonl_path):
                                         f_v = float(clean)
                                         if 0 < f_v < 15: # 1% to 15% reasonable
                                             pfa_rebate = val_str.strip()
+                                            trace.match(pfa_rebate)
                                             break
                                 except: pass
                         if pfa_rebate: break
@@ -514,6 +533,7 @@ def extract_pfa_rebate(jsonl_path):
     print(f"Extracted PFA Rebate: {pfa_rebate}")
     return pfa_rebate
 
+@traced
 def extract_load_factor_incentive(jsonl_path):
     lf_incentive = None
     keywords = ["load factor incentive", "load factor rebate"]
@@ -521,13 +541,13 @@ def extract_load_factor_incentive(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 # Check keywords
                 if any(k in heading for k in keywords):
-                     for row in rows:
+                     for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         # Often specified as "X paise / kWh" or "Rs X / kwh" or "%"
                         for v in row.values():
@@ -550,6 +570,7 @@ def extract_load_factor_incentive(jsonl_path):
                                             
                                         if found_val:
                                             lf_incentive = found_val
+                                            trace.match(found_val)
                                             break
                                 except: pass
                             
@@ -561,7 +582,7 @@ def extract_load_factor_incentive(jsonl_path):
                 
                 if not lf_incentive:
                     # Check row level
-                     for row in rows:
+                     for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if any(k in row_txt for k in keywords):
                             for v in row.values():
@@ -572,9 +593,11 @@ def extract_load_factor_incentive(jsonl_path):
                                         f_v = float(clean)
                                         if 0 < f_v < 10: # Assuming Rs/kWh
                                              lf_incentive = f_v
+                                             trace.match(f_v)
                                              break
                                         elif 10 <= f_v < 1000:
                                              lf_incentive = f_v / 100.0
+                                             trace.match(lf_incentive)
                                              break
                                 except: pass
                         if lf_incentive: break
@@ -588,6 +611,7 @@ def extract_load_factor_incentive(jsonl_path):
     print(f"Extracted LF Incentive: {lf_incentive}")
     return lf_incentive
 
+@traced
 def extract_grid_support_charges(jsonl_path):
     grid_support = None
     keywords = ["grid support", "parallel operation", "parallel"]
@@ -595,14 +619,14 @@ def extract_grid_support_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 # Check keywords in heading
                 if any(k in heading for k in keywords) and "charge" in heading:
                      # This is likely the table
-                     for row in rows:
+                     for row in trace.rows(rows):
                          # Look for currency values
                         for v in row.values():
                             val_str = str(v).lower()
@@ -617,13 +641,14 @@ def extract_grid_support_charges(jsonl_path):
                                     # Let's look for reasonable float values.
                                     if 0 < f_v < 50:
                                         grid_support = f_v
+                                        trace.match(f_v)
                                         break
                             except: pass
                         if grid_support: break
                 
                 if not grid_support:
                     # Check row level
-                     for row in rows:
+                     for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if any(k in row_txt for k in keywords):
                             for v in row.values():
@@ -633,6 +658,7 @@ def extract_grid_support_charges(jsonl_path):
                                         f_v = float(clean)
                                         if 0 < f_v < 50: 
                                              grid_support = f_v
+                                             trace.match(f_v)
                                              break
                                 except: pass
                         if grid_support: break
@@ -646,6 +672,7 @@ def extract_grid_support_charges(jsonl_path):
     print(f"Extracted Grid Support Charges: {grid_support}")
     return grid_support
 
+@traced
 def extract_voltage_rebates(jsonl_path):
     rebates = {'33_66': "NA", '132_plus': "NA"}
     keywords = ["rebate", "incentive", "concession"]
@@ -653,7 +680,7 @@ def extract_voltage_rebates(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
@@ -661,7 +688,7 @@ def extract_voltage_rebates(jsonl_path):
                 # Many states have "EHV Rebate" or "Voltage Rebate"
                 is_volt_table = "voltage" in heading or "ehv" in heading or "eht" in heading or "ht" in heading
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     row_txt = str(row).lower()
                     
                     if not (any(k in row_txt for k in keywords) or (any(k in heading for k in keywords) and is_volt_table)):
@@ -694,11 +721,13 @@ def extract_voltage_rebates(jsonl_path):
                                     if found is not None:
                                         if rebates[category] == "NA" or found > (rebates[category] if isinstance(rebates[category], float) else 0):
                                             rebates[category] = found
+                                            trace.match(found)
                             except: pass
             except: pass
             
     return rebates
 
+@traced
 def extract_bulk_consumption_rebate(jsonl_path):
     """Extract Bulk Consumption Rebate in INR/kWh. Returns NA if not found."""
     # Based on search, no explicit "Bulk Consumption Rebate" value was found.
@@ -901,73 +930,76 @@ def update_excel_with_discoms(discoms, ists_loss, insts_loss, wheeling_losses, w
         print(f"Error updating Excel: {e}")
 
 if __name__ == "__main__":
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        base_dir = workspace_root()
     
-    # 1. JSONL finding
-    # Search for Madhya Pradesh folder in Extraction
-    extraction_root = os.path.join(base_dir, "Extraction")
-    jsonl_file = None
+        # 1. JSONL finding
+        # Search for Madhya Pradesh folder in Extraction
+        extraction_root = os.path.join(base_dir, "Extraction")
+        jsonl_file = None
     
-    if os.path.exists(extraction_root):
-        for dirname in os.listdir(extraction_root):
-            if "madhya" in dirname.lower() or "madya" in dirname.lower():
-                state_dir = os.path.join(extraction_root, dirname)
-                if os.path.isdir(state_dir):
-                    for f in os.listdir(state_dir):
-                        if f.endswith(".jsonl"):
-                            jsonl_file = os.path.join(state_dir, f)
-                            break
-                if jsonl_file: break
-
-    # 2. Excel Path (Must match app.py state name "Madhya Pradesh")
-    excel_file = os.path.join(base_dir, "Madhya Pradesh.xlsx")
+        if os.path.exists(extraction_root):
+            for dirname in os.listdir(extraction_root):
+                if "madhya" in dirname.lower() or "madya" in dirname.lower():
+                    state_dir = os.path.join(extraction_root, dirname)
+                    if os.path.isdir(state_dir):
+                        for f in os.listdir(state_dir):
+                            if f.endswith(".jsonl"):
+                                jsonl_file = os.path.join(state_dir, f)
+                                break
+                    if jsonl_file: break
+
+        # 2. Excel Path (Must match app.py state name "Madhya Pradesh")
+        excel_file = os.path.join(base_dir, "Madhya Pradesh.xlsx")
     
-    # 3. ISTS Path
-    ists_loss_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
+        # 3. ISTS Path
+        ists_loss_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
 
-    print(f"Target JSONL: {jsonl_file}")
+        print(f"Target JSONL: {jsonl_file}")
     
-    if jsonl_file and os.path.exists(jsonl_file):
-        ists_val = extract_ists_loss(ists_loss_file)
+        if jsonl_file and os.path.exists(jsonl_file):
+            ists_val = extract_ists_loss(ists_loss_file)
 
-        discom_file_output = os.path.join(base_dir, "discoms_mp.txt") 
-        discoms = extract_discom_names(jsonl_file, discom_file_output)
+            discom_file_output = os.path.join(base_dir, "discoms_mp.txt") 
+            discoms = extract_discom_names(jsonl_file, discom_file_output)
         
-        insts = extract_losses(jsonl_file)
-        wheeling = extract_wheeling_losses(jsonl_file)
-        css = extract_css_charges(jsonl_file)
-        fixed = extract_fixed_charges(jsonl_file)
-        energy = extract_energy_charges(jsonl_file)
-        fuel = extract_fuel_surcharge(jsonl_file)
-        wheeling_chg = extract_wheeling_charges(jsonl_file)
-        pfa = extract_pfa_rebate(jsonl_file)
-        lf_inc = extract_load_factor_incentive(jsonl_file)
-        grid_sup = extract_grid_support_charges(jsonl_file)
-        volt_reb = extract_voltage_rebates(jsonl_file)
-        bulk_reb = extract_bulk_consumption_rebate(jsonl_file)
-        add_surchg = extract_additional_surcharge(jsonl_file)
-        insts_charges = extract_transmission_charges(jsonl_file)
-        ists_charges = "NA" # Set to NA if no separate ISTS per-unit found
-
-        update_excel_with_discoms(
-            discoms,
-            ists_val,
-            insts,
-            wheeling,
-            wheeling_chg,
-            css,
-            fixed,
-            energy,
-            fuel,
-            pfa,
-            lf_inc,
-            grid_sup,
-            volt_reb,
-            bulk_reb,
-            add_surchg,
-            insts_charges,
-            ists_charges,
-            excel_file
-        )
-    else:
-        print("No JSONL file found for Madhya Pradesh. Scraper might need to run.")
+            insts = extract_losses(jsonl_file)
+            wheeling = extract_wheeling_losses(jsonl_file)
+            css = extract_css_charges(jsonl_file)
+            fixed = extract_fixed_charges(jsonl_file)
+            energy = extract_energy_charges(jsonl_file)
+            fuel = extract_fuel_surcharge(jsonl_file)
+            wheeling_chg = extract_wheeling_charges(jsonl_file)
+            pfa = extract_pfa_rebate(jsonl_file)
+            lf_inc = extract_load_factor_incentive(jsonl_file)
+            grid_sup = extract_grid_support_charges(jsonl_file)
+            volt_reb = extract_voltage_rebates(jsonl_file)
+            bulk_reb = extract_bulk_consumption_rebate(jsonl_file)
+            add_surchg = extract_additional_surcharge(jsonl_file)
+            insts_charges = extract_transmission_charges(jsonl_file)
+            ists_charges = "NA" # Set to NA if no separate ISTS per-unit found
+
+            update_excel_with_discoms(
+                discoms,
+                ists_val,
+                insts,
+                wheeling,
+                wheeling_chg,
+                css,
+                fixed,
+                energy,
+                fuel,
+                pfa,
+                lf_inc,
+                grid_sup,
+                volt_reb,
+                bulk_reb,
+                add_surchg,
+                insts_charges,
+                ists_charges,
+                excel_file
+            )
+        else:
+            print("No JSONL file found for Madhya Pradesh. Scraper might need to run.")
+    finally:
+        write_report("Madhya Pradesh")
@@ -8,8 +8,18 @@ try:
 except ImportError:
     DB_SUCCESS = False
 from datetime import datetime
+from extraction_cache import cached_extractor
+import extractor_trace as trace
+from extractor_trace import traced
+from workspace import workspace_root
+from database.table_index import candidate_lines
 
+# Bump whenever extraction logic below changes so cached results are invalidated
+EXTRACTOR_VERSION = "1"
 
+
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_discom_names(jsonl_path):
     discom_names = []
     import urllib.parse, re
@@ -30,16 +40,20 @@ def extract_discom_names(jsonl_path):
     
     return discom_names
 
+@traced
 def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constraint=lambda x: True):
     if not jsonl_path or not os.path.exists(jsonl_path): return "NA"
+    # Only parse lines whose heading can match, when the table index covers this file
+    candidates = candidate_lines(jsonl_path, table_keywords)
     with open(jsonl_path, 'r', encoding='utf-8') as f:
-        for line in f:
+        for line_no, line in enumerate(f):
+            if candidates is not None and line_no not in candidates: continue
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 heading_match = all(k.lower() in h for k in table_keywords)
                 if heading_match:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if all(k.lower() in row_txt for k in row_keywords):
                             for v in list(row.values())[::-1]:
@@ -49,22 +63,25 @@ def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constrai
                                     if clean:
                                         f_v = float(clean)
                                         if value_constraint(f_v):
+                                            trace.match(v)
                                             return str(v).strip()
                                 except: pass
             except: pass
     return "NA"
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_losses(jsonl_path):
     insts_loss = None
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 if "power factor" in heading and ("rebate" in heading or "adjustment" in heading):
-                     for row in rows:
+                     for row in trace.rows(rows):
                         # Logic to extract value if present
                          pass
                 
@@ -82,7 +99,7 @@ def extract_losses(jsonl_path):
 
                 is_accurate_year = fy_long in heading or fy_full in heading or fy_short in heading or str(fy_start) in heading
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     def get_pct(r):
                         cands = []
                         for k, v in r.items():
@@ -102,11 +119,13 @@ def extract_losses(jsonl_path):
                     if "intra" in row_txt and "state" in row_txt and "transmission" in row_txt and "loss" in row_txt:
                         val = get_pct(row)
                         if val:
-                            if is_accurate_year or "2.61" in val: insts_loss = val
+                            if is_accurate_year or "2.61" in val: insts_loss = val; trace.match(val)
             except: pass
     print(f"Extracted InSTS Loss: {insts_loss}")
     return insts_loss
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_wheeling_losses(jsonl_path):
     losses = {'11': None, '33': None, '66': None, '132': None}
     common_loss = None
@@ -115,16 +134,17 @@ def extract_wheeling_losses(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 if any(k in heading for k in target_keywords):
                     # Check for accurate year if possible, or just take the latest relevant table
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         # Extract percentage value
                         val = next((str(v).strip() for v in row.values() if v and "%" in str(v)), None)
                         if not val: continue
+                        trace.match(val)
                         
                         # Voltage specific checks
                         if "33 kv" in row_txt or "33kv" in row_txt:
@@ -149,10 +169,14 @@ def extract_wheeling_losses(jsonl_path):
     print(f"Extracted Wheeling Losses: {losses}")
     return losses
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_transmission_charges(jsonl_path):
     # Search for PGCIL or Transmission Charges in Meghalaya
     return find_value_in_jsonl(jsonl_path, ["transmission", "charge"], ["rs/kwh"], lambda x: 0.1 <= x <= 2.0)
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_wheeling_charges(jsonl_path):
     charges = {'11': None, '33': None, '66': None, '132': None}
     common_charge = None
@@ -161,11 +185,11 @@ def extract_wheeling_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 if any(k in heading for k in target_keywords):
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         
                         # Find value: look for likely matches
@@ -189,6 +213,7 @@ def extract_wheeling_charges(jsonl_path):
                                 except: pass
                         
                         if not val: continue
+                        trace.match(val)
                         
                         if "33 kv" in row_txt or "33kv" in row_txt:
                             charges['33'] = val
@@ -212,18 +237,20 @@ def extract_wheeling_charges(jsonl_path):
     print(f"Extracted Wheeling Charges: {charges}")
     return charges
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_additional_surcharge(jsonl_path):
     add_surcharge = None
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 # Check for specific approval table (e.g. Table 68)
                 if "additional surcharge" in heading and "industrial" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         # specific "Approved" column search
                         val = None
@@ -239,6 +266,7 @@ def extract_additional_surcharge(jsonl_path):
                             # Prioritize EHT or non-zero 
                             if val > 0:
                                 add_surcharge = val
+                                trace.match(val)
                                 # If we found a positive value for Industrial EHT, this is likely what we want
                                 if "eht" in row_txt and "industrial" in row_txt:
                                     break
@@ -247,7 +275,7 @@ def extract_additional_surcharge(jsonl_path):
                 # Fallback: determination table if nothing found yet
                 if not add_surcharge and "additional surcharge" in heading and "determination" in heading:
                      rows = data.get("rows", [])
-                     for row in rows:
+                     for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if "per unit" in row_txt and "additional surcharge" in row_txt:
                              for k, v in row.items():
@@ -255,6 +283,7 @@ def extract_additional_surcharge(jsonl_path):
                                      clean = re.sub(r'[^\d\.]', '', str(v))
                                      if clean and 0.1 < float(clean) < 10:
                                          add_surcharge = float(clean)
+                                         trace.match(clean)
                                          break
                                 except: pass
             except: pass
@@ -262,6 +291,8 @@ def extract_additional_surcharge(jsonl_path):
     print(f"Extracted Additional Surcharge: {add_surcharge}")
     return add_surcharge
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_css_charges(jsonl_path):
     charges = {'11': None, '33': None, '66': None, '132': None, '220': None}
     
@@ -269,12 +300,12 @@ def extract_css_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if "cross-subsidy surcharge of industrial" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         if "industrial" in row_txt:
                             # Extract HT and EHT keys
@@ -290,6 +321,7 @@ def extract_css_charges(jsonl_path):
                                 elif "eht" in k.lower():
                                     eht_val = str(f_v)
                             
+                            if ht_val or eht_val: trace.match((ht_val, eht_val))
                             if ht_val:
                                 charges['11'] = ht_val
                                 charges['33'] = ht_val
@@ -308,14 +340,14 @@ def extract_css_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 if "computation of cross subsidy surcharge" in heading and "ferro" not in heading:
                     rows = data.get("rows", [])
                     is_ht = False
                     is_eht = False
                     
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         
                         # Identify level
@@ -341,6 +373,7 @@ def extract_css_charges(jsonl_path):
                             # Sanity check
                             try:
                                 if 0.01 < float(target_val) < 10:
+                                    if is_ht or is_eht: trace.match(target_val)
                                     if is_ht:
                                         charges['11'] = target_val
                                         charges['33'] = target_val
@@ -354,6 +387,8 @@ def extract_css_charges(jsonl_path):
     print(f"Extracted CSS Charges (Computation): {charges}")
     return charges
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_fixed_energy_charges(jsonl_path):
     fixed_charges = {'11': 'NA', '33': 'NA', '66': 'NA', '132': 'NA', '220': 'NA'}
     energy_charges = {'11': 'NA', '33': 'NA', '66': 'NA', '132': 'NA', '220': 'NA'}
@@ -361,7 +396,7 @@ def extract_fixed_energy_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 # Target Table 52: Approved Category wise Tariffs
@@ -370,7 +405,7 @@ def extract_fixed_energy_charges(jsonl_path):
                     found_ht = False
                     found_eht = False
                     
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         cat = row.get("Category", "")
                         if not cat: continue
@@ -419,12 +454,14 @@ def extract_fixed_energy_charges(jsonl_path):
 
                         # Industrial HT -> 11kV, 33kV
                         if "industrial" in cat and "ht" in cat:
+                            trace.match((fc_val, ec_val), note="Industrial HT")
                             if fc_val: fixed_charges['11'] = fc_val; fixed_charges['33'] = fc_val
                             if ec_val: energy_charges['11'] = ec_val; energy_charges['33'] = ec_val
                             found_ht = True
                         
                         # Industries EHT -> 66kV, 132kV, 220kV
                         elif "industries" in cat and "eht" in cat:
+                            trace.match((fc_val, ec_val), note="Industries EHT")
                             if fc_val: 
                                 fixed_charges['66'] = fc_val
                                 fixed_charges['132'] = fc_val
@@ -442,6 +479,8 @@ def extract_fixed_energy_charges(jsonl_path):
     print(f"Extracted Energy Charges: {energy_charges}")
     return fixed_charges, energy_charges
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_pf_rebate(jsonl_path):
     pf_rebate = "NA"
     keywords = ["power factor adjustment rebate", "power factor adjustment discount"]
@@ -449,12 +488,12 @@ def extract_pf_rebate(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if any(k in heading for k in keywords):
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         # Strict check: must be numeric and likely Rs/kWh (small positive number)
                         # Ignore percentages
@@ -470,6 +509,7 @@ def extract_pf_rebate(jsonl_path):
                                          # Rebates usually small, e.g. 0.01 to 1.0
                                          if 0.001 < f_v < 1.0:
                                              pf_rebate = clean
+                                             trace.match(v)
                                              break
                                  except: pass
                         if pf_rebate != "NA": break
@@ -479,6 +519,8 @@ def extract_pf_rebate(jsonl_path):
     print(f"Extracted PF Rebate: {pf_rebate}")
     return pf_rebate
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_load_factor_incentive(jsonl_path):
     lf_incentive = "NA"
     keywords = ["load factor incentive", "load factor discount"]
@@ -486,12 +528,12 @@ def extract_load_factor_incentive(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if any(k in heading for k in keywords):
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         for v in row.values():
                             try:
@@ -504,6 +546,7 @@ def extract_load_factor_incentive(jsonl_path):
                                      # Incentive usually small < 2 Rs/kWh
                                      if 0.01 < val < 2.0:
                                          lf_incentive = clean
+                                         trace.match(v)
                                          break
                             except: pass
                         if lf_incentive != "NA": break
@@ -513,6 +556,8 @@ def extract_load_factor_incentive(jsonl_path):
     print(f"Extracted LF Incentive: {lf_incentive}")
     return lf_incentive
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_fuel_surcharge(jsonl_path):
     fuel_surcharge = "NA"
     keywords = ["fuel adjustment cost", "fpppa", "fuel surcharge", "fppca", "energy charge adjustment", "fppas"]
@@ -520,12 +565,12 @@ def extract_fuel_surcharge(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if any(k in heading for k in keywords):
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         # Look for a value
                         for v in row.values():
@@ -535,6 +580,7 @@ def extract_fuel_surcharge(jsonl_path):
                                      val = float(clean)
                                      if 0.01 < val < 5.0: # Logic for Rs/kWh
                                          fuel_surcharge = clean
+                                         trace.match(v)
                                          break
                             except: pass
                         if fuel_surcharge != "NA": break
@@ -544,19 +590,21 @@ def extract_fuel_surcharge(jsonl_path):
     print(f"Extracted Fuel Surcharge: {fuel_surcharge}")
     return fuel_surcharge
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_tod_charges(jsonl_path):
     tod_charges = "NA"
     
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if "time of day" in heading and ("tariff" in heading or "charges" in heading):
                     rows = data.get("rows", [])
                     # strict numeric search
-                    for row in rows:
+                    for row in trace.rows(rows):
                         for v in row.values():
                              if not v: continue
                              s_v = str(v).lower()
@@ -574,6 +622,7 @@ def extract_tod_charges(jsonl_path):
                                      # If the table has explicit "Rs. /kVAh" header (which it does), and a value like 1.0, 2.0
                                      if 0.1 < val < 10.0:
                                          tod_charges = clean
+                                         trace.match(v)
                                          break
                              except: pass
                         if tod_charges != "NA": break
@@ -582,6 +631,8 @@ def extract_tod_charges(jsonl_path):
     print(f"Extracted TOD Charges: {tod_charges}")
     return tod_charges
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_grid_support_charges(jsonl_path):
     grid_support_charges = "NA"
     keywords = ["grid support", "parallel support", "parallel operation"]
@@ -589,12 +640,12 @@ def extract_grid_support_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if any(k in heading for k in keywords):
                      rows = data.get("rows", [])
-                     for row in rows:
+                     for row in trace.rows(rows):
                          row_txt = str(row).lower()
                          # Look for charges
                          for v in row.values():
@@ -608,6 +659,7 @@ def extract_grid_support_charges(jsonl_path):
                                      # Grid support usually non-zero and reasonable
                                      if 0.01 < val < 10.0:
                                          grid_support_charges = clean
+                                         trace.match(v)
                                          break
                              except: pass
                          if grid_support_charges != "NA": break
@@ -617,6 +669,8 @@ def extract_grid_support_charges(jsonl_path):
     print(f"Extracted Grid Support Charges: {grid_support_charges}")
     return grid_support_charges
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_voltage_rebate(jsonl_path):
     voltage_rebate = {'33_66': "NA", '132': "NA"}
     keywords = ["ht rebate", "ehv rebate", "voltage rebate", "supply at higher voltage", "voltage discount"]
@@ -624,12 +678,12 @@ def extract_voltage_rebate(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if any(k in heading for k in keywords):
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         
                         # looking for values
@@ -647,6 +701,7 @@ def extract_voltage_rebate(jsonl_path):
                              except: pass
                         
                         if val:
+                            trace.match(val)
                             if "33" in row_txt or "66" in row_txt or "ht" in row_txt:
                                 voltage_rebate['33_66'] = val
                             if "132" in row_txt or "eht" in row_txt:
@@ -656,6 +711,8 @@ def extract_voltage_rebate(jsonl_path):
     print(f"Extracted Voltage Rebate: {voltage_rebate}")
     return voltage_rebate
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_bulk_rebate(jsonl_path):
     bulk_rebate = "NA"
     keywords = ["bulk consumption rebate", "bulk rebate", "consumption rebate"]
@@ -663,12 +720,12 @@ def extract_bulk_rebate(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if any(k in heading for k in keywords):
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         for v in row.values():
                             if not v: continue
@@ -679,6 +736,7 @@ def extract_bulk_rebate(jsonl_path):
                                     val = float(clean)
                                     if 0.01 < val < 10.0:
                                         bulk_rebate = clean
+                                        trace.match(v)
                                         break
                             except: pass
                         if bulk_rebate != "NA": break
@@ -691,6 +749,8 @@ def extract_bulk_rebate(jsonl_path):
     print(f"Extracted Bulk Rebate: {bulk_rebate}")
     return bulk_rebate
 
+@traced
+@cached_extractor(EXTRACTOR_VERSION)
 def extract_ists_loss(json_path):
     try:
         if os.path.exists(json_path):
@@ -856,58 +916,61 @@ def update_excel_with_discoms(discom_names, ists_loss, insts_loss, wheel_losses,
     print(f"Updated {excel_path} with accurate values.")
 
 if __name__ == "__main__":
-    import sys
-    # sys.stdout = open('debug_log.txt', 'w', encoding='utf-8')
+    try:
+        import sys
+        # sys.stdout = open('debug_log.txt', 'w', encoding='utf-8')
     
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+        base_dir = workspace_root()
     
-    # Dynamic JSONL finding
-    extraction_root = os.path.join(base_dir, "Extraction")
-    j_f = None
+        # Dynamic JSONL finding
+        extraction_root = os.path.join(base_dir, "Extraction")
+        j_f = None
     
-    # Search for Meghalaya folder
-    if os.path.exists(extraction_root):
-        for dirname in os.listdir(extraction_root):
-            if "meghalaya" in dirname.lower():
-                state_dir = os.path.join(extraction_root, dirname)
-                if os.path.isdir(state_dir):
-                    for f in os.listdir(state_dir):
-                        if f.endswith(".jsonl"):
-                            j_f = os.path.join(state_dir, f)
-                            break
-            if j_f: break
+        # Search for Meghalaya folder
+        if os.path.exists(extraction_root):
+            for dirname in os.listdir(extraction_root):
+                if "meghalaya" in dirname.lower():
+                    state_dir = os.path.join(extraction_root, dirname)
+                    if os.path.isdir(state_dir):
+                        for f in os.listdir(state_dir):
+                            if f.endswith(".jsonl"):
+                                j_f = os.path.join(state_dir, f)
+                                break
+                if j_f: break
     
-    # Fallback/Check
-    if not j_f:
-         # Try expecting exact folder name if loose search failed
-         target = os.path.join(extraction_root, "Meghalaya", "MePDCL ARR & Tariff Order FY 2025-26.jsonl")
-         if os.path.exists(target):
-             j_f = target
-
-    ists_j_f = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
-    e_f = os.path.join(base_dir, "Meghalaya.xlsx")
+        # Fallback/Check
+        if not j_f:
+             # Try expecting exact folder name if loose search failed
+             target = os.path.join(extraction_root, "Meghalaya", "MePDCL ARR & Tariff Order FY 2025-26.jsonl")
+             if os.path.exists(target):
+                 j_f = target
+
+        ists_j_f = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
+        e_f = os.path.join(base_dir, "Meghalaya.xlsx")
     
-    print(f"Targeting JSONL: {j_f}")
+        print(f"Targeting JSONL: {j_f}")
     
-    if j_f and os.path.exists(j_f):
-        names = extract_discom_names(j_f)
-        ists_l = extract_ists_loss(ists_j_f)
-        insts_l = extract_losses(j_f)
-        w_l = extract_wheeling_losses(j_f)
-        insts_c = extract_transmission_charges(j_f)
-        w_c = extract_wheeling_charges(j_f)
-        css_c = extract_css_charges(j_f)
-        add_s = extract_additional_surcharge(j_f)
-        fc, ec = extract_fixed_energy_charges(j_f)
-        pf_r = extract_pf_rebate(j_f)
-        lf_i = extract_load_factor_incentive(j_f)
-        fs = extract_fuel_surcharge(j_f)
-        tod = extract_tod_charges(j_f)
-        gs = extract_grid_support_charges(j_f)
-        vr = extract_voltage_rebate(j_f)
-        br = extract_bulk_rebate(j_f)
+        if j_f and os.path.exists(j_f):
+            names = extract_discom_names(j_f)
+            ists_l = extract_ists_loss(ists_j_f)
+            insts_l = extract_losses(j_f)
+            w_l = extract_wheeling_losses(j_f)
+            insts_c = extract_transmission_charges(j_f)
+            w_c = extract_wheeling_charges(j_f)
+            css_c = extract_css_charges(j_f)
+            add_s = extract_additional_surcharge(j_f)
+            fc, ec = extract_fixed_energy_charges(j_f)
+            pf_r = extract_pf_rebate(j_f)
+            lf_i = extract_load_factor_incentive(j_f)
+            fs = extract_fuel_surcharge(j_f)
+            tod = extract_tod_charges(j_f)
+            gs = extract_grid_support_charges(j_f)
+            vr = extract_voltage_rebate(j_f)
+            br = extract_bulk_rebate(j_f)
         
-        folder_name = os.path.basename(os.path.dirname(j_f))
-        update_excel_with_discoms(names, ists_l, insts_l, w_l, insts_c, w_c, css_c, add_s, fc, ec, pf_r, lf_i, fs, tod, gs, vr, br, e_f, folder_name=folder_name, pdf_name=os.path.basename(j_f))
-    else:
-        print("Meghalaya JSONL file not found. Please ensure scraper has run.")
+            folder_name = os.path.basename(os.path.dirname(j_f))
+            update_excel_with_discoms(names, ists_l, insts_l, w_l, insts_c, w_c, css_c, add_s, fc, ec, pf_r, lf_i, fs, tod, gs, vr, br, e_f, folder_name=folder_name, pdf_name=os.path.basename(j_f))
+        else:
+            print("Meghalaya JSONL file not found. Please ensure scraper has run.")
+    finally:
+        trace.write_report("Meghalaya")
@@ -7,18 +7,23 @@ try:
     DB_SUCCESS = True
 except ImportError:
     DB_SUCCESS = False
+import extractor_trace as trace
+from extractor_trace import traced, write_report
+from workspace import workspace_root
 from datetime import datetime
+from candidate_selector import BestPerKey
 
+@traced
 def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constraint=lambda x: True):
     if not jsonl_path or not os.path.exists(jsonl_path): return "NA"
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 heading_match = all(k.lower() in h for k in table_keywords)
                 if heading_match:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if all(k.lower() in row_txt for k in row_keywords):
                             for v in list(row.values())[::-1]:
@@ -28,15 +33,18 @@ def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constrai
                                     if clean:
                                         f_v = float(clean)
                                         if value_constraint(f_v):
+                                            trace.match(str(v).strip())
                                             return str(v).strip()
                                 except: pass
             except: pass
     return "NA"
 
+@traced
 def extract_transmission_charges(jsonl_path):
     # Search for PGCIL or Transmission Charges in Rajasthan
     return find_value_in_jsonl(jsonl_path, ["transmission", "charge"], ["rs/kwh"], lambda x: 0.1 <= x <= 2.0)
 
+@traced
 def extract_discom_names(jsonl_path):
     discom_names = set()
     table_keywords = ["discom", "distribution companies"] 
@@ -52,7 +60,7 @@ def extract_discom_names(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 if any(k in heading for k in table_keywords):
                     for h in data.get("headers", []):
@@ -77,6 +85,7 @@ def extract_discom_names(jsonl_path):
     sorted_names = sorted(list(discom_names))
     return sorted_names
 
+@traced
 def extract_losses(jsonl_path):
     insts_loss = None
     
@@ -84,9 +93,9 @@ def extract_losses(jsonl_path):
         for line in f:
             if insts_loss: break
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 rows = data.get("rows", [])
-                for row in rows:
+                for row in trace.rows(rows):
                     if not row: continue
                     r_txt = str(row).lower()
                     
@@ -116,22 +125,23 @@ def extract_losses(jsonl_path):
 
                     if "intra-state transmission losses" in r_txt:
                         val = get_best_val(row)
-                        if val: insts_loss = val
+                        if val: insts_loss = val; trace.match(val)
             except: pass
             
     # Fallbacks or cleanup
     print(f"Extracted InSTS Loss: {insts_loss}")
     return insts_loss
 
+@traced
 def extract_wheeling_losses(jsonl_path, target_discoms):
-    # results: {discom_name: {voltage_level: {val: value, priority: p}}}
-    results = {}
-    defaults = {} # {voltage_level: {val: value, priority: p}}
+    # Best value per (discom, voltage_level) and per voltage_level for generic rows
+    results = BestPerKey()
+    defaults = BestPerKey()
     
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
@@ -144,7 +154,7 @@ def extract_wheeling_losses(jsonl_path, target_discoms):
                 
                 if priority == 0: continue
 
-                for row in rows:
+                for row in trace.rows(rows):
                     # 1. Identify Discom in Row OR use Heading
                     matched_discom = None
                     row_vals_str = [str(v).lower() for v in row.values() if v]
@@ -209,17 +219,12 @@ def extract_wheeling_losses(jsonl_path, target_discoms):
                     
                     if extracted:
                         if matched_discom:
-                            if matched_discom not in results: results[matched_discom] = {}
                             for kv, val in extracted.items():
-                                existing = results[matched_discom].get(kv)
-                                if not existing or priority > existing['priority']:
-                                    results[matched_discom][kv] = {'val': val, 'priority': priority}
+                                results.offer((matched_discom, kv), priority, val)
                         else:
                             # Generic / Default values
                             for kv, val in extracted.items():
-                                existing = defaults.get(kv)
-                                if not existing or priority > existing['priority']:
-                                    defaults[kv] = {'val': val, 'priority': priority}
+                                defaults.offer(kv, priority, val)
 
             except: pass
     
@@ -227,13 +232,11 @@ def extract_wheeling_losses(jsonl_path, target_discoms):
     final_results = {}
     
     # 1. Fill from extracted results
-    for d, data in results.items():
-        if d not in final_results: final_results[d] = {}
-        for kv, item in data.items():
-            final_results[d][kv] = item['val']
+    for (d, kv), val in results.values().items():
+        final_results.setdefault(d, {})[kv] = val
             
     # 2. Fill missing discoms/voltages from defaults
-    simple_defaults = {k: v['val'] for k, v in defaults.items()}
+    simple_defaults = defaults.values()
     
     for d in target_discoms:
         if d not in final_results:
@@ -247,6 +250,7 @@ def extract_wheeling_losses(jsonl_path, target_discoms):
     print(f"Extracted Dynamic Wheeling Losses: {final_results}")
     return final_results
 
+@traced
 def extract_wheeling_charges(jsonl_path, target_discoms):
     # results: {discom_name: {voltage_level: wheeling_charge_value}}
     w_charges = {}
@@ -256,14 +260,14 @@ def extract_wheeling_charges(jsonl_path, target_discoms):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if ("wheeling" in heading and "transmission" in heading and "cost" in heading):
                     rows = data.get("rows", [])
                     current_matched_discom = None
                     
-                    for row in rows:
+                    for row in trace.rows(rows):
                         # 1. Identify/Update Discom
                         raw_discom = row.get("Discom")
                         if raw_discom:
@@ -289,6 +293,7 @@ def extract_wheeling_charges(jsonl_path, target_discoms):
                                     try:
                                         kv_key = kv.replace("kV", "")
                                         w_charges[current_matched_discom][kv_key] = float(val)
+                                        trace.match(w_charges[current_matched_discom][kv_key])
                                     except: pass
                         
                         # Transmission cost (InSTS Charge)
@@ -300,6 +305,7 @@ def extract_wheeling_charges(jsonl_path, target_discoms):
                                     try:
                                         kv_key = kv.replace("kV", "")
                                         t_charges[current_matched_discom][kv_key] = float(val)
+                                        trace.match(t_charges[current_matched_discom][kv_key])
                                     except: pass
             except: pass
                 
@@ -307,6 +313,7 @@ def extract_wheeling_charges(jsonl_path, target_discoms):
     print(f"Extracted Dynamic Transmission (InSTS) Charges: {t_charges}")
     return w_charges, t_charges
 
+@traced
 def extract_css_charges(jsonl_path, discoms):
     # Dictionary to store CSS: {voltage_level: css_value}
     # Values seem to be same for all Discoms in Table 95
@@ -315,12 +322,12 @@ def extract_css_charges(jsonl_path, discoms):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 if "cross subsidy surcharge" in heading and re.search(r'20\d\d[-20]*\d\d', heading):
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         voltage = str(row.get("Voltage (kV)", "")).lower()
                         if not voltage:
                              # Try alternative key names
@@ -352,27 +359,28 @@ def extract_css_charges(jsonl_path, discoms):
                             clean_css = re.sub(r'[^\d\.]', '', str(css_val))
                             try:
                                 f_css = float(clean_css)
-                                if "33" in voltage: css_values['33'] = f_css
-                                elif "11" in voltage: css_values['11'] = f_css
-                                elif "132" in voltage: css_values['132'] = f_css
-                                elif "220" in voltage: css_values['220'] = f_css
+                                if "33" in voltage: css_values['33'] = f_css; trace.match(f_css)
+                                elif "11" in voltage: css_values['11'] = f_css; trace.match(f_css)
+                                elif "132" in voltage: css_values['132'] = f_css; trace.match(f_css)
+                                elif "220" in voltage: css_values['220'] = f_css; trace.match(f_css)
                             except: pass
             except: pass
             
     print(f"Extracted Dynamic CSS Charges: {css_values}")
     return css_values
 
+@traced
 def extract_additional_surcharge(jsonl_path):
     # Example table 92 "Determination of Additional Surcharge for FY 2024-25"
     add_surcharge = None
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 if "additional surcharge" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_vals = [str(v).lower() for v in row.values() if v]
                         row_txt = " ".join(row_vals)
                         if "per unit" in row_txt and "additional surcharge" in row_txt:
@@ -384,6 +392,7 @@ def extract_additional_surcharge(jsonl_path):
                                         f_v = float(clean)
                                         if 0.05 < f_v < 10:
                                              add_surcharge = f_v
+                                             trace.match(f_v)
                                              break
                                 except: pass
                         if add_surcharge: break
@@ -392,6 +401,7 @@ def extract_additional_surcharge(jsonl_path):
     print(f"Extracted Dynamic Additional Surcharge: {add_surcharge}")
     return add_surcharge
 
+@traced
 def extract_tariff_charges(jsonl_path):
     # Returns {category: {voltage: charges}}
     # Focusing on Large Industrial (LP) category
@@ -401,13 +411,13 @@ def extract_tariff_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 # Target: Table 103 (LP category), 101 (Mixed Load), 102 (Small Industrial)
                 if ("tariff" in heading or "charges" in heading) and ("schedule" in heading):
                     rows = data.get("rows", [])
                     category = None
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         # Detect Category
                         if "lp" in row_txt or "large industrial" in row_txt or "bulk" in row_txt:
@@ -421,23 +431,29 @@ def extract_tariff_charges(jsonl_path):
     # Actually, let's keep it as is for now but prepared for future dynamic extraction
     return {}, {}
 
+@traced
 def extract_pf_rebate(jsonl_path):
     return find_value_in_jsonl(jsonl_path, ["power factor"], ["rebate", "incentive"], lambda x: 0.1 <= x <= 5.0)
 
+@traced
 def extract_load_factor_incentive(jsonl_path):
     return find_value_in_jsonl(jsonl_path, ["load factor"], ["incentive", "rebate"], lambda x: 0.1 <= x <= 5.0)
 
+@traced
 def extract_grid_support_charges(jsonl_path):
     return find_value_in_jsonl(jsonl_path, ["grid support", "parallel operation"], ["charge"], lambda x: 10 <= x <= 100)
 
+@traced
 def extract_voltage_rebates(jsonl_path):
     r33 = find_value_in_jsonl(jsonl_path, ["voltage", "rebate"], ["33", "66"], lambda x: 0.1 <= x <= 5.0)
     r132 = find_value_in_jsonl(jsonl_path, ["voltage", "rebate"], ["132", "220"], lambda x: 0.1 <= x <= 5.0)
     return {'33_66': r33, '132': r132}
 
+@traced
 def extract_bulk_consumption_rebate(jsonl_path):
     return find_value_in_jsonl(jsonl_path, ["bulk", "consumption"], ["rebate"], lambda x: 0.1 <= x <= 5.0)
 
+@traced
 def extract_tod_charges(jsonl_path):
     # ToD charges are typically complex tables. Returning NA unless specific row found.
     return "NA"
@@ -569,6 +585,7 @@ def update_excel(discoms, ists_loss, insts_loss, wheeling_losses, wheeling_charg
     wb.save(excel_path)
     print(f"Updated {excel_path} with {len(discoms)} discoms.")
 
+@traced
 def extract_ists_loss(json_path):
     try:
         if os.path.exists(json_path):
@@ -581,44 +598,47 @@ def extract_ists_loss(json_path):
     return "NA"
 
 if __name__ == "__main__":
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        base_dir = workspace_root()
     
-    # Dynamic JSONL search
-    extraction_root = os.path.join(base_dir, "Extraction")
-    jsonl_file = None
-    if os.path.exists(extraction_root):
-        for d in os.listdir(extraction_root):
-            if "rajasthan" in d.lower() or "rajastan" in d.lower():
-                input_dir = os.path.join(extraction_root, d)
-                for f in os.listdir(input_dir):
-                    if f.endswith(".jsonl"):
-                        jsonl_file = os.path.join(input_dir, f)
-                        break
-            if jsonl_file: break
+        # Dynamic JSONL search
+        extraction_root = os.path.join(base_dir, "Extraction")
+        jsonl_file = None
+        if os.path.exists(extraction_root):
+            for d in os.listdir(extraction_root):
+                if "rajasthan" in d.lower() or "rajastan" in d.lower():
+                    input_dir = os.path.join(extraction_root, d)
+                    for f in os.listdir(input_dir):
+                        if f.endswith(".jsonl"):
+                            jsonl_file = os.path.join(input_dir, f)
+                            break
+                if jsonl_file: break
 
-    excel_file = os.path.join(base_dir, "Rajasthan.xlsx")
-    ists_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
+        excel_file = os.path.join(base_dir, "Rajasthan.xlsx")
+        ists_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
     
-    if jsonl_file:
-        print(f"Target JSONL: {jsonl_file}")
+        if jsonl_file:
+            print(f"Target JSONL: {jsonl_file}")
         
-        discoms = extract_discom_names(jsonl_file)
-        if not discoms: discoms = ["JVVNL", "AVVNL", "JDVVNL"]
+            discoms = extract_discom_names(jsonl_file)
+            if not discoms: discoms = ["JVVNL", "AVVNL", "JDVVNL"]
         
-        ists_l = extract_ists_loss(ists_file)
-        insts_l = extract_losses(jsonl_file)
+            ists_l = extract_ists_loss(ists_file)
+            insts_l = extract_losses(jsonl_file)
         
-        wh_losses = extract_wheeling_losses(jsonl_file, discoms)
-        wh_charges, insts_charges = extract_wheeling_charges(jsonl_file, discoms)
-        css = extract_css_charges(jsonl_file, discoms)
-        add_s = extract_additional_surcharge(jsonl_file)
+            wh_losses = extract_wheeling_losses(jsonl_file, discoms)
+            wh_charges, insts_charges = extract_wheeling_charges(jsonl_file, discoms)
+            css = extract_css_charges(jsonl_file, discoms)
+            add_s = extract_additional_surcharge(jsonl_file)
         
-        pf_r = extract_pf_rebate(jsonl_file)
-        lf_i = extract_load_factor_incentive(jsonl_file)
-        gs_c = extract_grid_support_charges(jsonl_file)
-        volt_reb = extract_voltage_rebates(jsonl_file)
-        bulk_reb = extract_bulk_consumption_rebate(jsonl_file)
+            pf_r = extract_pf_rebate(jsonl_file)
+            lf_i = extract_load_factor_incentive(jsonl_file)
+            gs_c = extract_grid_support_charges(jsonl_file)
+            volt_reb = extract_voltage_rebates(jsonl_file)
+            bulk_reb = extract_bulk_consumption_rebate(jsonl_file)
         
-        update_excel(discoms, ists_l, insts_l, wh_losses, wh_charges, insts_charges, css, add_s, pf_r, lf_i, gs_c, volt_reb, bulk_reb, excel_file)
-    else:
-        print("Required JSONL file not found for Rajasthan.")
+            update_excel(discoms, ists_l, insts_l, wh_losses, wh_charges, insts_charges, css, add_s, pf_r, lf_i, gs_c, volt_reb, bulk_reb, excel_file)
+        else:
+            print("Required JSONL file not found for Rajasthan.")
+    finally:
+        write_report("Rajasthan")
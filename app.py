@@ -1,39 +1,30 @@
+import gzip
+import hashlib
+import json
 import os
-import shutil
-import stat
 import subprocess
 import threading
-import openpyxl
+import time
 from datetime import datetime
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, g, render_template, jsonify, request, stream_with_context
 from dotenv import load_dotenv
+from log_store import LogStore
+import metrics
+from status_registry import StatusRegistry
 
-def delete_folder_contents(folder_path):
-    def remove_readonly(func, path, _):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
-    if os.path.exists(folder_path):
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
-            try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.chmod(file_path, stat.S_IWRITE)
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path, onerror=remove_readonly)
-            except Exception as e:
-                print(f"Failed to delete {file_path}. Reason: {e}")
-
-# Run cleanup at Flask startup
 base_dir = os.path.dirname(os.path.abspath(__file__))
-for folder in ["Extraction", "Download", "ists_pdf", "ists_charge_pdf", "ists_extracted"]:
-    folder_path = os.path.join(base_dir, folder)
-    if os.path.exists(folder_path):
-        delete_folder_contents(folder_path)
 
 load_dotenv()
 
+import sheet_cache  # reads STATE_DATA_SOURCE, so after load_dotenv()
+import job_queue  # reads the AGENT_*_TIMEOUT settings, so after load_dotenv()
+import worker_pool  # reads AGENT_WORKER_POOL, so after load_dotenv()
+from database import run_history  # reads RUN_HISTORY_DB, so after load_dotenv()
+import workspace_gc  # reads STARTUP_CLEANUP and the trash retention, so after load_dotenv()
+import workspace  # reads AGENT_RUN_WORKSPACES, so after load_dotenv()
+import runtime_store  # reads AGENT_RUNTIME, so after load_dotenv()
+import scheduler  # reads AGENT_SCHEDULE, so after load_dotenv()
+
 app = Flask(__name__)
 
 # List of states to display
@@ -48,210 +39,574 @@ STATES = sorted([
     "Delhi", "Jammu and Kashmir", "Ladakh", "Lakshadweep", "Puducherry"
 ])
 
+# Which states have an Excel output, kept up to date by pipeline events
+STATUS = StatusRegistry(STATES, workspace.read_root)
+BOOT_ID = format(int(time.time()), "x")
+
 # Global state
-CURRENT_PROCESSING_STATE = None
-AGENT_LOGS = []
+CURRENT_PROCESSING_STATE = set()  # display names of the pipeline tasks running right now
+STATE_LOCK = threading.Lock()
+# With AGENT_RUNTIME=shared the log and the job/progress state live in SQLite: pipeline_worker.py
+# runs the agent and any number of web processes (wsgi.py) read them
+AGENT_LOGS = runtime_store.SharedLogStore(maxlen=1000) if runtime_store.SHARED else LogStore(maxlen=1000)
+RUNTIME = runtime_store.RuntimeStore() if runtime_store.SHARED else None
 IS_AGENT_RUNNING = False
 
-def run_script(script_name, display_name):
-    global CURRENT_PROCESSING_STATE, AGENT_LOGS
-    CURRENT_PROCESSING_STATE = display_name
+def run_script(script_name, display_name, args=(), timeout=None, job=None, step=None, root=None):
+    """
+    Runs one pipeline script with its output streamed into AGENT_LOGS.
+    The script's process tree is killed after timeout seconds or when the job
+    is cancelled. With root, the script works in that run workspace.
+    Returns the step status: "done", "failed", "timeout" or "cancelled".
+    """
+    started = time.monotonic()
+    status = _run_script(script_name, display_name, args, timeout, job, step, root)
+    metrics.STEP_SECONDS.observe(time.monotonic() - started, step=step or script_name, status=status)
+    return status
+
+def _run_script(script_name, display_name, args, timeout, job, step, root):
     timestamp = datetime.now().strftime("%H:%M:%S")
-    AGENT_LOGS.append(f"[{timestamp}] Starting {script_name}...")
+    AGENT_LOGS.append(f"[{timestamp}] Starting {' '.join([script_name, *args])}...")
     
     # Set UTF-8 encoding environment variable to fix UnicodeEncodeError in scraper.py
     env = os.environ.copy()
     env["PYTHONIOENCODING"] = "utf-8"
+    # The script reports its Prometheus samples on stdout for this process's /metrics
+    run_env = {metrics.PIPE_ENV: "1"}
+    if root:
+        run_env[workspace.WORKSPACE_ENV] = root
+    env.update(run_env)
     
+    def log_line(line):
+        # Metric lines go to /metrics and the step's run history counters, not the monitor
+        sample = metrics.apply_line(line)
+        if sample is not None:
+            counters = run_history.sample_counters(sample)
+            if counters and job is not None:
+                job.add_metrics(step, counters)
+            return
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        # Several scripts can run at once, so tag each line with its task
+        AGENT_LOGS.append(f"[{timestamp}] [{display_name}] {line.strip()}")
+
+    watchdogs = []
+    def watch(process):
+        if job is not None:
+            job.track(step, process)
+        watchdogs.append(job_queue.Watchdog(process.pid, timeout).start())
+
     try:
-        # Using the virtual environment's python if it exists, otherwise fallback to "python"
-        python_exe = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".venv", "Scripts", "python.exe")
-        if not os.path.exists(python_exe):
-            python_exe = "python"
-
-        # Using -u for unbuffered output to ensure real-time logs in the monitor
-        process = subprocess.Popen(
-            [python_exe, "-u", script_name],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
-            env=env
-        )
-        
-        for line in process.stdout:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            AGENT_LOGS.append(f"[{timestamp}] {line.strip()}")
-            if len(AGENT_LOGS) > 1000:
-                AGENT_LOGS.pop(0)
-                
-        process.wait()
-        if process.returncode == 0:
+        if job is not None and job.cancelled:
+            return "cancelled"
+        if worker_pool.POOL_ENABLED:
+            # Warm worker with openpyxl/pdfplumber/selenium already imported
+            returncode = worker_pool.get_pool().run(script_name, args, on_line=log_line, on_process=watch, env=run_env)
+        else:
+            # Using the virtual environment's python if it exists, otherwise fallback to "python"
+            python_exe = worker_pool.default_python()
+
+            # Using -u for unbuffered output to ensure real-time logs in the monitor
+            process = subprocess.Popen(
+                [python_exe, "-u", script_name, *args],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                universal_newlines=True,
+                env=env,
+                **job_queue.process_group_kwargs()
+            )
+            watch(process)
+            
+            for line in process.stdout:
+                log_line(line)
+                    
+            process.wait()
+            returncode = process.returncode
+
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        if job is not None:
+            job.set_exit_code(step, returncode)
+        if job is not None and job.cancelled:
+            AGENT_LOGS.append(f"[{timestamp}] {script_name} cancelled.")
+            return "cancelled"
+        if any(w.fired for w in watchdogs):
+            AGENT_LOGS.append(f"[{timestamp}] Error: {script_name} timed out after {timeout} seconds and was killed.")
+            return "timeout"
+        if returncode == 0:
             AGENT_LOGS.append(f"[{timestamp}] {script_name} finished successfully.")
+            return "done"
         else:
-            AGENT_LOGS.append(f"[{timestamp}] Error: {script_name} exited with code {process.returncode}")
+            AGENT_LOGS.append(f"[{timestamp}] Error: {script_name} exited with code {returncode}")
             
     except Exception as e:
         AGENT_LOGS.append(f"[{timestamp}] Exception: {str(e)}")
+    finally:
+        for w in watchdogs:
+            w.stop()
+        if job is not None:
+            job.untrack(step)
+    return "failed"
+
+def sync_state_to_db(task, job=None, root=None):
+    v = sheet_cache.find_state_excel(task.state, root or base_dir)
+    if v:
+        try:
+            from database.database_utils import sync_excel_to_db
+            rows = sync_excel_to_db(v)
+            if job is not None and rows is not None:
+                job.add_metrics(task.name, {"rows_written": rows})
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] {os.path.basename(v)} synced to SQLite database.")
+            return True
+        except Exception as e:
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] DB Sync Error: {str(e)}")
+            return False
+    return False
+
+def finish_workspace(run_id, succeeded):
+    """Promotes a successful run's workspace to runs/CURRENT (one atomic rename); a failed one goes to the trash"""
+    try:
+        if succeeded:
+            workspace.promote(run_id)
+            pruned = workspace.prune()
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Promoted runs/{run_id} to current"
+                              + (f"; trashed runs {', '.join(pruned)}" if pruned else "") + ".")
+        else:
+            workspace.discard(run_id)
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] runs/{run_id} not promoted; readers keep the previous run.")
+    except OSError as e:
+        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Workspace Error: {str(e)}")
+
+def run_task(task, job=None, root=None):
+    if task.action:
+        return task.action(task)
+    # If we are about to start a full Scraping run, clean previous extraction data
+    if task.script == "scraper.py" and not task.args:
+        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Cleaning previous extracted data...")
+        for folder in ["Extraction", "ists_extracted"]:
+            workspace_gc.move_aside(os.path.join(root or base_dir, folder))
+    started = time.monotonic()
+    status = run_script(task.script, task.display, task.args,
+                        timeout=job_queue.step_timeout(task), job=job, step=task.name, root=root)
+    if task.stage == "extract":
+        metrics.EXTRACTOR_SECONDS.observe(time.monotonic() - started, state=task.state)
+    if job is not None:
+        job.step_finished(task.name, status)
+    return status == "done"
 
-def agent_worker():
-    global IS_AGENT_RUNNING, CURRENT_PROCESSING_STATE, AGENT_LOGS
+def agent_worker(job):
+    global IS_AGENT_RUNNING
     IS_AGENT_RUNNING = True
-    
-    scripts = [
-        ("clear_excels.py", "Clearing Excels"),
-        ("Automation.py", "Automation"),
-        ("Auomation_ists.py", "ISTS Automation"),
-        ("scraper.py", "Scraping"),
-        ("ists.py", "ISTS"),
-        ("chhattisgarh.py", "Chhattisgarh"),
-        ("Meghalaya.py", "Meghalaya"),
-        ("Rajasthan.py", "Rajasthan"),
-        ("Madyapradesh.py", "Madhya Pradesh"),
-        ("bihar.py", "Bihar"),
-        ("puducherry.py", "Puducherry"),
-        ("Himachalpradesh.py", "Himachal Pradesh"),
-        ("Assam.py", "Assam"),
-        ("uttarpradesh.py", "Uttar Pradesh")
-    ]
-    
-    for script, display in scripts:
-        # If we are about to start Scraping, clean previous extraction data
-        if script == "scraper.py":
-            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Cleaning previous extracted data...")
-            for folder in ["Extraction", "ists_extracted"]:
-                folder_path = os.path.join(base_dir, folder)
-                if os.path.exists(folder_path):
-                    delete_folder_contents(folder_path)
-
-        run_script(script, display)
-        # Sync to DB if it's a state script
-        if script not in ["Automation.py", "scraper.py", "ists.py", "Auomation_ists.py"]:
-            state_name = display
-            excel_variants = [f"{state_name}.xlsx", f"{state_name.lower()}.xlsx", f"{state_name.replace(' ', '')}.xlsx"]
-            for v in excel_variants:
-                if os.path.exists(v):
-                    try:
-                        from database.database_utils import sync_excel_to_db
-                        sync_excel_to_db(v)
-                        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] {v} synced to SQLite database.")
-                        break
-                    except Exception as e:
-                        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] DB Sync Error: {str(e)}")
-        
-    CURRENT_PROCESSING_STATE = None
-    IS_AGENT_RUNNING = False
-    AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] All tasks completed.")
+    AGENT_LOGS.reset(f"[{datetime.now().strftime('%H:%M:%S')}] Agent started (job {job.id}).")
+    if job.coalesced:
+        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] {job.coalesced} queued request(s) coalesced into this run.")
+
+    history = None
+    root = None
+
+    def started(task):
+        with STATE_LOCK:
+            CURRENT_PROCESSING_STATE.add(task.display)
+        job.step_started(task.name)
+        try:
+            history.step_started(task)
+        except Exception as e:
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Run History Error: {str(e)}")
+
+    def finished(task, ok):
+        with STATE_LOCK:
+            CURRENT_PROCESSING_STATE.discard(task.display)
+        job.step_finished(task.name, "done" if ok else "failed")
+        if task.state and task.stage in ("extract", "sync"):
+            STATUS.refresh(task.state)
+        # Called from run_graph's scheduling loop: a bad workbook or a busy history
+        # database costs the metric, not the rest of the run
+        if ok and task.state and task.stage == "extract":
+            # State processors write Excel, not stdout counters; count the data rows they produced
+            try:
+                path = sheet_cache.find_state_excel(task.state, root or base_dir)
+                if path:
+                    job.add_metrics(task.name, {"rows_written": max(0, len(sheet_cache.get_sheet(path)[0]) - 2)})
+            except Exception as e:
+                AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Could not count rows of {task.display}: {str(e)}")
+        step = job.step(task.name)
+        try:
+            history.step_finished(task, step["status"], step["exit_code"], step["metrics"])
+        except Exception as e:
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Run History Error: {str(e)}")
+
+    def skipped(task):
+        job.step_finished(task.name, "skipped")
+        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Skipping {task.display}: inputs unchanged since last run.")
+
+    ok = False
+    tasks = []
+    try:
+        # Inside the try: a locked history database or a failed workspace copy must still reset IS_AGENT_RUNNING
+        history = run_history.RunRecorder(job)
+        if workspace.RUN_WORKSPACES:
+            # This run writes into runs/<id>/; readers keep seeing the last promoted run
+            root = workspace.create(history.run_id)
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Workspace: runs/{history.run_id}")
+        from pipeline import build_agent_graph, run_graph, MAX_PARALLEL_TASKS, PIPELINE_MODE
+        mode = job.mode or PIPELINE_MODE
+        states, stages = job.states, job.stages
+        tasks = build_agent_graph(sync_action=lambda task: sync_state_to_db(task, job, root),
+                                  mode=mode, states=states, stages=stages, root=root)
+        job.set_steps(tasks)
+        if states or stages:
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Selection: states={', '.join(states or ['all'])}; stages={', '.join(stages or ['all'])}")
+        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Running {len(tasks)} tasks ({mode} mode), up to {MAX_PARALLEL_TASKS} at a time.")
+        results = run_graph(tasks, lambda task: run_task(task, job, root), max_workers=MAX_PARALLEL_TASKS,
+                            on_start=started, on_finish=finished, on_skip=skipped, cancel_event=job.cancel_event)
+        failed = [t.display for t in tasks if t.script and t.name in results and not results[t.name]]
+        if failed:
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Failed tasks: {', '.join(failed)}")
+        ok = not failed
+    except Exception as e:
+        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Pipeline Error: {str(e)}")
+    finally:
+        with STATE_LOCK:
+            CURRENT_PROCESSING_STATE.clear()
+        if history is not None and workspace.RUN_WORKSPACES:
+            # Also trashes a workspace whose creation failed half-way
+            finish_workspace(history.run_id, ok and not job.cancelled)
+        STATUS.refresh()
+        IS_AGENT_RUNNING = False
+        workspace_gc.collect_garbage_async()
+    if history is not None:
+        try:
+            history.finish("cancelled" if job.cancelled else ("done" if ok else "failed"), tasks)
+        except Exception as e:
+            AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Run History Error: {str(e)}")
+    if job.cancelled:
+        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] Run cancelled.")
+    else:
+        AGENT_LOGS.append(f"[{datetime.now().strftime('%H:%M:%S')}] All tasks completed.")
+    return ok
+
+JOBS = job_queue.JobQueue(agent_worker, first_id=RUNTIME.next_job_id() if RUNTIME else 1)
+
+def local_progress():
+    """Progress of the agent running in this process (the pipeline worker's, in shared mode)"""
+    with STATE_LOCK:
+        running = sorted(CURRENT_PROCESSING_STATE)
+    current, queued = JOBS.current, JOBS.queued
+    return {
+        "current_task": ", ".join(running) or None,
+        "running_tasks": running,
+        "job_id": current.id if current else None,
+        "queued_job_id": queued.id if queued else None,
+        "is_running": IS_AGENT_RUNNING
+    }
+
+def agent_running():
+    return RUNTIME.progress().get("is_running", False) if RUNTIME else IS_AGENT_RUNNING
+
+def submit_local(mode=None, states=None, stages=None):
+    """Queues a run on this process's job queue: {"job_id", "coalesced", "running"}"""
+    running = IS_AGENT_RUNNING
+    job, coalesced = JOBS.submit(mode, states, stages)
+    return {"job_id": job.id, "coalesced": coalesced, "running": running}
+
+def cancel_local(job_id=None):
+    return {"jobs": [j.id for j in JOBS.cancel(job_id)]}
+
+def submit_job(mode, states, stages):
+    """Like submit_local, through the pipeline worker in shared mode; None when it is not reachable"""
+    if RUNTIME:
+        return RUNTIME.call("submit", {"mode": mode, "states": states, "stages": stages})
+    return submit_local(mode, states, stages)
+
+def cancel_jobs(job_id=None):
+    """Ids of the cancelled jobs, or None when the pipeline worker is not reachable"""
+    result = RUNTIME.call("cancel", {"job_id": job_id}) if RUNTIME else cancel_local(job_id)
+    return None if result is None or "error" in result else result["jobs"]
+
+_seen_status_version = None
+
+def sync_status():
+    """In shared mode, re-scans the Excel outputs when the pipeline worker's status registry has changed"""
+    global _seen_status_version
+    if RUNTIME:
+        version = RUNTIME.progress().get("status_version")
+        if version != _seen_status_version:
+            _seen_status_version = version
+            STATUS.refresh()
+
+WORKER_UNAVAILABLE = "Pipeline worker is not running. Start it with: python pipeline_worker.py"
+
+_metrics_published = 0
+
+def publish_metrics(force=False):
+    """In shared mode, shares this process's samples with the other processes' /metrics every few seconds"""
+    global _metrics_published
+    now = time.monotonic()
+    if RUNTIME and (force or now - _metrics_published >= 5):
+        _metrics_published = now
+        RUNTIME.publish_metrics(metrics.snapshot())
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.monotonic()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # The route pattern, not the path, so /runs/<int:run_id> is one series
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.HTTP_REQUEST_SECONDS.observe(time.monotonic() - started, route=route,
+                                             method=request.method, status=response.status_code)
+        publish_metrics()
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_route():
+    # Pipeline samples are recorded by the process that runs the agent: this one, or pipeline_worker.py
+    snapshots = []
+    if RUNTIME:
+        publish_metrics(force=True)
+        snapshots = RUNTIME.metric_snapshots()
+    return Response(metrics.render(snapshots), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def index():
-    state_status = []
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    for state in STATES:
-        # Check for multiple variants (with/without spaces, lowercase/original)
-        variants = [
-            f"{state}.xlsx",
-            f"{state.lower()}.xlsx",
-            f"{state.replace(' ', '')}.xlsx",
-            f"{state.replace(' ', '').lower()}.xlsx"
-        ]
-        has_file = any(os.path.exists(os.path.join(base_dir, v)) for v in variants)
-        state_status.append({"name": state, "has_file": has_file})
-        
-    return render_template('index.html', states=state_status)
+    sync_status()
+    status, version = STATUS.snapshot()
+    state_status = [{"name": state, "has_file": status[state]} for state in STATES]
+    response = app.make_response(render_template('index.html', states=state_status))
+    response.set_etag(f"index-{BOOT_ID}-{version}")
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 @app.route('/start-agent', methods=['POST'])
 def start_agent():
-    global IS_AGENT_RUNNING, AGENT_LOGS
-    if IS_AGENT_RUNNING:
-        return jsonify({"status": "error", "message": "Agent is already running."}), 400
-    
-    AGENT_LOGS = [f"[{datetime.now().strftime('%H:%M:%S')}] Agent started manually."]
-    threading.Thread(target=agent_worker, daemon=True).start()
-    return jsonify({"status": "success", "message": "Agent started."})
+    # Optional JSON body: {"mode": "incremental", "states": ["Assam", "Bihar"], "stages": ["scrape", "extract"]}
+    payload = request.get_json(silent=True) or {}
+    mode = payload.get("mode")
+    if mode not in (None, "stage", "per_state", "incremental"):
+        return jsonify({"status": "error", "message": f"Unknown mode: {mode}"}), 400
+    states = payload.get("states") or None
+    stages = payload.get("stages") or None
+    if (states is not None and not isinstance(states, list)) or (stages is not None and not isinstance(stages, list)):
+        return jsonify({"status": "error", "message": "'states' and 'stages' must be lists."}), 400
+    from pipeline import validate_selection
+    error = validate_selection(states, stages)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+
+    result = submit_job(mode, states, stages)
+    if result is None or "error" in result:
+        return jsonify({"status": "error", "message": (result or {}).get("error", WORKER_UNAVAILABLE)}), 503
+    job_id, coalesced = result["job_id"], result["coalesced"]
+    if coalesced:
+        message = f"Merged into queued run {job_id}."
+    elif result["running"]:
+        message = f"Agent is running; run {job_id} queued."
+    else:
+        message = "Agent started."
+    return jsonify({"status": "success", "message": message, "job_id": job_id, "coalesced": coalesced})
+
+@app.route('/cancel', methods=['POST'])
+def cancel_agent():
+    job_id = request.args.get('job', type=int)
+    cancelled = cancel_jobs(job_id)
+    if cancelled is None:
+        return jsonify({"status": "error", "message": WORKER_UNAVAILABLE}), 503
+    if not cancelled:
+        return jsonify({"status": "error", "message": "Nothing to cancel."}), 404
+    return jsonify({"status": "success", "message": f"Cancelled run(s): {', '.join(str(j) for j in cancelled)}",
+                    "jobs": cancelled})
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    if RUNTIME:
+        return jsonify({"status": "success", "data": RUNTIME.jobs()})
+    return jsonify({"status": "success", "data": [j.to_dict() for j in JOBS.jobs()]})
+
+@app.route('/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    job = RUNTIME.job(job_id) if RUNTIME else JOBS.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found."}), 404
+    return jsonify({"status": "success", "data": job if RUNTIME else job.to_dict()})
+
+@app.route('/runs', methods=['GET'])
+def list_runs():
+    limit = max(1, min(request.args.get('limit', type=int, default=50), 500))
+    return jsonify({"status": "success", "data": run_history.list_runs(limit)})
+
+@app.route('/runs/<int:run_id>', methods=['GET'])
+def get_run(run_id):
+    run = run_history.get_run(run_id)
+    if run is None:
+        return jsonify({"status": "error", "message": "Unknown run."}), 404
+    return jsonify({"status": "success", "data": run})
+
+@app.route('/runs/durations', methods=['GET'])
+def run_durations():
+    limit = max(1, min(request.args.get('limit', type=int, default=20), 200))
+    return jsonify({"status": "success", "data": run_history.step_durations(limit)})
 
 @app.route('/get-status', methods=['GET'])
 def get_status():
-    status = {}
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    for state in STATES:
-        variants = [
-            f"{state}.xlsx",
-            f"{state.lower()}.xlsx",
-            f"{state.replace(' ', '')}.xlsx",
-            f"{state.replace(' ', '').lower()}.xlsx"
-        ]
-        has_file = any(os.path.exists(os.path.join(base_dir, v)) for v in variants)
-        status[state] = has_file
-    return jsonify(status)
+    # Served from the in-memory registry; unchanged polls get a 304
+    sync_status()
+    status, version = STATUS.snapshot()
+    response = jsonify(status)
+    response.set_etag(f"status-{BOOT_ID}-{version}")
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 @app.route('/get-progress', methods=['GET'])
 def get_progress():
-    return jsonify({
-        "current_task": CURRENT_PROCESSING_STATE,
-        "is_running": IS_AGENT_RUNNING
-    })
+    if RUNTIME:
+        progress = RUNTIME.progress()
+        return jsonify({key: progress.get(key) for key in
+                        ("current_task", "running_tasks", "job_id", "queued_job_id", "is_running", "worker_alive")})
+    return jsonify(local_progress())
 
 @app.route('/get-logs', methods=['GET'])
 def get_logs():
+    # after is a sequence number: the next_index returned by the previous call
     after = request.args.get('after', type=int, default=0)
-    current_logs = AGENT_LOGS[after:]
+    lines, next_seq, missed = AGENT_LOGS.since(after)
     return jsonify({
-        "logs": current_logs,
-        "next_index": len(AGENT_LOGS),
-        "is_running": IS_AGENT_RUNNING
+        "logs": [line for _, line in lines],
+        "next_index": next_seq,
+        "missed": missed,
+        "is_running": agent_running()
     })
 
+@app.route('/stream-logs', methods=['GET'])
+def stream_logs():
+    """Server-sent events: one message per log line (id = sequence number) and a "status" event when the agent starts or stops"""
+    after = request.args.get('after', type=int)
+    if after is None:
+        last_id = request.headers.get('Last-Event-ID', '')
+        after = int(last_id) + 1 if last_id.isdigit() else 0
+
+    def generate():
+        cursor = after
+        running = None
+        while True:
+            lines, next_seq, _ = AGENT_LOGS.wait(cursor, timeout=15)
+            now_running = agent_running()
+            if running != now_running:
+                running = now_running
+                yield f"event: status\ndata: {json.dumps({'is_running': running})}\n\n"
+            if not lines and next_seq <= cursor:
+                yield ": keep-alive\n\n"
+                continue
+            for seq, line in lines:
+                data = "".join(f"data: {part}\n" for part in line.splitlines() or [""])
+                yield f"id: {seq}\n{data}\n"
+            cursor = next_seq
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/get-state-data/<state_name>', methods=['GET'])
 def get_state_data(state_name):
     try:
-        filename = None
-        variants = [
-            f"{state_name}.xlsx",
-            f"{state_name.lower()}.xlsx",
-            f"{state_name.replace(' ', '')}.xlsx",
-            f"{state_name.replace(' ', '').lower()}.xlsx"
-        ]
-        for v in variants:
-            if os.path.exists(v):
-                filename = v
-                break
-                
-        if not filename:
-            return jsonify({"status": "error", "message": "File not found."}), 404
-            
-        wb = openpyxl.load_workbook(filename, data_only=True)
-        sheet = wb.active
-        data = []
-        for row in sheet.iter_rows(values_only=True):
-            if any(cell is not None for cell in row):
-                data.append([str(c) if c is not None else "" for c in row])
-        return jsonify({"status": "success", "data": data})
+        # ?source=db serves the same table from SQLite; default is STATE_DATA_SOURCE (excel)
+        source = request.args.get('source', sheet_cache.STATE_DATA_SOURCE)
+        if source not in ("excel", "db"):
+            return jsonify({"status": "error", "message": f"Unknown source: {source}"}), 400
+        data, etag = sheet_cache.get_state_data(state_name, source)
+        if data is None:
+            return jsonify({"status": "error", "message": "File not found." if source == "excel" else "No rows in database."}), 404
+
+        response = jsonify({"status": "success", "data": data, "source": source})
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+GZIP_ETAG_SUFFIX = "-gzip"
+
+def gzip_response(response, min_size=1024):
+    """
+    Gzip-compresses a JSON response when the client accepts it and it is worth it.
+    The compressed body is a different representation, so its ETag gets a -gzip suffix.
+    """
+    response.vary.add('Accept-Encoding')
+    if response.status_code != 200 or 'gzip' not in request.headers.get('Accept-Encoding', ''):
+        return response
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + GZIP_ETAG_SUFFIX, weak)
+    return response
+
 @app.route('/get-db-data', methods=['GET'])
 def get_db_data():
+    """
+    Query parameters: state, discom, financial_year (exact, state/discom case-insensitive),
+    columns (comma-separated), limit (default 500, max 5000), cursor (next_cursor of the previous page).
+    """
     try:
-        import sqlite3
-        db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tariff_orders.db")
-        if not os.path.exists(db_path):
+        from database.database_utils import DB_PATH, data_version, query_tariff_rows
+        if not os.path.exists(DB_PATH):
             return jsonify({"status": "error", "message": "Database not found."}), 404
-            
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tariff_data")
-        rows = cursor.fetchall()
-        
-        data = [dict(row) for row in rows]
-        conn.close()
-        return jsonify({"status": "success", "data": data})
+
+        limit = max(1, min(request.args.get('limit', type=int, default=500), 5000))
+        columns = [c.strip() for c in request.args.get('columns', '').split(',') if c.strip()] or None
+        filters = {k: request.args.get(k) for k in ('state', 'discom', 'financial_year')}
+        cursor = request.args.get('cursor', type=int)
+
+        # The ETag only depends on the data version and the query, so a match skips the query
+        version = data_version()
+        etag = hashlib.sha1(f"{version}|{request.query_string.decode()}".encode()).hexdigest()[:20]
+        # Either the identity or the gzip variant may be what the client has cached
+        for cached in (etag, etag + GZIP_ETAG_SUFFIX):
+            if request.if_none_match.contains(cached):
+                response = app.response_class(status=304)
+                response.set_etag(cached)
+                response.vary.add('Accept-Encoding')
+                return response
+
+        rows, next_cursor = query_tariff_rows(columns=columns, limit=limit, cursor=cursor, **filters)
+        response = jsonify({"status": "success", "data": rows, "count": len(rows), "next_cursor": next_cursor})
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return gzip_response(response)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/search-tables', methods=['GET'])
+def search_tables_route():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"status": "error", "message": "Missing 'q' parameter."}), 400
+    try:
+        from database.table_index import search_tables, INDEX_PATH
+        if not os.path.exists(INDEX_PATH):
+            return jsonify({"status": "error", "message": "Table index not found. Run scraper.py with --index or SCRAPER_BUILD_INDEX=True."}), 404
+        results = search_tables(
+            query,
+            state=request.args.get('state'),
+            limit=request.args.get('limit', type=int, default=20)
+        )
+        return jsonify({"status": "success", "data": results})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 if __name__ == '__main__':
     port = int(os.getenv("PORT", 5000))
     debug = os.getenv("FLASK_DEBUG", "True").lower() == "true"
+    # The debug reloader imports this file in a watcher process too; only the serving one
+    # cleans up and schedules runs. With AGENT_RUNTIME=shared pipeline_worker.py does both.
+    if not RUNTIME and (not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+        # Startup never blocks on disk cleanup; see workspace_gc.py
+        workspace_gc.start_background_cleanup(base_dir)
+        scheduler.start_scheduler(submit_local)
     app.run(debug=debug, port=port)
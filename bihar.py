@@ -9,6 +9,9 @@ try:
     DB_SUCCESS = True
 except ImportError:
     DB_SUCCESS = False
+import extractor_trace as trace
+from extractor_trace import traced, write_report
+from workspace import workspace_root
 
 def get_target_years():
     now = datetime.datetime.now()
@@ -20,6 +23,7 @@ def get_target_years():
 
 TARGET_YEARS = get_target_years()
 
+@traced
 def extract_discom_names(jsonl_path):
     discoms = set()
     if not jsonl_path or not os.path.exists(jsonl_path): return ["NBPDCL", "SBPDCL"]
@@ -33,18 +37,19 @@ def extract_discom_names(jsonl_path):
     res = sorted(list(discoms)) if discoms else ["NBPDCL", "SBPDCL"]
     return res
 
+@traced
 def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constraint=lambda x: True, is_percent=False):
     if not jsonl_path or not os.path.exists(jsonl_path): return "NA"
     
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 
                 heading_match = all(k.lower() in h for k in table_keywords)
                 if heading_match:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if all(k.lower() in row_txt for k in row_keywords):
                             for v in row.values():
@@ -55,12 +60,15 @@ def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constrai
                                         f_v = float(clean)
                                         if value_constraint(f_v):
                                             res = str(v).strip()
+                                            trace.match(res)
                                             if is_percent and "%" not in res: res += "%"
+                                            trace.match(res)
                                             return res
                                 except: pass
             except: pass
     return "NA"
 
+@traced
 def extract_ists_loss(json_path):
     try:
         if os.path.exists(json_path):
@@ -73,10 +81,12 @@ def extract_ists_loss(json_path):
     except: pass
     return "NA"
 
+@traced
 def extract_insts_loss(jsonl_path):
     # Search for Intra-state transmission loss
     return find_value_in_jsonl(jsonl_path, ["loss"], ["intra-state", "transmission"], lambda x: 2.0 <= x <= 5.0, True)
 
+@traced
 def extract_wheeling_losses(jsonl_path, discom_names):
     losses = {name: {'11': "NA", '33': "NA", '66': "NA", '132': "NA"} for name in discom_names}
     if not jsonl_path or not os.path.exists(jsonl_path): return losses
@@ -84,7 +94,7 @@ def extract_wheeling_losses(jsonl_path, discom_names):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 if "distribution loss" in h:
                     target = "GENERIC"
@@ -92,7 +102,7 @@ def extract_wheeling_losses(jsonl_path, discom_names):
                         if name.lower() in h:
                             target = name; break
                     
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if "distribution loss" in row_txt:
                             val = None
@@ -101,12 +111,14 @@ def extract_wheeling_losses(jsonl_path, discom_names):
                                     val = str(v).strip(); break
                             if val:
                                 if target == "GENERIC":
-                                    for n in discom_names: losses[n]['11'] = losses[n]['33'] = val
+                                    for n in discom_names: losses[n]['11'] = losses[n]['33'] = val; trace.match(val)
                                 else:
                                     losses[target]['11'] = losses[target]['33'] = val
+                                    trace.match(val)
             except: pass
     return losses
 
+@traced
 def extract_table_components(jsonl_path, table_query, voltage_keywords):
     results = {v: "NA" for v in voltage_keywords}
     if not jsonl_path or not os.path.exists(jsonl_path): return results
@@ -114,11 +126,11 @@ def extract_table_components(jsonl_path, table_query, voltage_keywords):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 if all(k.lower() in h for k in table_query):
                     headers = [str(h).lower() for h in data.get("headers", [])]
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         # Identify voltage from row context or voltage header
                         matched_v = None
@@ -134,21 +146,23 @@ def extract_table_components(jsonl_path, table_query, voltage_keywords):
                                     clean = re.sub(r'[^\d\.]', '', str(val))
                                     if clean and 0.1 <= float(clean) < 10:
                                         results[matched_v] = clean
+                                        trace.match(clean)
                                         # Note: this might need more specific column logic
                                 except: pass
             except: pass
     return results
 
+@traced
 def extract_css_charges(jsonl_path):
     # Bihar CSS table often has voltage and CSS in the same row
     css = {v: "NA" for v in ['11', '33', '66', '132', '220']}
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 if "cross subsidy" in h and "surcharge" in h:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         # Check voltage
                         mv = None
@@ -165,9 +179,11 @@ def extract_css_charges(jsonl_path):
                                         best_val = clean; break
                                 except: pass
                             css[mv] = best_val
+                            trace.match(best_val)
             except: pass
     return css
 
+@traced
 def extract_wheeling_charges(jsonl_path):
     # Wheeling charges in Bihar are often found in the same table as CSS or a dedicated ARR table
     w = {v: "NA" for v in ['11', '33', '66', '132']}
@@ -180,10 +196,10 @@ def extract_wheeling_charges(jsonl_path):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 if "cross subsidy" in h and "surcharge" in h:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         mv = None
                         for v in ['132', '33', '11']:
@@ -195,21 +211,23 @@ def extract_wheeling_charges(jsonl_path):
                                         clean = re.sub(r'[^\d\.]', '', str(v))
                                         if clean and 0.1 <= float(clean) < 3.0:
                                             w[mv] = clean
+                                            trace.match(clean)
                                     except: pass
             except: pass
     return w
 
+@traced
 def extract_fixed_charges(jsonl_path):
     fixed = {v: "NA" for v in ['11', '33', '66', '132', '220']}
     if not jsonl_path or not os.path.exists(jsonl_path): return fixed
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 rows = data.get("rows", [])
                 if not rows: continue
                 # Look for HTS categories
-                for row in rows:
+                for row in trace.rows(rows):
                     cat = str(row.get("Existing Category", row.get("Consumer Category", ""))).lower()
                     if "hts" in cat or "htis" in cat:
                         mv = None
@@ -225,17 +243,19 @@ def extract_fixed_charges(jsonl_path):
                                         clean = re.sub(r'[^\d\.]', '', str(v))
                                         if clean and 100 < float(clean) < 1000:
                                             fixed[mv] = clean
+                                            trace.match(clean)
                                     except: pass
             except: pass
     return fixed
 
+@traced
 def extract_energy_charges(jsonl_path):
     energy = {v: "NA" for v in ['11', '33', '66', '132', '220']}
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
-                for row in data.get("rows", []):
+                data = trace.table(json.loads(line))
+                for row in trace.rows(data.get("rows", [])):
                     cat = str(row.get("Existing Category", row.get("Consumer Category", ""))).lower()
                     if "hts" in cat or "htis" in cat:
                         mv = None
@@ -251,13 +271,16 @@ def extract_energy_charges(jsonl_path):
                                         clean = re.sub(r'[^\d\.]', '', str(v))
                                         if clean and 4.0 <= float(clean) < 15.0:
                                             energy[mv] = clean
+                                            trace.match(clean)
                                     except: pass
             except: pass
     return energy
 
+@traced
 def extract_fuel_surcharge(jsonl_path):
     return find_value_in_jsonl(jsonl_path, ["fuel"], ["fuel", "surcharge"], lambda x: 0 < x < 5)
 
+@traced
 def extract_additional_surcharge(jsonl_path):
     return find_value_in_jsonl(jsonl_path, ["additional surcharge"], ["additional surcharge"], lambda x: 0.5 < x < 5.0)
 
@@ -365,32 +388,35 @@ def update_excel_with_discoms(discoms, ists_loss, insts_loss, wheeling_losses, w
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    extraction_root = os.path.join(base_dir, "Extraction")
-    extraction_dir = None
-    if os.path.exists(extraction_root):
-        for d in os.listdir(extraction_root):
-            if "bihar" in d.lower(): extraction_dir = os.path.join(extraction_root, d); break
+    try:
+        base_dir = workspace_root()
+        extraction_root = os.path.join(base_dir, "Extraction")
+        extraction_dir = None
+        if os.path.exists(extraction_root):
+            for d in os.listdir(extraction_root):
+                if "bihar" in d.lower(): extraction_dir = os.path.join(extraction_root, d); break
     
-    if not extraction_dir: exit(1)
-    jsonl_files = glob.glob(os.path.join(extraction_dir, "*.jsonl"))
-    if not jsonl_files: exit(1)
+        if not extraction_dir: exit(1)
+        jsonl_files = glob.glob(os.path.join(extraction_dir, "*.jsonl"))
+        if not jsonl_files: exit(1)
     
-    jsonl_file = jsonl_files[0]
-    excel_file = os.path.join(base_dir, "bihar.xlsx")
-    ists_loss_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
+        jsonl_file = jsonl_files[0]
+        excel_file = os.path.join(base_dir, "bihar.xlsx")
+        ists_loss_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
     
-    ists_val = extract_ists_loss(ists_loss_file)
-    print(f"Extracted ISTS Loss: {ists_val}")
-    discoms = extract_discom_names(jsonl_file)
-    insts = extract_insts_loss(jsonl_file)
-    wheeling_l = extract_wheeling_losses(jsonl_file, discoms)
-    wheeling_c = extract_wheeling_charges(jsonl_file)
-    css = extract_css_charges(jsonl_file)
-    fixed = extract_fixed_charges(jsonl_file)
-    energy = extract_energy_charges(jsonl_file)
-    fuel = extract_fuel_surcharge(jsonl_file)
-    add_s = extract_additional_surcharge(jsonl_file)
+        ists_val = extract_ists_loss(ists_loss_file)
+        print(f"Extracted ISTS Loss: {ists_val}")
+        discoms = extract_discom_names(jsonl_file)
+        insts = extract_insts_loss(jsonl_file)
+        wheeling_l = extract_wheeling_losses(jsonl_file, discoms)
+        wheeling_c = extract_wheeling_charges(jsonl_file)
+        css = extract_css_charges(jsonl_file)
+        fixed = extract_fixed_charges(jsonl_file)
+        energy = extract_energy_charges(jsonl_file)
+        fuel = extract_fuel_surcharge(jsonl_file)
+        add_s = extract_additional_surcharge(jsonl_file)
 
-    update_excel_with_discoms(discoms, ists_val, insts, wheeling_l, wheeling_c, css, fixed, energy, fuel, add_s, excel_file)
-    print(f"Successfully updated {excel_file}")
+        update_excel_with_discoms(discoms, ists_val, insts, wheeling_l, wheeling_c, css, fixed, energy, fuel, add_s, excel_file)
+        print(f"Successfully updated {excel_file}")
+    finally:
+        write_report("Bihar")
@@ -0,0 +1,105 @@
+import heapq
+import itertools
+
+
+class TopK:
+    """
+    Keeps the k highest-ranked candidates in a bounded min-heap instead of
+    collecting every candidate and sorting at the end.
+    Ranks are compared as given (numbers or tuples); on equal rank the
+    candidate offered first wins, matching a stable sort in reverse order.
+    If max_rank is set, `done` becomes True once all k slots hold a candidate
+    of that rank, so callers can stop scanning.
+    """
+
+    def __init__(self, k=1, max_rank=None):
+        self.k = k
+        self.max_rank = max_rank
+        self._heap = []
+        self._seq = itertools.count()
+
+    def offer(self, rank, value):
+        """Adds a candidate, returns True if it was kept"""
+        entry = (rank, -next(self._seq), value)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def ranked(self):
+        """Candidates as (rank, value), best first"""
+        return [(rank, value) for rank, _, value in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def best(self, default=None):
+        if not self._heap:
+            return default
+        return max(self._heap, key=lambda e: e[:2])[2]
+
+    @property
+    def done(self):
+        if self.max_rank is None or len(self._heap) < self.k:
+            return False
+        return self._heap[0][0] >= self.max_rank
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class BestPerKey:
+    """
+    Tracks the best candidate per key (e.g. per voltage level or per discom/voltage).
+    A candidate replaces the current one only if its rank is strictly higher,
+    so the first candidate seen wins ties.
+    If both keys and max_rank are given, `done` becomes True once every key holds
+    a max_rank candidate and no later candidate could change the result.
+    """
+
+    def __init__(self, keys=None, max_rank=None):
+        self.keys = list(keys) if keys is not None else None
+        self.max_rank = max_rank
+        self._best = {}
+
+    def offer(self, key, rank, value):
+        """Adds a candidate for key, returns True if it became the best"""
+        current = self._best.get(key)
+        if current is None or rank > current[0]:
+            self._best[key] = (rank, value)
+            return True
+        return False
+
+    def offer_many(self, keys, rank, value):
+        accepted = False
+        for key in keys:
+            accepted = self.offer(key, rank, value) or accepted
+        return accepted
+
+    def get(self, key, default=None):
+        current = self._best.get(key)
+        return current[1] if current else default
+
+    def rank(self, key, default=None):
+        current = self._best.get(key)
+        return current[0] if current else default
+
+    def is_settled(self, key):
+        current = self._best.get(key)
+        return self.max_rank is not None and current is not None and current[0] >= self.max_rank
+
+    def values(self):
+        """Plain {key: value} of the best candidates found so far"""
+        return {key: value for key, (_, value) in self._best.items()}
+
+    @property
+    def done(self):
+        if self.keys is None or self.max_rank is None:
+            return False
+        return all(self.is_settled(k) for k in self.keys)
+
+    def __contains__(self, key):
+        return key in self._best
+
+    def __len__(self):
+        return len(self._best)
@@ -7,7 +7,11 @@ try:
     DB_SUCCESS = True
 except ImportError:
     DB_SUCCESS = False
+import extractor_trace as trace
+from extractor_trace import traced, write_report
+from workspace import workspace_root
 import re
+from candidate_selector import TopK
 
 def clean_year(y_str):
     # returns 2023 for "FY 2023-24"
@@ -16,6 +20,7 @@ def clean_year(y_str):
     return int(m.group(1)) if m else 0
 
 
+@traced
 def get_discom_name_from_json(json_path):
     keywords = ["discom", "discom name"]
     candidate_discom = "NA"
@@ -23,7 +28,7 @@ def get_discom_name_from_json(json_path):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 # Check directly in keys of the dictionary (if any structure matches)
                 for key, value in data.items():
@@ -59,7 +64,7 @@ def get_discom_name_from_json(json_path):
                 # Fallback: Scan rows for Discom definition (e.g. in Abbreviations)
                 # Look for "Distribution Company Limited" or "State Power Distribution Company"
                 if "rows" in data and len(data["rows"]) > 0:
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         # Convert all values to string
                         vals = [str(v) for v in row.values() if v]
                         for v in vals:
@@ -72,12 +77,14 @@ def get_discom_name_from_json(json_path):
                                         # Avoid "DISCOM" if possible, unless it's the only one.
                                         # But usually "DISCOM" maps to "Distribution Company", not "State Power..."
                                         candidate_discom = pot_name
+                                        trace.match(pot_name)
 
     except Exception as e:
         print(f"Error reading JSON: {e}")
     
     return candidate_discom
 
+@traced
 def get_financial_year(json_path):
     # logic to find the most recent/present financial year in headers
     years = set()
@@ -86,7 +93,7 @@ def get_financial_year(json_path):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 if "headers" in data and isinstance(data["headers"], list):
                     for h in data["headers"]:
                         if h and isinstance(h, str):
@@ -103,6 +110,7 @@ def get_financial_year(json_path):
     sorted_years = sorted(list(years), reverse=True)
     return f"FY {sorted_years[0]}"
 
+@traced
 def get_insts_loss(json_path, target_year):
     # Keywords prioritizing %
     keywords = [
@@ -113,13 +121,17 @@ def get_insts_loss(json_path, target_year):
     ]
     
     target_year_clean = target_year.lower().replace(" ", "") if target_year else ""
+    t_year_val = clean_year(target_year) if target_year else 0
+    if not t_year_val:
+        return "NA"
     
-    candidates = [] # List of (year_val, priority, value)
+    # Best (priority, column index) for the target year; rightmost/Approved column wins ties on priority
+    selector = TopK(k=1)
 
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 if "rows" in data and len(data["rows"]) > 0:
                     headers = []
@@ -145,7 +157,7 @@ def get_insts_loss(json_path, target_year):
                              if "approved" in h_low or "petition" in h_low or "projected" in h_low or "estimate" in h_low or "proposed" in h_low or "column" in h_low:
                                  year_cols[idx] = clean_year(target_year)
 
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         # Find which key contains the keyword
                         keyword_found = False
                         found_kw = ""
@@ -189,27 +201,15 @@ def get_insts_loss(json_path, target_year):
                                                 
                                             # Clean value to check if number
                                             v_num = re.sub(r"[^\d\.]", "", val)
-                                            if v_num and len(v_num) > 0:
-                                                 candidates.append((y_val, priority, val, col_idx))
+                                            if v_num and len(v_num) > 0 and y_val == t_year_val:
+                                                 selector.offer((priority, col_idx), val)
 
     except Exception as e:
         print(f"Error reading JSON for Insts: {e}")
         
-    # Process candidates
-    # Sort by year descending, then priority descending, then Column Index descending (prefer Approved/Rightmost)
-    candidates.sort(key=lambda x: (x[0], x[1], x[3]), reverse=True)
-    
-    # 1. Look for target year
-    t_year_val = clean_year(target_year) if target_year else 0
-    if t_year_val:
-        for y, p, v, idx in candidates:
-            if y == t_year_val:
-                return v
-    
-    return "NA"
-
-    return "NA"
+    return selector.best("NA")
 
+@traced
 def get_wheeling_loss(json_path, target_year):
     keywords = [
         "wheeling loss", 
@@ -246,7 +246,7 @@ def get_wheeling_loss(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 if "rows" in data and len(data["rows"]) > 0:
                     headers = []
@@ -293,7 +293,7 @@ def get_wheeling_loss(json_path, target_year):
                                 table_relevant = True
                                 break
                     
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         # Check context in row keys/values
                         row_text = " ".join([str(v).lower() for v in row.values() if v])
                         
@@ -351,6 +351,7 @@ def get_wheeling_loss(json_path, target_year):
                                                     priority = -1
                                                     
                                                 candidates.append((y_val, priority, val, col_idx))
+                                                trace.match((y_val, priority, val, col_idx), note="candidate")
                             
                             candidates.sort(key=lambda x: (x[0], x[1], x[3]), reverse=True)
                             
@@ -398,6 +399,7 @@ def get_wheeling_loss(json_path, target_year):
                                             # with open("debug_update.txt", "a", encoding="utf-8") as df:
                                             #     df.write(f"DEBUG: Updating {v} from {curr_val} to {found_val}\n")
                                             voltage_losses[v] = found_val
+                                            trace.match(found_val)
                                             voltage_years[v] = found_year
                                             
                                 elif is_general:
@@ -414,6 +416,7 @@ def get_wheeling_loss(json_path, target_year):
                                     
                                     if best_cand:
                                         general_candidates.append(best_cand)
+                                        trace.match(best_cand, note="candidate")
 
     except Exception as e:
         print(f"Error reading JSON for Wheeling: {e}")
@@ -434,6 +437,7 @@ def get_wheeling_loss(json_path, target_year):
         
     return voltage_losses
 
+@traced
 def get_insts_charges(json_path, target_year):
     insts_charges = "NA"
     keywords = ["transmission charge", "transmission tariff", "stu charge", "stu tariff", "open access charge"]
@@ -447,7 +451,7 @@ def get_insts_charges(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 if "rows" in data and len(data["rows"]) > 0:
                     headers = [str(h) for h in data.get("headers", []) if h]
                     headers_clean = [h.lower().replace(" ", "") for h in headers]
@@ -473,7 +477,7 @@ def get_insts_charges(json_path, target_year):
                                  if "approved" in h_low or "petition" in h_low or "projected" in h_low or "estimate" in h_low or "proposed" in h_low or "column" in h_low:
                                      year_cols[idx] = t_year_val
 
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         row_text = " ".join([str(v).lower() for v in row.values() if v])
                         
                         # Filter out power purchase
@@ -511,6 +515,7 @@ def get_insts_charges(json_path, target_year):
                                                         priority = 2
                                                     
                                                     candidates.append((y_val, priority, v_clean))
+                                                    trace.match((y_val, priority, v_clean), note="candidate")
         
         # Sort candidates
         candidates.sort(key=lambda x: (x[0], x[1]), reverse=True)
@@ -532,6 +537,7 @@ def get_insts_charges(json_path, target_year):
         
     return insts_charges
 
+@traced
 def get_wheeling_charges(json_path, target_year):
     charges = {
         "11": "NA", "33": "NA", "66": "NA", "132": "NA"
@@ -556,7 +562,7 @@ def get_wheeling_charges(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 heading = data.get("table_heading", "").lower()
                 
@@ -596,7 +602,7 @@ def get_wheeling_charges(json_path, target_year):
                                   if "approved" in h_low or "petition" in h_low or "projected" in h_low or "proposed" in h_low or "myt" in h_low:
                                       year_cols[idx] = t_year_val
 
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         row_text = " " .join([str(v).lower() for v in row.values() if v])
                         
                         row_relevant = False
@@ -641,6 +647,7 @@ def get_wheeling_charges(json_path, target_year):
                                                     if "approved" in h.lower(): priority += 1
                                                     
                                                     candidates.append((y_val, priority, f_val, v_level))
+                                                    trace.match((y_val, priority, f_val, v_level), note="candidate")
                                             except: pass
 
     except Exception as e:
@@ -677,6 +684,7 @@ def get_wheeling_charges(json_path, target_year):
 
     return charges
 
+@traced
 def get_css_charges(json_path, target_year):
     charges = {
         "11": "NA", "33": "NA", "66": "NA", "132": "NA", "220": "NA"
@@ -697,7 +705,7 @@ def get_css_charges(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 heading = data.get("table_heading", "").lower()
                 
@@ -733,7 +741,7 @@ def get_css_charges(json_path, target_year):
                                   if "approved" in h_low or "css" in h_low:
                                       year_cols[idx] = t_year_val
 
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         row_text = " " .join([str(v).lower() for v in row.values() if v])
                         
                         row_relevant = False
@@ -771,6 +779,7 @@ def get_css_charges(json_path, target_year):
                                                     if table_relevant: priority += 1
                                                     
                                                     candidates.append((y_val, priority, f_val, v_level))
+                                                    trace.match((y_val, priority, f_val, v_level), note="candidate")
                                             except: pass
 
     except Exception as e:
@@ -804,6 +813,7 @@ def get_css_charges(json_path, target_year):
 
     return charges
 
+@traced
 def get_additional_surcharge(json_path, target_year):
     val = "NA"
     keywords = ["additional surcharge", "as charges", "additional surcharge rate", "addl. surcharge", "addl surcharge"]
@@ -816,7 +826,7 @@ def get_additional_surcharge(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 
                 # Context check
@@ -851,7 +861,7 @@ def get_additional_surcharge(json_path, target_year):
                                   if "approved" in h_low or "charge" in h_low:
                                       year_cols[idx] = t_year_val
                     
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         row_text = " ".join([str(v).lower() for v in row.values() if v])
                         
                         row_relevant = False
@@ -882,6 +892,7 @@ def get_additional_surcharge(json_path, target_year):
                                                     if table_relevant: priority += 1
                                                     
                                                     candidates.append((y_val, priority, f_val))
+                                                    trace.match((y_val, priority, f_val), note="candidate")
                                             except: pass
                                             
     except Exception as e:
@@ -906,6 +917,7 @@ def get_additional_surcharge(json_path, target_year):
         
     return val
 
+@traced
 def get_fixed_charges(json_path, target_year):
     charges = {
         "11": "NA", "33": "NA", "66": "NA", "132": "NA", "220": "NA"
@@ -922,7 +934,7 @@ def get_fixed_charges(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 heading = data.get("table_heading", "").lower()
                 
@@ -940,7 +952,7 @@ def get_fixed_charges(json_path, target_year):
                     
                     if found_charge_col == -1: continue
 
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         row_text = " ".join([str(v).lower() for v in row.values() if v])
                         
                         # Voltage identification
@@ -978,6 +990,7 @@ def get_fixed_charges(json_path, target_year):
                                         
                                         # Assume current year for tariff schedule tables
                                         candidates.append((t_year_val, priority, f_val, v_level))
+                                        trace.match((t_year_val, priority, f_val, v_level), note="candidate")
                                 except: pass
 
     except Exception as e:
@@ -1015,6 +1028,7 @@ def get_fixed_charges(json_path, target_year):
 
     return charges
 
+@traced
 def get_energy_charges(json_path, target_year):
     charges = {
         "11": "NA", "33": "NA", "66": "NA", "132": "NA", "220": "NA"
@@ -1030,7 +1044,7 @@ def get_energy_charges(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 heading = data.get("table_heading", "").lower()
                 
@@ -1048,7 +1062,7 @@ def get_energy_charges(json_path, target_year):
                     
                     if found_charge_col == -1: continue
 
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         row_text = " ".join([str(v).lower() for v in row.values() if v])
                         
                         # Voltage identification
@@ -1075,6 +1089,7 @@ def get_energy_charges(json_path, target_year):
                                         if v_level: priority = 2
                                         
                                         candidates.append((t_year_val, priority, f_val, v_level))
+                                        trace.match((t_year_val, priority, f_val, v_level), note="candidate")
                                 except: pass
 
     except Exception as e:
@@ -1110,6 +1125,7 @@ def get_energy_charges(json_path, target_year):
 
     return charges
 
+@traced
 def get_pf_adjustment_rebate(json_path, target_year):
     """
     Extract Power Factor Adjustment Rebate.
@@ -1128,7 +1144,7 @@ def get_pf_adjustment_rebate(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 text = str(data).lower()
                 
                 # Check if any keyword is present
@@ -1136,7 +1152,7 @@ def get_pf_adjustment_rebate(json_path, target_year):
                     if kw in text:
                         # Look for numeric values in rows
                         rows = data.get("rows", [])
-                        for row in rows:
+                        for row in trace.rows(rows):
                             r_str = str(row).lower()
                             if kw in r_str:
                                 # Try to extract numeric value
@@ -1148,6 +1164,8 @@ def get_pf_adjustment_rebate(json_path, target_year):
                                                 f_val = float(v_clean)
                                                 if 0 < f_val < 5:  # Reasonable range for rebate
                                                     rebate = f_val
+                                                    trace.match(f_val)
+                                                    trace.match(rebate)
                                                     return rebate
                                             except: pass
     except Exception as e:
@@ -1155,6 +1173,7 @@ def get_pf_adjustment_rebate(json_path, target_year):
     
     return rebate
 
+@traced
 def get_load_factor_incentive(json_path, target_year):
     """
     Extract Load Factor Incentive/Discount.
@@ -1167,6 +1186,7 @@ def get_load_factor_incentive(json_path, target_year):
     # Therefore, returning "NA" as the data is not in the required format.
     return "NA"
 
+@traced
 def get_grid_support_charges(json_path, target_year):
     """
     Extract Grid Support/Parallel Operation charges.
@@ -1187,7 +1207,7 @@ def get_grid_support_charges(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 heading = data.get("table_heading", "").lower()
                 text = str(data).lower()
@@ -1202,7 +1222,7 @@ def get_grid_support_charges(json_path, target_year):
                 if found_keyword and "rows" in data and len(data["rows"]) > 0:
                     headers = [str(h) for h in data.get("headers", []) if h]
                     
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         row_text = " ".join([str(v).lower() for v in row.values() if v])
                         
                         # Check if row mentions grid support or parallel operation
@@ -1216,6 +1236,8 @@ def get_grid_support_charges(json_path, target_year):
                                             f_val = float(v_clean)
                                             if 0 < f_val < 10:  # Reasonable range for charges
                                                 charge = f_val
+                                                trace.match(f_val)
+                                                trace.match(charge)
                                                 return charge
                                         except: pass
     except Exception as e:
@@ -1223,6 +1245,7 @@ def get_grid_support_charges(json_path, target_year):
     
     return charge
 
+@traced
 def get_ht_ehv_rebate(json_path, target_year):
     """
     Extract HT/EHV Rebate for different voltage levels.
@@ -1248,7 +1271,7 @@ def get_ht_ehv_rebate(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 heading = data.get("table_heading", "").lower()
                 text = str(data).lower()
@@ -1263,7 +1286,7 @@ def get_ht_ehv_rebate(json_path, target_year):
                 if found_keyword and "rows" in data and len(data["rows"]) > 0:
                     headers = [str(h) for h in data.get("headers", []) if h]
                     
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         row_text = " ".join([str(v).lower() for v in row.values() if v])
                         
                         # Check if row mentions HT or EHV rebate
@@ -1285,12 +1308,14 @@ def get_ht_ehv_rebate(json_path, target_year):
                                             if 0 < f_val < 10:  # Reasonable range for rebate
                                                 if v_level:
                                                     rebates[v_level] = f_val
+                                                    trace.match(f_val)
                                         except: pass
     except Exception as e:
         print(f"Error extracting HT/EHV Rebate: {e}")
     
     return rebates
 
+@traced
 def get_bulk_consumption_rebate(json_path, target_year):
     """
     Extract Bulk Consumption Rebate.
@@ -1310,7 +1335,7 @@ def get_bulk_consumption_rebate(json_path, target_year):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             for line in f:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 
                 heading = data.get("table_heading", "").lower()
                 text = str(data).lower()
@@ -1325,7 +1350,7 @@ def get_bulk_consumption_rebate(json_path, target_year):
                 if found_keyword and "rows" in data and len(data["rows"]) > 0:
                     headers = [str(h) for h in data.get("headers", []) if h]
                     
-                    for row in data["rows"]:
+                    for row in trace.rows(data["rows"]):
                         row_text = " ".join([str(v).lower() for v in row.values() if v])
                         
                         # Check if row mentions bulk consumption
@@ -1339,6 +1364,8 @@ def get_bulk_consumption_rebate(json_path, target_year):
                                             f_val = float(v_clean)
                                             if 0 < f_val < 10:  # Reasonable range for rebate
                                                 rebate = f_val
+                                                trace.match(f_val)
+                                                trace.match(rebate)
                                                 return rebate
                                         except: pass
     except Exception as e:
@@ -1346,6 +1373,7 @@ def get_bulk_consumption_rebate(json_path, target_year):
     
     return rebate
 
+@traced
 def extract_ists_loss(json_path):
     try:
         if os.path.exists(json_path):
@@ -1493,7 +1521,7 @@ def update_excel(excel_path, state_name, discom_name, ists_loss, insts_loss, whe
         print(f"Error updating Excel: {e}")
 
 def main():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    base_dir = workspace_root()
     extraction_root = os.path.join(base_dir, "Extraction")
     json_file = None
     
@@ -1585,4 +1613,7 @@ def main():
     update_excel(excel_path, state_name, discom_name, ists_loss, insts_loss, wheeling_losses, insts_charges, wheeling_charges, css_charges, additional_surcharge, fixed_charges, energy_charges, pf_adjustment_rebate, load_factor_incentive, grid_support_charges, ht_ehv_rebate, bulk_consumption_rebate)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        write_report("Chhattisgarh")
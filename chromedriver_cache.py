@@ -0,0 +1,113 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+
+# ---------- CONFIGURATION ----------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# {chrome version: chromedriver path}, written once per Chrome version
+CACHE_PATH = os.getenv("CHROMEDRIVER_CACHE", os.path.join(BASE_DIR, ".chromedriver_cache.json"))
+# A chromedriver to use as is (air-gapped hosts); skips detection and the cache
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+CHROME_BINARIES = [os.getenv("CHROME_BINARY")] if os.getenv("CHROME_BINARY") else [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+_lock = threading.Lock()
+_resolved = {}  # chrome version -> driver path, for this process
+
+
+def chrome_version():
+    """Installed Chrome version ("131.0.6778.85"), read locally without starting a browser; None if unknown"""
+    if sys.platform == "win32":
+        import winreg
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(hive, r"Software\Google\Chrome\BLBeacon") as key:
+                    return winreg.QueryValueEx(key, "version")[0]
+            except OSError:
+                continue
+        return None
+    for binary in CHROME_BINARIES:
+        try:
+            out = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        match = re.search(r"\d+(\.\d+){3}", out)
+        if match:
+            return match.group(0)
+    return None
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    # Several downloaders may resolve at once; each writes a whole file and renames it into place
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _install():
+    """Downloads the matching chromedriver; the only step that needs the network"""
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        return None
+    try:
+        return ChromeDriverManager().install()
+    except Exception as e:
+        print(f"chromedriver download failed: {e}")
+        return None
+
+
+def resolve_driver(refresh=False, path=CACHE_PATH):
+    """
+    Path of the chromedriver for the installed Chrome, resolved once per Chrome
+    version and kept in CACHE_PATH. When Chrome's version cannot be read the
+    newest cached driver is used. None means no driver could be resolved:
+    Selenium then falls back to its own driver lookup.
+    """
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH
+    version = chrome_version() or ""
+    with _lock:
+        if not refresh and version in _resolved:
+            return _resolved[version]
+        cache = load_cache(path)
+        driver = None if refresh else cache.get(version)
+        if driver is None and not version and not refresh:
+            existing = [p for p in cache.values() if os.path.exists(p)]
+            driver = existing[-1] if existing else None
+        if driver and not os.path.exists(driver):
+            driver = None
+        if driver is None:
+            driver = _install()
+            if driver and version:
+                cache[version] = driver
+                save_cache(cache, path)
+        _resolved[version] = driver
+        return driver
+
+
+def chrome_service():
+    """selenium Service for webdriver.Chrome(service=...), using the cached driver"""
+    from selenium.webdriver.chrome.service import Service
+    driver = resolve_driver()
+    return Service(driver) if driver else Service()
+
+
+if __name__ == "__main__":
+    # python chromedriver_cache.py [--refresh]: resolves (or re-downloads) the driver for this Chrome
+    print(f"Chrome {chrome_version() or 'not found'}")
+    print(f"chromedriver: {resolve_driver(refresh='--refresh' in sys.argv) or 'not resolved (Selenium will look it up)'}")
@@ -15,6 +15,19 @@ files = [
     "uttarpradesh.xlsx"
 ]
 
+# Excel file(s) written by each state processor, for per-state clearing
+state_files = {
+    "Assam": ["Assam.xlsx"],
+    "Himachal Pradesh": ["Himachalpradesh.xlsx"],
+    "Madhya Pradesh": ["Madhya Pradesh.xlsx"],
+    "Meghalaya": ["Meghalaya.xlsx"],
+    "Puducherry": ["Puducherry.xlsx"],
+    "Rajasthan": ["Rajastan.xlsx", "Rajasthan.xlsx"],
+    "Bihar": ["bihar.xlsx"],
+    "Chhattisgarh": ["chhattisgarh.xlsx"],
+    "Uttar Pradesh": ["uttarpradesh.xlsx"],
+}
+
 def clear_excel(path):
     if not os.path.exists(path):
         print(f"File not found: {path}")
@@ -41,7 +54,16 @@ def clear_excel(path):
         print(f"Error clearing {path}: {e}")
 
 if __name__ == "__main__":
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    for f in files:
+    import sys
+    from workspace import workspace_root
+    base_dir = workspace_root()
+    # Optional: python clear_excels.py --states "Assam,Bihar" clears only those states' files
+    targets = files
+    if "--states" in sys.argv:
+        idx = sys.argv.index("--states")
+        if idx + 1 < len(sys.argv):
+            selected = [s.strip() for s in sys.argv[idx + 1].split(",") if s.strip()]
+            targets = [f for s in selected for f in state_files.get(s, [])]
+    for f in targets:
         file_path = os.path.join(base_dir, f)
         clear_excel(file_path)
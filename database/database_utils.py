@@ -1,10 +1,69 @@
 import sqlite3
 import os
 import openpyxl
+import time
 from datetime import datetime
+try:
+    import metrics  # repo root module; missing when this file is run as a script
+except ImportError:
+    metrics = None
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tariff_orders.db")
 
+# Column mapping (Target DB Field -> Excel Header Name)
+EXCEL_COLUMNS = {
+    'financial_year': 'Financial Year',
+    'state': 'States',
+    'discom': 'DISCOM',
+    'ists_loss': 'ISTS Loss',
+    'insts_loss': 'InSTS Loss',
+    'wheeling_loss_11kv': 'Wheeling Loss - 11 kV',
+    'wheeling_loss_33kv': 'Wheeling Loss - 33 kV',
+    'wheeling_loss_66kv': 'Wheeling Loss - 66 kV',
+    'wheeling_loss_132kv': 'Wheeling Loss - 132 kV',
+    'ists_charges': 'ISTS Charges',
+    'insts_charges': 'InSTS Charges',
+    'wheeling_charges_11kv': 'Wheeling Charges - 11 kV',
+    'wheeling_charges_33kv': 'Wheeling Charges - 33 kV',
+    'wheeling_charges_66kv': 'Wheeling Charges - 66 kV',
+    'wheeling_charges_132kv': 'Wheeling Charges - 132 kV',
+    'css_charges_11kv': 'Cross Subsidy Surcharge - 11 kV',
+    'css_charges_33kv': 'Cross Subsidy Surcharge - 33 kV',
+    'css_charges_66kv': 'Cross Subsidy Surcharge - 66 kV',
+    'css_charges_132kv': 'Cross Subsidy Surcharge - 132 kV',
+    'css_charges_220kv': 'Cross Subsidy Surcharge - 220 kV',
+    'additional_surcharge': 'Additional Surcharge',
+    'electricity_duty': 'Electric Duty',
+    'tax_on_sale': 'Tax on Sale',
+    'fixed_charge_11kv': 'Fixed Charge - 11 kV',
+    'fixed_charge_33kv': 'Fixed Charge - 33 kV',
+    'fixed_charge_66kv': 'Fixed Charge - 66 kV',
+    'fixed_charge_132kv': 'Fixed Charge - 132 kV',
+    'fixed_charge_220kv': 'Fixed Charge - 220 kV',
+    'energy_charge_11kv': 'Energy Charge - 11 kV',
+    'energy_charge_33kv': 'Energy Charge - 33 kV',
+    'energy_charge_66kv': 'Energy Charge - 66 kV',
+    'energy_charge_132kv': 'Energy Charge - 132 kV',
+    'energy_charge_220kv': 'Energy Charge - 220 kV',
+    'fuel_surcharge': 'Fuel Surcharge',
+    'tod_charges': 'TOD Charges',
+    'pf_rebate': 'Power Factor Adjustment Rebate',
+    'lf_incentive': 'Load Factor Incentive',
+    'grid_support_parallel_op_charges': 'Grid Support /Parrallel Operation',
+    'ht_ehv_rebate_33_66kv': 'HT ,EHV Rebate at 33/66 kV',
+    'ht_ehv_rebate_132_above': 'HT ,EHV Rebate at 132 kV and above ',
+    'bulk_rebate': 'Bulk Consumption Rebate'
+}
+
+# Also handle some variations
+EXCEL_COLUMN_VARIATIONS = {
+    'fixed_charge_11kv': ['Fixed Charge - 11 Kv', 'Fixed Charge - 11kV'],
+    'fixed_charge_33kv': ['Fixed Charge - 33kV'],
+    'energy_charge_11kv': ['Energy Charge - 11kV'],
+    'ht_ehv_rebate_132_above': ['HT ,EHV Rebate at 132 kV and above', 'HT ,EHV Rebate at 132 kV and above '],
+    'grid_support_parallel_op_charges': ['Grid Support /Parallel Operation', 'Grid Support /Parrallel Operation', 'Grid Support / Parallel Operation Charges']
+}
+
 def init_db():
     """Initializes the SQLite database and creates the tariff_data table."""
     conn = sqlite3.connect(DB_PATH)
@@ -56,10 +115,25 @@ def init_db():
             updated_at DATETIME
         )
     ''')
+    ensure_indexes(conn)
     conn.commit()
     conn.close()
     print(f"Database initialized at {DB_PATH}")
 
+_indexes_ready = False
+
+def ensure_indexes(conn):
+    """Indexes for the /get-db-data filters and its max(updated_at) ETag."""
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    conn.executescript('''
+        CREATE INDEX IF NOT EXISTS idx_tariff_state_discom ON tariff_data (state COLLATE NOCASE, discom COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_tariff_financial_year ON tariff_data (financial_year);
+        CREATE INDEX IF NOT EXISTS idx_tariff_updated_at ON tariff_data (updated_at);
+    ''')
+    _indexes_ready = True
+
 def save_tariff_row(data):
     """
     Saves or updates a single row of tariff data.
@@ -68,6 +142,7 @@ def save_tariff_row(data):
     if not os.path.exists(DB_PATH):
         init_db()
         
+    started = time.monotonic()
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
@@ -101,11 +176,98 @@ def save_tariff_row(data):
         
     conn.commit()
     conn.close()
+    if metrics is not None:
+        metrics.SQLITE_WRITE_SECONDS.observe(time.monotonic() - started, operation="update" if existing else "insert")
+
+def get_state_rows(state):
+    """
+    Rows of one state as the dashboard shows an Excel sheet: a header row of
+    Excel column names followed by the data rows. Returns (rows, last_updated).
+    """
+    if not os.path.exists(DB_PATH):
+        return None, None
+    fields = list(EXCEL_COLUMNS.keys())
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {', '.join(fields)}, updated_at FROM tariff_data WHERE lower(state) = lower(?) ORDER BY discom, id",
+            (state,)
+        )
+        records = cursor.fetchall()
+    finally:
+        conn.close()
+    rows = [[EXCEL_COLUMNS[f].strip() for f in fields]]
+    rows += [[str(v) if v is not None else "" for v in r[:-1]] for r in records]
+    last_updated = max((r[-1] or "" for r in records), default=None)
+    return rows, last_updated
+
+def table_columns(conn):
+    return [row[1] for row in conn.execute("PRAGMA table_info(tariff_data)")]
+
+def data_version():
+    """(max(updated_at), row count) of tariff_data; changes whenever a row is written"""
+    if not os.path.exists(DB_PATH):
+        return None
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return tuple(conn.execute("SELECT max(updated_at), count(*) FROM tariff_data").fetchone())
+    finally:
+        conn.close()
+
+def query_tariff_rows(state=None, discom=None, financial_year=None, columns=None, limit=500, cursor=None):
+    """
+    Filtered, projected page of tariff_data ordered by id.
+    cursor is the last id of the previous page; returns (rows, next_cursor),
+    next_cursor being None on the last page. Raises ValueError on unknown columns.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        ensure_indexes(conn)
+        known = table_columns(conn)
+        if columns:
+            unknown = [c for c in columns if c not in known]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+            selected = ["id"] + [c for c in columns if c != "id"]
+        else:
+            selected = known
+
+        where, params = [], []
+        if state:
+            where.append("state = ? COLLATE NOCASE")
+            params.append(state)
+        if discom:
+            where.append("discom = ? COLLATE NOCASE")
+            params.append(discom)
+        if financial_year:
+            where.append("financial_year = ?")
+            params.append(financial_year)
+        if cursor is not None:
+            where.append("id > ?")
+            params.append(cursor)
+
+        sql = f"SELECT {', '.join(selected)} FROM tariff_data"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id LIMIT ?"
+        params.append(limit + 1)
+        rows = [dict(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]["id"]
+    return rows, next_cursor
 
 def sync_excel_to_db(excel_path):
     """
     Reads an Excel file and syncs its content to the database.
     Assumes standard column mapping discovered for this project.
+    Returns the number of rows written, or None if the sync failed.
     """
     if not os.path.exists(excel_path):
         return
@@ -121,70 +283,17 @@ def sync_excel_to_db(excel_path):
             try: return headers.index(name) + 1
             except: return None
 
-        # Column mapping (Target DB Field -> Excel Header Name)
-        mapping = {
-            'financial_year': 'Financial Year',
-            'state': 'States',
-            'discom': 'DISCOM',
-            'ists_loss': 'ISTS Loss',
-            'insts_loss': 'InSTS Loss',
-            'wheeling_loss_11kv': 'Wheeling Loss - 11 kV',
-            'wheeling_loss_33kv': 'Wheeling Loss - 33 kV',
-            'wheeling_loss_66kv': 'Wheeling Loss - 66 kV',
-            'wheeling_loss_132kv': 'Wheeling Loss - 132 kV',
-            'ists_charges': 'ISTS Charges',
-            'insts_charges': 'InSTS Charges',
-            'wheeling_charges_11kv': 'Wheeling Charges - 11 kV',
-            'wheeling_charges_33kv': 'Wheeling Charges - 33 kV',
-            'wheeling_charges_66kv': 'Wheeling Charges - 66 kV',
-            'wheeling_charges_132kv': 'Wheeling Charges - 132 kV',
-            'css_charges_11kv': 'Cross Subsidy Surcharge - 11 kV',
-            'css_charges_33kv': 'Cross Subsidy Surcharge - 33 kV',
-            'css_charges_66kv': 'Cross Subsidy Surcharge - 66 kV',
-            'css_charges_132kv': 'Cross Subsidy Surcharge - 132 kV',
-            'css_charges_220kv': 'Cross Subsidy Surcharge - 220 kV',
-            'additional_surcharge': 'Additional Surcharge',
-            'electricity_duty': 'Electric Duty',
-            'tax_on_sale': 'Tax on Sale',
-            'fixed_charge_11kv': 'Fixed Charge - 11 kV',
-            'fixed_charge_33kv': 'Fixed Charge - 33 kV',
-            'fixed_charge_66kv': 'Fixed Charge - 66 kV',
-            'fixed_charge_132kv': 'Fixed Charge - 132 kV',
-            'fixed_charge_220kv': 'Fixed Charge - 220 kV',
-            'energy_charge_11kv': 'Energy Charge - 11 kV',
-            'energy_charge_33kv': 'Energy Charge - 33 kV',
-            'energy_charge_66kv': 'Energy Charge - 66 kV',
-            'energy_charge_132kv': 'Energy Charge - 132 kV',
-            'energy_charge_220kv': 'Energy Charge - 220 kV',
-            'fuel_surcharge': 'Fuel Surcharge',
-            'tod_charges': 'TOD Charges',
-            'pf_rebate': 'Power Factor Adjustment Rebate',
-            'lf_incentive': 'Load Factor Incentive',
-            'grid_support_parallel_op_charges': 'Grid Support /Parrallel Operation',
-            'ht_ehv_rebate_33_66kv': 'HT ,EHV Rebate at 33/66 kV',
-            'ht_ehv_rebate_132_above': 'HT ,EHV Rebate at 132 kV and above ',
-            'bulk_rebate': 'Bulk Consumption Rebate'
-        }
-
-        # Also handle some variations
-        mapping_variations = {
-            'fixed_charge_11kv': ['Fixed Charge - 11 Kv', 'Fixed Charge - 11kV'],
-            'fixed_charge_33kv': ['Fixed Charge - 33kV'],
-            'energy_charge_11kv': ['Energy Charge - 11kV'],
-            'ht_ehv_rebate_132_above': ['HT ,EHV Rebate at 132 kV and above', 'HT ,EHV Rebate at 132 kV and above '],
-            'grid_support_parallel_op_charges': ['Grid Support /Parallel Operation', 'Grid Support /Parrallel Operation', 'Grid Support / Parallel Operation Charges']
-        }
-
         col_idxs = {}
-        for db_field, header_name in mapping.items():
+        for db_field, header_name in EXCEL_COLUMNS.items():
             idx = get_col(header_name)
-            if idx is None and db_field in mapping_variations:
-                for var in mapping_variations[db_field]:
+            if idx is None and db_field in EXCEL_COLUMN_VARIATIONS:
+                for var in EXCEL_COLUMN_VARIATIONS[db_field]:
                     idx = get_col(var)
                     if idx: break
             col_idxs[db_field] = idx
 
         # Start from row 3 (data rows)
+        synced = 0
         for row_idx in range(3, sheet.max_row + 1):
             row_data = {}
             for db_field, col_idx in col_idxs.items():
@@ -200,8 +309,10 @@ def sync_excel_to_db(excel_path):
                 if "rajastan" in state_val.lower(): row_data['state'] = "Rajasthan"
                 
                 save_tariff_row(row_data)
+                synced += 1
 
         print(f"Synced {excel_path} to database.")
+        return synced
     except Exception as e:
         print(f"Error syncing {excel_path}: {e}")
 
@@ -0,0 +1,184 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+HISTORY_PATH = os.getenv("RUN_HISTORY_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_history.db"))
+
+# Step counters are derived from the Prometheus samples a pipeline script reports
+# ("__PROM__ {json}" lines, see metrics.apply_line); rows_written is counted by the app
+METRIC_NAMES = ("bytes_downloaded", "pages_scraped", "rows_written")
+SAMPLE_COUNTERS = {"download_bytes_total": "bytes_downloaded", "scraper_pages_total": "pages_scraped"}
+
+
+def sample_counters(sample):
+    """The step counters a metrics sample adds to as {name: number}; empty for any other metric"""
+    name = SAMPLE_COUNTERS.get(sample.get("name"))
+    value = sample.get("value")
+    if name is None or not isinstance(value, (int, float)):
+        return {}
+    return {name: value}
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _connect(path=HISTORY_PATH):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_history(conn):
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            mode TEXT,
+            states TEXT,
+            stages TEXT,
+            status TEXT,
+            started_at TEXT,
+            finished_at TEXT,
+            duration REAL
+        );
+        CREATE TABLE IF NOT EXISTS steps (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER REFERENCES runs(id),
+            name TEXT,
+            display TEXT,
+            stage TEXT,
+            state TEXT,
+            status TEXT,
+            exit_code INTEGER,
+            started_at TEXT,
+            finished_at TEXT,
+            duration REAL,
+            bytes_downloaded INTEGER,
+            pages_scraped INTEGER,
+            rows_written INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_steps_run ON steps (run_id);
+        CREATE INDEX IF NOT EXISTS idx_steps_name ON steps (name, run_id);
+    ''')
+    conn.commit()
+
+
+class RunRecorder:
+    """
+    Writes one agent run to the history database: a runs row when it starts,
+    a steps row as each step finishes and the final status at the end.
+    """
+
+    def __init__(self, job, path=HISTORY_PATH):
+        self.path = path
+        self._started = {}  # step name -> (started_at, perf_counter)
+        self._recorded = set()
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        with _connect(self.path) as conn:
+            init_history(conn)
+            cur = conn.execute(
+                "INSERT INTO runs (job_id, mode, states, stages, status, started_at) VALUES (?, ?, ?, ?, 'running', ?)",
+                (job.id, job.mode, json.dumps(job.states), json.dumps(job.stages), _now()))
+            self.run_id = cur.lastrowid
+
+    def step_started(self, task):
+        with self._lock:
+            self._started[task.name] = (_now(), time.perf_counter())
+
+    def step_finished(self, task, status, exit_code=None, metrics=None):
+        metrics = metrics or {}
+        with self._lock:
+            if task.name in self._recorded:
+                return
+            self._recorded.add(task.name)
+            started_at, t0 = self._started.get(task.name, (None, None))
+        duration = time.perf_counter() - t0 if t0 is not None else None
+        with _connect(self.path) as conn:
+            conn.execute('''
+                INSERT INTO steps (run_id, name, display, stage, state, status, exit_code, started_at, finished_at,
+                                   duration, bytes_downloaded, pages_scraped, rows_written)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (self.run_id, task.name, task.display, task.stage, task.state, status, exit_code,
+                  started_at, _now() if started_at else None, duration,
+                  *(metrics.get(name) for name in METRIC_NAMES)))
+
+    def finish(self, status, tasks=()):
+        """Closes the run; tasks that never finished are recorded with the run's status"""
+        for task in tasks:
+            self.step_finished(task, "cancelled" if status == "cancelled" else "not run")
+        with _connect(self.path) as conn:
+            conn.execute("UPDATE runs SET status = ?, finished_at = ?, duration = ? WHERE id = ?",
+                         (status, _now(), time.perf_counter() - self._t0, self.run_id))
+
+
+def _run_dict(row):
+    run = dict(row)
+    run["states"] = json.loads(run["states"]) if run["states"] else None
+    run["stages"] = json.loads(run["stages"]) if run["stages"] else None
+    return run
+
+
+def list_runs(limit=50, path=HISTORY_PATH):
+    """Most recent runs first, with their step count and summed counters"""
+    if not os.path.exists(path):
+        return []
+    with _connect(path) as conn:
+        rows = conn.execute('''
+            SELECT r.*, COUNT(s.id) AS step_count,
+                   SUM(s.status = 'failed' OR s.status = 'timeout') AS failed_steps,
+                   SUM(s.bytes_downloaded) AS bytes_downloaded,
+                   SUM(s.pages_scraped) AS pages_scraped,
+                   SUM(s.rows_written) AS rows_written
+            FROM runs r LEFT JOIN steps s ON s.run_id = r.id
+            GROUP BY r.id ORDER BY r.id DESC LIMIT ?
+        ''', (limit,)).fetchall()
+    return [_run_dict(r) for r in rows]
+
+
+def get_run(run_id, path=HISTORY_PATH):
+    """A run with all of its steps in the order they finished, or None"""
+    if not os.path.exists(path):
+        return None
+    with _connect(path) as conn:
+        run = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            return None
+        steps = conn.execute("SELECT * FROM steps WHERE run_id = ? ORDER BY id", (run_id,)).fetchall()
+    run = _run_dict(run)
+    run["steps"] = [dict(s) for s in steps]
+    return run
+
+
+def step_durations(limit=20, path=HISTORY_PATH):
+    """
+    Duration series for the dashboard chart:
+    {"runs": [{id, started_at}, ...], "steps": {display: [seconds or None per run]}}
+    over the last limit runs, oldest first. Only steps that actually ran are included.
+    """
+    if not os.path.exists(path):
+        return {"runs": [], "steps": {}}
+    with _connect(path) as conn:
+        runs = conn.execute("SELECT id, started_at FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()[::-1]
+        if not runs:
+            return {"runs": [], "steps": {}}
+        rows = conn.execute('''
+            SELECT run_id, display, duration FROM steps
+            WHERE run_id >= ? AND duration IS NOT NULL AND status IN ('done', 'failed', 'timeout')
+            ORDER BY id
+        ''', (runs[0]["id"],)).fetchall()
+    index = {r["id"]: i for i, r in enumerate(runs)}
+    series = {}
+    for r in rows:
+        series.setdefault(r["display"], [None] * len(runs))[index[r["run_id"]]] = round(r["duration"], 2)
+    return {"runs": [dict(r) for r in runs], "steps": series}
+
+
+if __name__ == "__main__":
+    for run in list_runs(limit=10):
+        print(f"#{run['id']:<4} {run['started_at']}  {run['status']:<10} {run['duration'] or 0:8.1f}s  "
+              f"{run['step_count']} steps, {run['failed_steps'] or 0} failed")
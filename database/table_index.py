@@ -0,0 +1,257 @@
+import json
+import os
+import sqlite3
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "table_index.db")
+
+
+def _connect(path=INDEX_PATH):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _has_trigram(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.trigram_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp.trigram_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def init_index(conn):
+    """
+    Creates the index schema. The FTS5 table uses the trigram tokenizer when
+    available (SQLite >= 3.34) so MATCH behaves like a case-insensitive substring
+    search, which is what the extractors' `keyword in heading` checks do.
+    """
+    tokenizer = "trigram" if _has_trigram(conn) else "unicode61"
+    conn.executescript(f'''
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            state TEXT,
+            document_name TEXT,
+            jsonl_path TEXT UNIQUE,
+            mtime_ns INTEGER,
+            size INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS extracted_tables (
+            id INTEGER PRIMARY KEY,
+            document_id INTEGER REFERENCES documents(id),
+            line_no INTEGER,
+            page_number INTEGER,
+            table_index INTEGER,
+            table_heading TEXT,
+            headers TEXT,
+            row_count INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_extracted_tables_document ON extracted_tables (document_id);
+        CREATE VIRTUAL TABLE IF NOT EXISTS tables_fts USING fts5(
+            table_heading, headers, rows_text, tokenize='{tokenizer}'
+        );
+        CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT);
+    ''')
+    conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('tokenizer', ?)", (tokenizer,))
+    conn.commit()
+
+
+def _tokenizer(conn):
+    row = conn.execute("SELECT value FROM index_meta WHERE key = 'tokenizer'").fetchone()
+    return row[0] if row else None
+
+
+def _rows_text(rows):
+    parts = []
+    for row in rows:
+        parts.append(" | ".join(str(v) for v in row.values() if v not in (None, "")))
+    return "\n".join(parts)
+
+
+def index_jsonl(conn, jsonl_path, state=None):
+    """(Re)indexes every table of one JSONL file, returns the number of tables indexed"""
+    jsonl_path = os.path.abspath(jsonl_path)
+    st = os.stat(jsonl_path)
+    if state is None:
+        state = os.path.basename(os.path.dirname(jsonl_path))
+
+    old = conn.execute("SELECT id FROM documents WHERE jsonl_path = ?", (jsonl_path,)).fetchone()
+    if old:
+        conn.execute("DELETE FROM tables_fts WHERE rowid IN (SELECT id FROM extracted_tables WHERE document_id = ?)", (old[0],))
+        conn.execute("DELETE FROM extracted_tables WHERE document_id = ?", (old[0],))
+        conn.execute("DELETE FROM documents WHERE id = ?", (old[0],))
+
+    cur = conn.execute(
+        "INSERT INTO documents (state, document_name, jsonl_path, mtime_ns, size) VALUES (?, ?, ?, ?, ?)",
+        (state, os.path.basename(jsonl_path), jsonl_path, st.st_mtime_ns, st.st_size)
+    )
+    document_id = cur.lastrowid
+    count = 0
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f):
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue
+            heading = data.get("table_heading", "") or ""
+            headers = [str(h) for h in data.get("headers", []) if h]
+            rows = data.get("rows", [])
+            cur = conn.execute(
+                "INSERT INTO extracted_tables (document_id, line_no, page_number, table_index, table_heading, headers, row_count) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (document_id, line_no, data.get("page_number"), data.get("table_index"), heading, json.dumps(headers, ensure_ascii=False), len(rows))
+            )
+            conn.execute(
+                "INSERT INTO tables_fts (rowid, table_heading, headers, rows_text) VALUES (?, ?, ?, ?)",
+                (cur.lastrowid, heading, " | ".join(headers), _rows_text(rows))
+            )
+            count += 1
+    return count
+
+
+def build_index(extraction_root, index_path=INDEX_PATH):
+    """Rebuilds the index from every JSONL file under extraction_root"""
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    conn = _connect(index_path)
+    try:
+        init_index(conn)
+        total = 0
+        for root, _, files in os.walk(extraction_root):
+            for name in sorted(files):
+                if name.lower().endswith(".jsonl"):
+                    state = os.path.relpath(root, extraction_root).split(os.sep)[0]
+                    total += index_jsonl(conn, os.path.join(root, name), state=state)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Indexed {total} tables into {index_path}")
+    return total
+
+
+def index_states(extraction_root, states, index_path=INDEX_PATH):
+    """Replaces the indexed tables of the given Extraction sub-folders, leaving other states as they are"""
+    conn = _connect(index_path)
+    try:
+        init_index(conn)
+        total = 0
+        for state in states:
+            for (doc_id,) in conn.execute("SELECT id FROM documents WHERE state = ?", (state,)).fetchall():
+                conn.execute("DELETE FROM tables_fts WHERE rowid IN (SELECT id FROM extracted_tables WHERE document_id = ?)", (doc_id,))
+                conn.execute("DELETE FROM extracted_tables WHERE document_id = ?", (doc_id,))
+                conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            for root, _, files in os.walk(os.path.join(extraction_root, state)):
+                for name in sorted(files):
+                    if name.lower().endswith(".jsonl"):
+                        total += index_jsonl(conn, os.path.join(root, name), state=state)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Indexed {total} tables for {', '.join(states)} into {index_path}")
+    return total
+
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_match(keywords, column=None, mode="all"):
+    """
+    FTS5 MATCH expression for plain keywords (AND for mode="all", OR for "any"),
+    optionally restricted to one column. Returns None if a keyword is too short
+    for the trigram tokenizer, in which case the caller must not filter.
+    """
+    terms = [k.strip() for k in keywords if k and k.strip()]
+    if not terms or any(len(t) < 3 for t in terms):
+        return None
+    prefix = f"{column} : " if column else ""
+    joiner = " AND " if mode == "all" else " OR "
+    return joiner.join(prefix + _quote(t) for t in terms)
+
+
+def search_tables(query, state=None, limit=20, index_path=INDEX_PATH):
+    """
+    Full-text search over table headings, headers and row text.
+    Each whitespace-separated word must appear; results are ordered by bm25.
+    """
+    if not os.path.exists(index_path):
+        return []
+    words = query.split()
+    match = build_match(words)
+    if match is None:
+        words = [w for w in words if len(w) >= 3]
+        match = build_match(words)
+        if match is None:
+            return []
+    conn = _connect(index_path)
+    try:
+        sql = '''
+            SELECT d.state, d.document_name, t.page_number, t.table_index, t.line_no,
+                   t.table_heading, t.headers, t.row_count,
+                   snippet(tables_fts, -1, '[', ']', '...', 12) AS snippet
+            FROM tables_fts
+            JOIN extracted_tables t ON t.id = tables_fts.rowid
+            JOIN documents d ON d.id = t.document_id
+            WHERE tables_fts MATCH ?
+        '''
+        params = [match]
+        if state:
+            sql += " AND lower(d.state) = lower(?)"
+            params.append(state)
+        sql += " ORDER BY bm25(tables_fts) LIMIT ?"
+        params.append(limit)
+        results = []
+        for row in conn.execute(sql, params):
+            item = dict(row)
+            item["headers"] = json.loads(item["headers"]) if item["headers"] else []
+            results.append(item)
+        return results
+    finally:
+        conn.close()
+
+
+def candidate_lines(jsonl_path, keywords, column="table_heading", mode="all", index_path=INDEX_PATH):
+    """
+    Pre-filter for extractors: the set of JSONL line numbers whose tables can
+    contain the keywords. Returns None when the index cannot answer exactly
+    (no index, file not indexed or changed since, non-substring tokenizer,
+    keywords too short), meaning the caller should scan every line.
+    """
+    if not jsonl_path or not os.path.exists(index_path):
+        return None
+    match = build_match(keywords, column=column, mode=mode)
+    if match is None:
+        return None
+    try:
+        st = os.stat(jsonl_path)
+        conn = _connect(index_path)
+        try:
+            if _tokenizer(conn) != "trigram":
+                return None
+            doc = conn.execute(
+                "SELECT id FROM documents WHERE jsonl_path = ? AND mtime_ns = ? AND size = ?",
+                (os.path.abspath(jsonl_path), st.st_mtime_ns, st.st_size)
+            ).fetchone()
+            if not doc:
+                return None
+            rows = conn.execute('''
+                SELECT t.line_no FROM tables_fts
+                JOIN extracted_tables t ON t.id = tables_fts.rowid
+                WHERE tables_fts MATCH ? AND t.document_id = ?
+            ''', (match, doc[0])).fetchall()
+            return {r[0] for r in rows}
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        root = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Extraction")
+        build_index(root)
+    elif len(sys.argv) > 1:
+        for hit in search_tables(" ".join(sys.argv[1:])):
+            print(f"{hit['state']:<20} {hit['document_name'][:40]:<40} p{hit['page_number']:<4} t{hit['table_index']:<3} {hit['table_heading'][:60]}")
+    else:
+        print("Usage: python database/table_index.py build [extraction_root] | <search words>")
@@ -0,0 +1,160 @@
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import extractor_trace
+
+# ---------- CONFIGURATION ----------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.getenv("EXTRACTOR_CACHE_PATH", os.path.join(BASE_DIR, "cache", "extractor_cache.db"))
+CACHE_ENABLED = os.getenv("EXTRACTOR_CACHE", "True").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTOR_CACHE_MAX_ENTRIES", 5000))
+
+_hash_memo = {}
+_lock = threading.Lock()
+_schema_ready = set()
+
+
+def file_hash(path):
+    """SHA-256 of a file's content, memoized per (path, mtime, size) for this process"""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    digest = _hash_memo.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _hash_memo[memo_key] = digest
+    return digest
+
+
+def _connect():
+    """Connection to CACHE_PATH; the folder and schema are created once per path and process"""
+    if CACHE_PATH in _schema_ready:
+        return sqlite3.connect(CACHE_PATH, timeout=10)
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=10)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS extractor_cache (
+            cache_key TEXT PRIMARY KEY,
+            extractor TEXT,
+            value TEXT,
+            created_at REAL,
+            last_used REAL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_extractor_cache_last_used ON extractor_cache (last_used)")
+    conn.commit()
+    _schema_ready.add(CACHE_PATH)
+    return conn
+
+
+def cache_get(key):
+    """Returns (True, value) on a hit and refreshes its LRU timestamp, else (False, None)"""
+    with _lock:
+        conn = _connect()
+        try:
+            row = conn.execute("SELECT value FROM extractor_cache WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                return False, None
+            conn.execute("UPDATE extractor_cache SET last_used = ? WHERE cache_key = ?", (time.time(), key))
+            conn.commit()
+        finally:
+            conn.close()
+    payload = json.loads(row[0])
+    value = payload["value"]
+    if payload.get("tuple"):
+        value = tuple(value)
+    return True, value
+
+
+def cache_put(key, extractor, value):
+    """Stores a result and evicts the least recently used entries beyond CACHE_MAX_ENTRIES"""
+    payload = json.dumps({"tuple": isinstance(value, tuple), "value": value}, ensure_ascii=False)
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO extractor_cache (cache_key, extractor, value, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, extractor, payload, now, now)
+            )
+            conn.execute('''
+                DELETE FROM extractor_cache WHERE cache_key IN (
+                    SELECT cache_key FROM extractor_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            ''', (CACHE_MAX_ENTRIES,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def clear_cache(extractor_prefix=None):
+    """Drops all cached results, or only those whose extractor name starts with the prefix"""
+    with _lock:
+        conn = _connect()
+        try:
+            if extractor_prefix:
+                conn.execute("DELETE FROM extractor_cache WHERE extractor LIKE ?", (extractor_prefix + "%",))
+            else:
+                conn.execute("DELETE FROM extractor_cache")
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def cached_extractor(version):
+    """
+    Memoizes an extractor whose first argument is the input file path.
+    The key is the file's content hash, the extractor's module and function name,
+    the version tag (bump it when extraction logic changes) and any extra arguments.
+    """
+    def decorator(func):
+        module_file = func.__globals__.get("__file__") or func.__module__
+        module_name = os.path.splitext(os.path.basename(module_file))[0]
+        extractor = f"{module_name}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(path, *args, **kwargs):
+            # Trace runs re-extract so the trace shows the tables/rows actually scanned
+            if not CACHE_ENABLED or extractor_trace.TRACE_ENABLED or not path or not os.path.exists(path):
+                return func(path, *args, **kwargs)
+            try:
+                extra = json.dumps([args, kwargs], sort_keys=True, default=str)
+                key = f"{file_hash(path)}:{extractor}:{version}:{hashlib.sha1(extra.encode('utf-8')).hexdigest()}"
+                hit, value = cache_get(key)
+                if hit:
+                    return value
+            except Exception as e:
+                print(f"Extractor cache unavailable for {extractor}: {e}")
+                return func(path, *args, **kwargs)
+
+            value = func(path, *args, **kwargs)
+            try:
+                cache_put(key, extractor, value)
+            except Exception as e:
+                print(f"Could not cache {extractor} result: {e}")
+            return value
+
+        wrapper.extractor_name = extractor
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        clear_cache(sys.argv[2] if len(sys.argv) > 2 else None)
+        print(f"Cleared extractor cache at {CACHE_PATH}")
+    else:
+        conn = _connect()
+        for extractor, count in conn.execute("SELECT extractor, COUNT(*) FROM extractor_cache GROUP BY extractor ORDER BY extractor"):
+            print(f"{extractor:<55} {count}")
+        conn.close()
@@ -0,0 +1,190 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# ---------- CONFIGURATION ----------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACE_DIR = os.getenv("EXTRACTOR_TRACE_DIR", os.path.join(BASE_DIR, "traces"))
+TRACE_ENABLED = os.getenv("EXTRACTOR_TRACE", "False").lower() == "true"
+
+_local = threading.local()
+_records = []
+_records_lock = threading.Lock()
+
+
+def enable(flag=True):
+    global TRACE_ENABLED
+    TRACE_ENABLED = flag
+
+
+def _active():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def _preview(value, limit=300):
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def traced(func):
+    """
+    Records wall time, tables/rows scanned, matched locations and the result of
+    one field extractor call when tracing is enabled. Nested traced calls (e.g.
+    a helper used by several extractors) are recorded on their own and also
+    count towards the caller's totals. tables_scanned/rows_scanned stay None
+    (null in the report) unless the call went through the table()/rows()
+    hooks, so extractors without them are not reported as scanning nothing.
+    """
+    module_file = inspect.unwrap(func).__globals__.get("__file__") or func.__module__
+    module_name = os.path.splitext(os.path.basename(module_file))[0]
+    field = f"{module_name}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not TRACE_ENABLED:
+            return func(*args, **kwargs)
+
+        record = {
+            "field": field,
+            "nested": _active() is not None,
+            "args": [_preview(a, 120) for a in args[1:]],
+            "tables_scanned": None,
+            "rows_scanned": None,
+            "matches": [],
+            "current_table": None,
+            "current_row": None,
+        }
+        parent = _active()
+        if not hasattr(_local, "stack"):
+            _local.stack = []
+        _local.stack.append(record)
+        start = time.perf_counter()
+        error = None
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            record["wall_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            _local.stack.pop()
+            record.pop("current_table")
+            record.pop("current_row")
+            if error is not None:
+                record["error"] = str(error) or type(error).__name__
+            else:
+                record["result"] = _preview(result)
+            if parent is not None and record["tables_scanned"] is not None:
+                _counting(parent)
+                parent["tables_scanned"] += record["tables_scanned"]
+                parent["rows_scanned"] += record["rows_scanned"]
+            with _records_lock:
+                _records.append(record)
+
+    return wrapper
+
+
+def _counting(rec):
+    """Marks a record as instrumented: its counts start at zero instead of None"""
+    if rec["tables_scanned"] is None:
+        rec["tables_scanned"] = 0
+        rec["rows_scanned"] = 0
+
+
+def table(data):
+    """Pass-through for a parsed JSONL table record; counts it as scanned"""
+    rec = _active() if TRACE_ENABLED else None
+    if rec is not None:
+        _counting(rec)
+        rec["tables_scanned"] += 1
+        rec["current_table"] = data
+        rec["current_row"] = None
+    return data
+
+
+def rows(row_list):
+    """Pass-through for a table's rows; counts each row as it is visited"""
+    rec = _active() if TRACE_ENABLED else None
+    if rec is None:
+        return row_list
+    _counting(rec)
+    return _counted_rows(rec, row_list)
+
+
+def _counted_rows(rec, row_list):
+    for i, row in enumerate(row_list):
+        rec["rows_scanned"] += 1
+        rec["current_row"] = i
+        yield row
+
+
+def match(value=None, note=None):
+    """Records the table/row currently being scanned as the source of a value"""
+    rec = _active() if TRACE_ENABLED else None
+    if rec is None:
+        return
+    data = rec.get("current_table") or {}
+    row_idx = rec.get("current_row")
+    entry = {
+        "page_number": data.get("page_number"),
+        "table_index": data.get("table_index"),
+        "table_heading": data.get("table_heading"),
+        "row_index": row_idx,
+        "value": _preview(value, 120),
+    }
+    if row_idx is not None:
+        try:
+            entry["row"] = data.get("rows", [])[row_idx]
+        except (IndexError, TypeError):
+            pass
+    if note:
+        entry["note"] = note
+    rec["matches"].append(entry)
+
+
+def write_report(run_name):
+    """Writes all records collected in this process to traces/<run_name>_<timestamp>.json"""
+    if not TRACE_ENABLED:
+        return None
+    with _records_lock:
+        fields = sorted(_records, key=lambda r: r["wall_ms"], reverse=True)
+        _records.clear()
+    report = {
+        "run": run_name,
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total_wall_ms": round(sum(r["wall_ms"] for r in fields if not r["nested"]), 3),
+        "fields": fields,
+    }
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in run_name)
+    path = os.path.join(TRACE_DIR, f"{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    print(f"Extractor trace written to {path}")
+    return path
+
+
+if __name__ == "__main__":
+    # Summarize the most recent trace reports: slowest fields first
+    import glob
+    import sys
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join(TRACE_DIR, "*.json")), key=os.path.getmtime)[-1:]
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        print(f"\n{report['run']} ({report['generated_at']}) total {report['total_wall_ms']:.1f} ms")
+        print(f"{'FIELD':<50} | {'MS':>9} | {'TABLES':>6} | {'ROWS':>7} | MATCH")
+        print("-" * 100)
+        for r in report["fields"]:
+            m = r["matches"][-1] if r["matches"] else None
+            where = f"p{m['page_number']} t{m['table_index']} r{m['row_index']}" if m else "-"
+            tables = "-" if r["tables_scanned"] is None else r["tables_scanned"]
+            rows_scanned = "-" if r["rows_scanned"] is None else r["rows_scanned"]
+            print(f"{r['field']:<50} | {r['wall_ms']:>9.1f} | {tables:>6} | {rows_scanned:>7} | {where}")
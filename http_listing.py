@@ -0,0 +1,156 @@
+import os
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ---------- CONFIGURATION ----------
+# Read static regulator listing pages with plain HTTP before starting Chrome
+HTTP_DISCOVERY = os.getenv("AUTOMATION_HTTP_DISCOVERY", "True").lower() == "true"
+HTTP_TIMEOUT = float(os.getenv("AUTOMATION_HTTP_TIMEOUT", 30))
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/120.0 Safari/537.36")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session():
+    """One keep-alive connection pool per process, shared by listing fetches and PDF downloads"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            s.verify = False  # several regulator sites serve incomplete certificate chains
+            s.headers["User-Agent"] = USER_AGENT
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+        return _session
+
+
+def _clean(text):
+    return " ".join(text.split())
+
+
+class _ListingParser(HTMLParser):
+    """Collects every link and every table row (with its cells) of a page"""
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.links = []
+        self.rows = []
+        self._link = None
+        self._rows = []   # open <tr>s, innermost last (tables nest on some sites)
+        self._cells = []  # open <td>/<th>s
+        self._tables = 0  # <table> nesting depth
+        self._skip = 0    # inside <script>/<style>
+
+    def _text(self, data):
+        for item in [self._link, *self._rows, *self._cells]:
+            if item is not None:
+                item["_text"].append(data)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+            return
+        self._text(" ")
+        attrs = dict(attrs)
+        if tag == "a":
+            href = attrs.get("href")
+            url = urljoin(self.base_url, href) if href and not href.lower().startswith(("javascript:", "#")) else None
+            self._link = {"href": href, "url": url, "class": attrs.get("class") or "", "_text": []}
+        elif tag == "table":
+            self._tables += 1
+        elif tag == "tr":
+            # </tr> and </td> are optional: a new row ends any open row of the same table
+            while self._rows and self._rows[-1]["_table"] >= self._tables:
+                self._close_row()
+            self._rows.append({"cells": [], "links": [], "_text": [], "_table": self._tables})
+        elif tag in ("td", "th") and self._rows:
+            if self._cells and self._cells[-1] in self._rows[-1]["cells"]:
+                self._close_cell()
+            cell = {"tag": tag, "links": [], "_text": []}
+            self._rows[-1]["cells"].append(cell)
+            self._cells.append(cell)
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(0, self._skip - 1)
+            return
+        self._text(" ")
+        if tag == "a" and self._link is not None:
+            link, self._link = self._link, None
+            link["text"] = _clean("".join(link.pop("_text")))
+            self.links.append(link)
+            for item in [*self._rows, *self._cells]:
+                item["links"].append(link)
+        elif tag in ("td", "th") and self._cells:
+            self._close_cell()
+        elif tag == "tr" and self._rows:
+            self._close_row()
+        elif tag == "table" and self._tables:
+            while self._rows and self._rows[-1]["_table"] >= self._tables:
+                self._close_row()
+            self._tables -= 1
+
+    def _close_cell(self):
+        cell = self._cells.pop()
+        cell["text"] = _clean("".join(cell.pop("_text")))
+
+    def _close_row(self):
+        row = self._rows.pop()
+        del row["_table"]
+        while self._cells and self._cells[-1] in row["cells"]:
+            self._close_cell()
+        row["text"] = _clean("".join(row.pop("_text")))
+        # Same rows as Selenium's //tr[td]
+        if any(c["tag"] == "td" for c in row["cells"]):
+            self.rows.append(row)
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._text(data)
+
+    def close(self):
+        super().close()
+        while self._rows:
+            self._close_row()
+
+
+class Listing:
+    """
+    A parsed listing page.
+    links: [{"text", "url" (absolute; None for javascript:/# links), "href", "class"}]
+    rows:  [{"text", "cells": [{"text", "links"}], "links"}] for every table row with a <td>
+    """
+
+    def __init__(self, url, links, rows):
+        self.url = url
+        self.links = links
+        self.rows = rows
+
+
+def parse_listing(html, base_url):
+    parser = _ListingParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return Listing(base_url, parser.links, parser.rows)
+
+
+def fetch_listing(url, timeout=HTTP_TIMEOUT):
+    """The parsed page, or None when it could not be fetched (the caller then uses Selenium)"""
+    try:
+        response = session().get(url, timeout=timeout)
+    except requests.RequestException as e:
+        print(f"HTTP fetch of {url} failed: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"HTTP fetch of {url} returned {response.status_code}")
+        return None
+    return parse_listing(response.text, response.url)
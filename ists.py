@@ -2,10 +2,12 @@ import os
 import json
 import pdfplumber
 
+from workspace import workspace_root
+
 def scrape_ists_loss():
     # Define paths
-    # Base dir is where the script is located: .../ADANI
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    # The run's workspace (the script's folder unless the app runs it in runs/<id>/)
+    base_dir = workspace_root()
     
     input_dir = os.path.join(base_dir, "ists_pdf")
     output_dir = os.path.join(base_dir, "ists_extracted")
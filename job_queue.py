@@ -0,0 +1,265 @@
+import itertools
+import os
+import signal
+import subprocess
+import threading
+from collections import deque
+from datetime import datetime
+
+# ---------- CONFIGURATION ----------
+# Per-step timeouts in seconds, by pipeline stage; AGENT_STEP_TIMEOUT covers the rest
+DEFAULT_STEP_TIMEOUT = int(os.getenv("AGENT_STEP_TIMEOUT", 1800))
+STEP_TIMEOUTS = {
+    "download": int(os.getenv("AGENT_DOWNLOAD_TIMEOUT", 3600)),
+    "scrape": int(os.getenv("AGENT_SCRAPE_TIMEOUT", 3600)),
+}
+JOB_HISTORY = int(os.getenv("AGENT_JOB_HISTORY", 20))
+
+STEP_STATUSES = ("queued", "running", "done", "failed", "skipped", "timeout", "cancelled")
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def step_timeout(task):
+    return STEP_TIMEOUTS.get(task.stage, DEFAULT_STEP_TIMEOUT)
+
+
+def process_group_kwargs():
+    """Popen arguments that put the child (and everything it starts, e.g. Chrome) in its own group"""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def kill_process_tree(pid):
+    """Kills a process started with process_group_kwargs() and all of its children"""
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(os.getpgid(pid), signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+
+
+class Watchdog:
+    """Kills a process tree if it is still running after timeout seconds"""
+
+    def __init__(self, pid, timeout):
+        self.pid = pid
+        self.fired = False
+        self._timer = threading.Timer(timeout, self._fire) if timeout else None
+
+    def _fire(self):
+        self.fired = True
+        kill_process_tree(self.pid)
+
+    def start(self):
+        if self._timer:
+            self._timer.daemon = True
+            self._timer.start()
+        return self
+
+    def stop(self):
+        if self._timer:
+            self._timer.cancel()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class Job:
+    """One agent run: its selection, overall status and per-step status"""
+
+    def __init__(self, job_id, mode=None, states=None, stages=None):
+        self.id = job_id
+        self.mode = mode
+        self.states = states
+        self.stages = stages
+        self.status = "queued"
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.coalesced = 0
+        self.steps = {}
+        self.cancel_event = threading.Event()
+        self._processes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def set_steps(self, tasks):
+        with self._lock:
+            self.steps = {t.name: {"display": t.display, "stage": t.stage, "status": "queued",
+                                   "started_at": None, "finished_at": None,
+                                   "exit_code": None, "metrics": {}} for t in tasks}
+
+    def step_started(self, name):
+        with self._lock:
+            step = self.steps.get(name)
+            if step:
+                step.update(status="running", started_at=_now())
+
+    def step_finished(self, name, status):
+        """Sets the final status of a step unless it already has one (skipped/timeout/cancelled)"""
+        with self._lock:
+            step = self.steps.get(name)
+            if step and step["status"] in ("queued", "running"):
+                step.update(status=status, finished_at=_now())
+
+    def add_metrics(self, name, values):
+        """Adds counters (bytes_downloaded, pages_scraped, rows_written) reported by a step"""
+        with self._lock:
+            step = self.steps.get(name)
+            if step:
+                for key, value in values.items():
+                    step["metrics"][key] = step["metrics"].get(key, 0) + value
+
+    def set_exit_code(self, name, code):
+        with self._lock:
+            step = self.steps.get(name)
+            if step:
+                step["exit_code"] = code
+
+    def step(self, name):
+        with self._lock:
+            step = self.steps.get(name)
+            return {**step, "metrics": dict(step["metrics"])} if step else None
+
+    def track(self, name, process):
+        with self._lock:
+            self._processes[name] = process
+
+    def untrack(self, name):
+        with self._lock:
+            self._processes.pop(name, None)
+
+    def cancel(self):
+        self.cancel_event.set()
+        with self._lock:
+            processes = list(self._processes.items())
+        for name, process in processes:
+            self.step_finished(name, "cancelled")
+            kill_process_tree(process.pid)
+
+    def to_dict(self):
+        with self._lock:
+            steps = [{"name": n, **s, "metrics": dict(s["metrics"])} for n, s in self.steps.items()]
+        return {
+            "id": self.id,
+            "status": self.status,
+            "mode": self.mode,
+            "states": self.states,
+            "stages": self.stages,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "coalesced": self.coalesced,
+            "steps": steps,
+        }
+
+
+def _merge(a, b):
+    """Union of two selections where None means everything"""
+    if a is None or b is None:
+        return None
+    return a + [x for x in b if x not in a]
+
+
+class JobQueue:
+    """
+    Runs agent jobs one at a time on a background thread. While a job runs,
+    further submissions are coalesced into a single queued follow-up job whose
+    selection is the union of theirs.
+    """
+
+    def __init__(self, runner, history=JOB_HISTORY, first_id=1):
+        self.runner = runner
+        self.current = None
+        self.queued = None
+        self.finished = deque(maxlen=history)
+        self._ids = itertools.count(first_id)
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, mode=None, states=None, stages=None):
+        """Returns (job, coalesced)"""
+        with self._cond:
+            if self.queued is not None:
+                job = self.queued
+                job.states = _merge(job.states, states)
+                job.stages = _merge(job.stages, stages)
+                if job.mode != mode:
+                    job.mode = None
+                job.coalesced += 1
+                return job, True
+            job = Job(next(self._ids), mode, states, stages)
+            self.queued = job
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return job, False
+
+    def cancel(self, job_id=None):
+        """Cancels the given job, or the running and queued ones; returns the cancelled jobs"""
+        cancelled = []
+        with self._cond:
+            if self.queued is not None and job_id in (None, self.queued.id):
+                job, self.queued = self.queued, None
+                job.status = "cancelled"
+                job.finished_at = _now()
+                self.finished.append(job)
+                cancelled.append(job)
+            running = self.current if self.current is not None and job_id in (None, self.current.id) else None
+        if running is not None:
+            running.cancel()
+            cancelled.append(running)
+        return cancelled
+
+    def get(self, job_id):
+        with self._cond:
+            for job in [self.current, self.queued, *self.finished]:
+                if job is not None and job.id == job_id:
+                    return job
+        return None
+
+    def jobs(self):
+        with self._cond:
+            return [j for j in [self.current, self.queued] if j is not None] + list(reversed(self.finished))
+
+    @property
+    def busy(self):
+        with self._cond:
+            return self.current is not None or self.queued is not None
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self.queued is None:
+                    self._cond.wait()
+                job, self.queued = self.queued, None
+                self.current = job
+            job.status = "running"
+            job.started_at = _now()
+            try:
+                ok = self.runner(job)
+                job.status = "cancelled" if job.cancelled else ("done" if ok else "failed")
+            except Exception:
+                job.status = "failed"
+            for name, step in list(job.steps.items()):
+                if step["status"] in ("queued", "running"):
+                    job.step_finished(name, "cancelled" if job.cancelled else "failed")
+            job.finished_at = _now()
+            with self._cond:
+                self.current = None
+                self.finished.append(job)
@@ -0,0 +1,64 @@
+import threading
+from collections import deque
+
+
+class LogStore:
+    """
+    Bounded agent log. Every line gets a sequence number that only grows, so a
+    reader that remembers the next number it expects (like /get-logs?after=N)
+    never skips or repeats lines when old ones fall out of the buffer.
+    """
+
+    def __init__(self, maxlen=1000):
+        self._lines = deque(maxlen=maxlen)  # (seq, line)
+        self._next_seq = 0
+        self._cond = threading.Condition()
+
+    def append(self, line):
+        with self._cond:
+            seq = self._next_seq
+            self._lines.append((seq, line))
+            self._next_seq += 1
+            self._cond.notify_all()
+        return seq
+
+    def reset(self, first_line=None):
+        """Starts a new run's log; sequence numbers keep counting up"""
+        with self._cond:
+            self._lines.clear()
+            self._cond.notify_all()
+        if first_line is not None:
+            self.append(first_line)
+
+    @property
+    def next_seq(self):
+        with self._cond:
+            return self._next_seq
+
+    def since(self, after=0):
+        """
+        (lines [(seq, line)], next_seq, missed) for every buffered line with
+        seq >= after. missed counts lines the reader asked for that were
+        already dropped. A cursor ahead of the log (e.g. after a server
+        restart) is treated as 0.
+        """
+        with self._cond:
+            return self._since(after)
+
+    def _since(self, after):
+        if after > self._next_seq:
+            after = 0
+        first = self._lines[0][0] if self._lines else self._next_seq
+        missed = max(0, first - after)
+        lines = [item for item in self._lines if item[0] >= after]
+        return lines, self._next_seq, missed
+
+    def wait(self, after, timeout=None):
+        """Like since(), but blocks up to timeout seconds until a line with seq >= after exists"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._next_seq > after or after > self._next_seq, timeout=timeout)
+            return self._since(after)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._lines)
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from clear_excels import state_files
+from extraction_cache import file_hash
+from workspace import workspace_root
+
+# ---------- CONFIGURATION ----------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.getenv("PIPELINE_MANIFEST_PATH", os.path.join(BASE_DIR, "pipeline_manifest.json"))
+
+# Code every state's output depends on besides its own script
+SHARED_CODE = ["scraper.py", "extraction_cache.py", "candidate_selector.py"]
+
+_lock = threading.Lock()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {"states": {}}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"states": {}}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _hash_optional(path):
+    return file_hash(path) if os.path.exists(path) else None
+
+
+def pdf_hashes(state, root=None):
+    """{relative pdf path: sha256} of everything downloaded for the state"""
+    root = os.path.join(root or workspace_root(), "Download", state)
+    hashes = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(dirpath, name)
+                hashes[os.path.relpath(path, root).replace(os.sep, "/")] = file_hash(path)
+    return dict(sorted(hashes.items()))
+
+
+def extractor_version(script):
+    """One hash over the state script and the shared extraction code"""
+    h = hashlib.sha256()
+    for name in [script] + SHARED_CODE:
+        h.update(name.encode())
+        h.update((_hash_optional(os.path.join(BASE_DIR, name)) or "").encode())
+    return h.hexdigest()
+
+
+def output_files(state, root=None):
+    root = root or workspace_root()
+    return [os.path.join(root, f) for f in state_files.get(state, [])
+            if os.path.exists(os.path.join(root, f))]
+
+
+def output_stamps(state, root=None):
+    return {os.path.basename(p): os.stat(p).st_mtime_ns for p in output_files(state, root)}
+
+
+def state_inputs(state, script, root=None):
+    return {
+        "pdfs": pdf_hashes(state, root),
+        "extractor": extractor_version(script),
+        "ists": _hash_optional(os.path.join(root or workspace_root(), "ists_extracted", "ists_loss.json")),
+    }
+
+
+def is_unchanged(state, script, manifest=None, root=None):
+    """
+    True when the state's PDFs, extractor code and ISTS losses match the last
+    successful run and its Excel output is still exactly what that run wrote.
+    """
+    entry = (manifest or load_manifest())["states"].get(state)
+    if not entry:
+        return False
+    inputs = state_inputs(state, script, root)
+    if not inputs["pdfs"] or entry.get("inputs") != inputs:
+        return False
+    stamps = output_stamps(state, root)
+    return bool(stamps) and entry.get("outputs") == stamps
+
+
+def record_state(state, script, root=None):
+    """Stores the current inputs and output timestamps of a state after a successful run"""
+    with _lock:
+        manifest = load_manifest()
+        manifest["states"][state] = {
+            "inputs": state_inputs(state, script, root),
+            "outputs": output_stamps(state, root),
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        save_manifest(manifest)
+
+
+class IncrementalRun:
+    """
+    Per-run record of which states were found unchanged by their check:<State>
+    task. root is the run's workspace (see workspace.py).
+    """
+
+    def __init__(self, scripts, root=None):
+        self.scripts = dict(scripts)
+        self.root = root
+        self.unchanged = set()
+        self.manifest = load_manifest()
+
+    def check(self, task):
+        if is_unchanged(task.state, self.scripts[task.state], self.manifest, self.root):
+            self.unchanged.add(task.state)
+        return True
+
+    def skipped(self, state):
+        return state in self.unchanged
+
+    def record(self, task):
+        if task.state in self.unchanged:
+            return True
+        record_state(task.state, self.scripts[task.state], self.root)
+        return True
+
+
+if __name__ == "__main__":
+    manifest = load_manifest()
+    print(f"{'STATE':<20} | {'PDFS':>4} | {'UPDATED':<19} | UNCHANGED")
+    print("-" * 60)
+    from pipeline import STATE_SCRIPTS
+    from workspace import read_root
+    for script, state in STATE_SCRIPTS:
+        entry = manifest["states"].get(state, {})
+        print(f"{state:<20} | {len(entry.get('inputs', {}).get('pdfs', {})):>4} | {entry.get('updated_at', '-'):<19} | {is_unchanged(state, script, manifest, read_root())}")
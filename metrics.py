@@ -0,0 +1,234 @@
+import bisect
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+# Pipeline scripts run in child processes; when the app starts them it sets this
+# variable and the scripts print "__PROM__ {json}" lines that run_script applies
+# to the app's registry (see apply_line) instead of keeping them to themselves.
+# The same lines feed the step counters of the run history (run_history.sample_counters).
+PIPE_ENV = "AGENT_METRICS_PIPE"
+PROM_MARKER = "__PROM__"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 1800, 3600)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _record(self, value, labels):
+        """Applies one observation; also used for the lines reported by child processes"""
+        raise NotImplementedError
+
+    def _emit(self, value, labels):
+        if os.environ.get(PIPE_ENV):
+            print(f"{PROM_MARKER} {json.dumps({'name': self.name, 'value': value, 'labels': labels})}", flush=True)
+        else:
+            self._record(value, labels)
+
+    def snapshot(self):
+        """{label values: value} copy of what this process has recorded"""
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._values.items()}
+
+    def render(self, others=()):
+        """Text exposition of this process's samples summed with the snapshots of others"""
+        values = self.snapshot()
+        for other in others:
+            for key, value in other.items():
+                values[key] = self._add(values[key], value) if key in values else value
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(values.items()):
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        self._emit(amount, labels)
+
+    def _record(self, value, labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def _copy(self, value):
+        return value
+
+    def _add(self, value, other):
+        return value + other
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        self._emit(value, labels)
+
+    def _record(self, value, labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += 1
+            state[2] += value
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+    def _add(self, value, other):
+        return [[a + b for a, b in zip(value[0], other[0])], value[1] + other[1], value[2] + other[2]]
+
+    def _render_sample(self, key, value):
+        counts, count, total = value
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {count}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def apply(self, name, value, labels):
+        metric = self._metrics.get(name)
+        if metric is not None:
+            metric._record(value, labels)
+
+    def snapshot(self):
+        """JSON-serialisable samples: {metric name: [[label values, value], ...]}"""
+        return {name: [[list(key), value] for key, value in metric.snapshot().items()]
+                for name, metric in self._metrics.items()}
+
+    def render(self, snapshots=()):
+        """
+        Prometheus text format. snapshots are Registry.snapshot() results of other
+        processes (the pipeline worker and the other web workers in shared mode)
+        that are summed into this one's samples.
+        """
+        lines = []
+        for name, metric in self._metrics.items():
+            others = [{tuple(key): value for key, value in snap.get(name, [])} for snap in snapshots]
+            lines.extend(metric.render(others))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def apply_line(line, registry=REGISTRY):
+    """
+    Applies a "__PROM__ {json}" line printed by a pipeline script and returns its
+    sample ({} when malformed); None for any other line.
+    """
+    line = line.strip()
+    if not line.startswith(PROM_MARKER):
+        return None
+    try:
+        sample = json.loads(line[len(PROM_MARKER):])
+        registry.apply(sample["name"], sample["value"], sample.get("labels") or {})
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return {}
+    return sample
+
+
+def snapshot():
+    return REGISTRY.snapshot()
+
+
+def render(snapshots=()):
+    return REGISTRY.render(snapshots)
+
+
+# ---------- PIPELINE METRICS ----------
+SIZE_BUCKETS = (1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7, 1e8)
+
+STEP_SECONDS = histogram("agent_step_duration_seconds", "Wall time of a pipeline step (run_script)",
+                         ["step", "status"])
+EXTRACTOR_SECONDS = histogram("agent_extractor_duration_seconds", "Wall time of a state processor", ["state"])
+SCRAPED_PDFS = counter("scraper_pdfs_total", "PDFs converted to JSONL by scraper.py", ["state"])
+SCRAPED_PAGES = counter("scraper_pages_total", "PDF pages read by scraper.py", ["state"])
+SCRAPE_PDF_SECONDS = histogram("scraper_pdf_duration_seconds", "Time to extract every table of one PDF", ["state"])
+DOWNLOAD_BYTES = counter("download_bytes_total", "Bytes downloaded from each regulator host", ["host"])
+DOWNLOAD_SECONDS = histogram("download_duration_seconds", "Time to download one file, by regulator host",
+                             ["host", "outcome"])
+DOWNLOAD_SIZE = histogram("download_size_bytes", "Size of each downloaded file", ["host"], SIZE_BUCKETS)
+BROWSER_START_SECONDS = histogram("webdriver_start_duration_seconds", "Time to launch Chrome and chromedriver")
+BROWSER_SESSIONS = counter("webdriver_sessions_total", "Browser sessions handed to a state download", ["reused"])
+LISTING_DISCOVERY = counter("listing_discovery_total", "State listing pages read over plain HTTP or with Chrome",
+                            ["state", "method"])
+SQLITE_WRITE_SECONDS = histogram("sqlite_write_duration_seconds", "Latency of SQLite writes", ["operation"],
+                                 (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1))
+HTTP_REQUEST_SECONDS = histogram("http_request_duration_seconds", "Latency of dashboard requests",
+                                 ["route", "method", "status"],
+                                 (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+
+
+def record_download(url, seconds, size=0, outcome="ok"):
+    """Download latency, bytes and size for url's host; outcome is "ok", "failed" (bad response) or "error" """
+    host = urlparse(url).netloc or "unknown"
+    DOWNLOAD_SECONDS.observe(seconds, host=host, outcome=outcome)
+    if outcome == "ok":
+        DOWNLOAD_BYTES.inc(size, host=host)
+        DOWNLOAD_SIZE.observe(size, host=host)
@@ -0,0 +1,276 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Maximum number of pipeline tasks running at the same time
+MAX_PARALLEL_TASKS = int(os.getenv("AGENT_MAX_PARALLEL", 4))
+
+# "stage": every download, then every scrape, then the state processors
+# "per_state": one download -> scrape -> extract -> sync chain per state
+# "incremental": per_state, skipping states whose manifest inputs are unchanged
+PIPELINE_MODE = os.getenv("AGENT_PIPELINE_MODE", "stage").lower()
+
+# (script, display name) of every state processor; each depends only on scraper.py and ists.py output
+STATE_SCRIPTS = [
+    ("chhattisgarh.py", "Chhattisgarh"),
+    ("Meghalaya.py", "Meghalaya"),
+    ("Rajasthan.py", "Rajasthan"),
+    ("Madyapradesh.py", "Madhya Pradesh"),
+    ("bihar.py", "Bihar"),
+    ("puducherry.py", "Puducherry"),
+    ("Himachalpradesh.py", "Himachal Pradesh"),
+    ("Assam.py", "Assam"),
+    ("uttarpradesh.py", "Uttar Pradesh"),
+]
+
+# Download/ folders written by Automation.py; Odisha is downloaded and scraped but has no processor yet
+DOWNLOAD_STATES = ["Assam", "Uttar Pradesh", "Meghalaya", "Rajasthan", "Madhya Pradesh", "Chhattisgarh",
+                   "Himachal Pradesh", "Puducherry", "Bihar", "Odisha"]
+
+# State selection that matches none of the state tasks: only the ISTS download and extraction run
+ISTS_SELECTION = "ISTS"
+
+
+# Stage names accepted in a run selection -> task stages they cover
+STAGE_GROUPS = {
+    "download": ["download", "check"],
+    "scrape": ["scrape"],
+    "ists": ["ists"],
+    "extract": ["prepare", "extract"],
+    "sync": ["sync", "record"],
+}
+
+
+class Task:
+    """A node of the pipeline graph: a script to run or a callable, plus the nodes it waits for"""
+
+    def __init__(self, name, display, script=None, action=None, deps=(), stage=None, state=None, args=(),
+                 skip_if=None, requires_success=False):
+        self.name = name
+        self.display = display
+        self.script = script
+        self.args = list(args)
+        # skip_if() is evaluated when the task becomes ready; a skipped task counts as successful
+        self.skip_if = skip_if
+        # Do not run (and count as failed) when any dependency failed
+        self.requires_success = requires_success
+        self.action = action
+        self.deps = list(deps)
+        self.stage = stage
+        self.state = state
+
+    def __repr__(self):
+        return f"Task({self.name!r}, deps={self.deps!r})"
+
+
+def build_agent_graph(sync_action=None, mode=None, states=None, stages=None, root=None):
+    """
+    downloads -> scrape -> ISTS -> states -> DB sync
+    sync_action(task) is called for the per-state "sync:<State>" nodes.
+    root is the run's workspace, used by the incremental manifest checks.
+    states / stages restrict the run to matching nodes (see select_tasks); a
+    state selection always uses the per-state graph so that Automation.py and
+    scraper.py only touch those states' folders.
+    """
+    mode = mode or PIPELINE_MODE
+    if states and mode == "stage":
+        mode = "per_state"
+    if mode == "incremental":
+        from manifest import IncrementalRun
+        tasks = build_state_graph(sync_action, IncrementalRun(((d, s) for s, d in STATE_SCRIPTS), root))
+    elif mode == "per_state":
+        tasks = build_state_graph(sync_action)
+    else:
+        tasks = build_stage_graph(sync_action)
+    return select_tasks(tasks, states, stages)
+
+
+def build_stage_graph(sync_action=None):
+    """All downloads, then one scrape over every folder, then the state processors"""
+    tasks = [
+        Task("clear_excels", "Clearing Excels", script="clear_excels.py", stage="prepare"),
+        Task("download", "Automation", script="Automation.py", stage="download"),
+        Task("ists_download", "ISTS Automation", script="Auomation_ists.py", stage="download"),
+        Task("scrape", "Scraping", script="scraper.py", deps=["download"], stage="scrape"),
+        # The full scrape moves ists_extracted/ aside before it starts, so ists.py must write after it
+        Task("ists", "ISTS", script="ists.py", deps=["ists_download", "scrape"], stage="ists"),
+    ]
+    for script, display in STATE_SCRIPTS:
+        tasks.append(Task(f"extract:{display}", display, script=script,
+                          deps=["clear_excels", "scrape", "ists"], stage="extract", state=display))
+        if sync_action:
+            tasks.append(Task(f"sync:{display}", f"{display} DB Sync", action=sync_action,
+                              deps=[f"extract:{display}"], stage="sync", state=display))
+    return tasks
+
+
+def build_state_graph(sync_action=None, incremental=None):
+    """
+    Per-state chains: Download/<State> -> Extraction/<State> -> <State>.py -> DB sync.
+    A state's processor starts as soon as its own PDFs are scraped (and ISTS
+    losses are extracted), while other states are still downloading.
+    With incremental (a manifest.IncrementalRun), a check:<State> node after the
+    download decides whether the rest of the chain is skipped, and record:<State>
+    stores the new manifest entry once the state has run successfully.
+    """
+    scripts = {display: script for script, display in STATE_SCRIPTS}
+    tasks = [
+        Task("ists_download", "ISTS Automation", script="Auomation_ists.py", stage="download"),
+        Task("ists", "ISTS", script="ists.py", deps=["ists_download"], stage="ists"),
+    ]
+    for state in DOWNLOAD_STATES:
+        skip_if = None
+        scrape_deps = [f"download:{state}"]
+        tasks.append(Task(f"download:{state}", f"{state} Download", script="Automation.py",
+                          args=["--states", state], stage="download", state=state))
+        if incremental and state in scripts:
+            skip_if = lambda s=state: incremental.skipped(s)
+            tasks.append(Task(f"check:{state}", f"{state} Check", action=incremental.check,
+                              deps=[f"download:{state}", "ists"], stage="check", state=state))
+            scrape_deps = [f"check:{state}"]
+        tasks.append(Task(f"scrape:{state}", f"{state} Scraping", script="scraper.py", args=["--states", state],
+                          deps=scrape_deps, stage="scrape", state=state, skip_if=skip_if))
+        if state not in scripts:
+            continue
+        tasks.append(Task(f"clear:{state}", f"{state} Clearing Excel", script="clear_excels.py", args=["--states", state],
+                          deps=[f"scrape:{state}"], stage="prepare", state=state, skip_if=skip_if))
+        tasks.append(Task(f"extract:{state}", state, script=scripts[state],
+                          deps=[f"clear:{state}", "ists"], stage="extract", state=state, skip_if=skip_if))
+        if sync_action:
+            tasks.append(Task(f"sync:{state}", f"{state} DB Sync", action=sync_action,
+                              deps=[f"extract:{state}"], stage="sync", state=state, skip_if=skip_if))
+        if incremental:
+            record_deps = [f"extract:{state}"] + ([f"sync:{state}"] if sync_action else [])
+            tasks.append(Task(f"record:{state}", f"{state} Manifest", action=incremental.record,
+                              deps=record_deps, stage="record", state=state, requires_success=True))
+    return tasks
+
+
+def validate_selection(states=None, stages=None):
+    """Error message for unknown state / stage names, or None"""
+    known = DOWNLOAD_STATES + [ISTS_SELECTION]
+    unknown = [s for s in states or [] if s not in known]
+    if unknown:
+        return f"Unknown states: {', '.join(unknown)}. Known: {', '.join(known)}"
+    unknown = [s for s in stages or [] if s not in STAGE_GROUPS]
+    if unknown:
+        return f"Unknown stages: {', '.join(unknown)}. Known: {', '.join(STAGE_GROUPS)}"
+    return None
+
+
+def select_tasks(tasks, states=None, stages=None):
+    """
+    Keeps the tasks of the selected states (tasks not tied to a state, like the
+    ISTS steps, are kept, so states=[ISTS_SELECTION] runs just those) whose
+    stage is in the selected stage groups.
+    Dependencies on dropped tasks are removed: their outputs from an earlier
+    run are used as they are.
+    """
+    if not states and not stages:
+        return tasks
+    allowed = None
+    if stages:
+        allowed = {stage for name in stages for stage in STAGE_GROUPS[name]}
+    kept = [t for t in tasks
+            if (not states or t.state is None or t.state in states)
+            and (allowed is None or t.stage in allowed)]
+    names = {t.name for t in kept}
+    for t in kept:
+        t.deps = [d for d in t.deps if d in names]
+    return kept
+
+
+def validate_graph(tasks):
+    """Raises ValueError on unknown dependencies or cycles"""
+    names = {t.name for t in tasks}
+    for t in tasks:
+        for d in t.deps:
+            if d not in names:
+                raise ValueError(f"Task {t.name} depends on unknown task {d}")
+    remaining = {t.name: set(t.deps) for t in tasks}
+    while remaining:
+        ready = [n for n, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle among: {', '.join(sorted(remaining))}")
+        for n in ready:
+            del remaining[n]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _depth(name, by_name, memo):
+    if name not in memo:
+        deps = by_name[name].deps
+        memo[name] = 1 + max((_depth(d, by_name, memo) for d in deps), default=0)
+    return memo[name]
+
+
+def run_graph(tasks, run_task, max_workers=MAX_PARALLEL_TASKS, on_start=None, on_finish=None, on_skip=None,
+              cancel_event=None):
+    """
+    Runs every task once all of its dependencies have finished, with up to
+    max_workers tasks at a time. run_task(task) returns True on success; a
+    failed dependency does not block its dependents, as in the old sequential run,
+    unless the dependent sets requires_success.
+    on_start(task) / on_finish(task, ok) are called from the scheduling thread,
+    on_skip(task) when a task's skip_if() says it does not need to run.
+    Once cancel_event is set no further task is started; tasks that never
+    started are missing from the result.
+    Returns {task name: ok}.
+    """
+    validate_graph(tasks)
+    by_name = {t.name: t for t in tasks}
+    pending = {t.name: set(t.deps) for t in tasks}
+    results = {}
+    lock = threading.Lock()
+    depth = {}
+    for t in tasks:
+        depth[t.name] = _depth(t.name, by_name, depth)
+
+    def call(task):
+        try:
+            if task.skip_if and task.skip_if():
+                if on_skip: on_skip(task)
+                return True
+            return bool(run_task(task))
+        except Exception as e:
+            print(f"Task {task.name} raised: {e}")
+            return False
+
+    def finish(task, ok):
+        with lock:
+            results[task.name] = ok
+        if on_finish: on_finish(task, ok)
+        for deps in pending.values():
+            deps.discard(task.name)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        running = {}
+
+        def submit_ready():
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            # Deepest ready tasks first so a started chain finishes before new
+            # chains are opened; graph order breaks ties
+            while True:
+                ready = [t for t in tasks if t.name in pending and not pending[t.name]]
+                # Tasks that will not run finish immediately and may release others
+                blocked = [t for t in ready if t.requires_success and not all(results[d] for d in t.deps)]
+                if not blocked:
+                    break
+                for t in blocked:
+                    del pending[t.name]
+                    finish(t, False)
+            ready.sort(key=lambda t: -depth[t.name])
+            for t in ready[:max(1, max_workers) - len(running)]:
+                del pending[t.name]
+                if on_start: on_start(t)
+                running[pool.submit(call, t)] = t.name
+
+        submit_ready()
+        while running:
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                finish(by_name[running.pop(fut)], fut.result())
+            submit_ready()
+    return results
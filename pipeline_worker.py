@@ -0,0 +1,76 @@
+import os
+import time
+
+from dotenv import load_dotenv
+
+# Runs the agent outside the web server: the dashboard processes (wsgi.py) queue
+# start/cancel commands in the runtime store, this process executes them and
+# publishes progress and job snapshots back a few times a second.
+load_dotenv()
+os.environ["AGENT_RUNTIME"] = "shared"
+
+import app  # noqa: E402  (reads the settings loaded above)
+import runtime_store  # noqa: E402
+import scheduler  # noqa: E402
+import workspace_gc  # noqa: E402
+
+PUBLISH_SECONDS = float(os.getenv("AGENT_WORKER_PUBLISH", 0.5))
+
+
+def handle(kind, payload):
+    if kind == "submit":
+        return app.submit_local(payload.get("mode"), payload.get("states"), payload.get("stages"))
+    if kind == "cancel":
+        return app.cancel_local(payload.get("job_id"))
+    return {"error": f"Unknown command: {kind}"}
+
+
+def publish(store):
+    _, status_version = app.STATUS.snapshot()
+    progress = dict(app.local_progress(), status_version=status_version, pid=os.getpid())
+    store.publish(progress, [job.to_dict() for job in app.JOBS.jobs()])
+    # Step, scrape and download samples land in this process; /metrics on the web tier sums them in
+    app.publish_metrics()
+
+
+def main():
+    store = app.RUNTIME
+    progress = store.progress()
+    if progress["worker_alive"]:
+        print(f"Another pipeline worker (pid {progress.get('pid')}) is already running.")
+        return
+    abandoned = store.abandon_jobs()
+    if abandoned:
+        print(f"Marked run(s) {', '.join(map(str, abandoned))} of the previous worker as failed")
+    print(f"Pipeline worker {os.getpid()} serving {runtime_store.RUNTIME_DB}")
+    # Web processes never touch the run folders; the one worker moves them aside and collects the trash
+    workspace_gc.start_background_cleanup(app.base_dir)
+    # In shared mode the AGENT_SCHEDULE runs are started here, once, not by each web process
+    scheduler.start_scheduler(app.submit_local)
+    last_publish = 0
+    last_prune = time.monotonic()
+    while True:
+        results = []
+        for command_id, kind, payload in store.take_commands():
+            try:
+                results.append((command_id, handle(kind, payload)))
+            except Exception as e:
+                results.append((command_id, {"error": str(e)}))
+        now = time.monotonic()
+        # Publish before answering, so the caller's next /get-progress already sees the new job
+        if results or now - last_publish >= PUBLISH_SECONDS:
+            publish(store)
+            last_publish = now
+        for command_id, result in results:
+            store.complete_command(command_id, result)
+        if now - last_prune >= 3600:
+            store.prune()
+            last_prune = now
+        time.sleep(runtime_store.POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        app.JOBS.cancel()
@@ -7,8 +7,12 @@ try:
     DB_SUCCESS = True
 except ImportError:
     DB_SUCCESS = False
+import extractor_trace as trace
+from extractor_trace import traced, write_report
+from workspace import workspace_root
 from datetime import datetime
 
+@traced
 def extract_discom_names(jsonl_path):
     return ["PED"]
 
@@ -25,16 +29,17 @@ def find_target_col(rows, target_year="2025-26"):
                 return k
     return None
 
+@traced
 def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constraint=lambda x: True):
     if not jsonl_path or not os.path.exists(jsonl_path): return "NA"
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 heading_match = all(k.lower() in h for k in table_keywords)
                 if heading_match:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if all(k.lower() in row_txt for k in row_keywords):
                             for v in list(row.values())[::-1]:
@@ -44,15 +49,18 @@ def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constrai
                                     if clean:
                                         f_v = float(clean)
                                         if value_constraint(f_v):
+                                            trace.match(str(v).strip())
                                             return str(v).strip()
                                 except: pass
             except: pass
     return "NA"
 
+@traced
 def extract_transmission_charges(jsonl_path):
     # Search for PGCIL or Transmission Charges in Puducherry
     return find_value_in_jsonl(jsonl_path, ["transmission", "charge"], ["rs/kwh"], lambda x: 0.1 <= x <= 2.0)
 
+@traced
 def extract_losses_all(jsonl_path, target_year="2025-26"):
     wh_losses = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
     insts_loss = "NA"
@@ -61,13 +69,13 @@ def extract_losses_all(jsonl_path, target_year="2025-26"):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 rows = data.get("rows", [])
                 
                 # Table 7-12: CSS Approved for FY 2025-26
                 if "cross subsidy surcharge approved" in heading and target_year in heading:
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         is_ht = "high tension" in row_txt and "extra" not in row_txt
                         is_eht = "extra high tension" in row_txt or "eht" in row_txt
@@ -77,24 +85,24 @@ def extract_losses_all(jsonl_path, target_year="2025-26"):
                         tl = row.get("TL")
                         
                         if is_ht:
-                            if wl: wh_losses['11'] = str(wl).strip(); wh_losses['33'] = str(wl).strip()
-                            if tl: insts_loss = str(tl).strip()
+                            if wl: wh_losses['11'] = str(wl).strip(); wh_losses['33'] = str(wl).strip(); trace.match(wh_losses['33'])
+                            if tl: insts_loss = str(tl).strip(); trace.match(insts_loss)
                         elif is_eht:
-                            if wl: wh_losses['66'] = str(wl).strip(); wh_losses['132'] = str(wl).strip(); wh_losses['220'] = str(wl).strip()
-                            if tl: insts_loss = str(tl).strip()
+                            if wl: wh_losses['66'] = str(wl).strip(); wh_losses['132'] = str(wl).strip(); wh_losses['220'] = str(wl).strip(); trace.match(wh_losses['220'])
+                            if tl: insts_loss = str(tl).strip(); trace.match(insts_loss)
                 
                 # Table 7-11: Voltage Level wise losses approved
                 if "voltage" in heading and "losses" in heading and "approved" in heading:
                     col = find_target_col(rows, target_year)
                     if col:
-                        for row in rows:
+                        for row in trace.rows(rows):
                             rt = str(row).lower()
                             val = row.get(col)
                             if not val: continue
                             if "high tension" in rt and "extra" not in rt:
-                                wh_losses['11'] = str(val).strip(); wh_losses['33'] = str(val).strip()
+                                wh_losses['11'] = str(val).strip(); wh_losses['33'] = str(val).strip(); trace.match(wh_losses['33'])
                             elif "eht" in rt or "extra high" in rt:
-                                wh_losses['66'] = str(val).strip(); wh_losses['132'] = str(val).strip(); wh_losses['220'] = str(val).strip()
+                                wh_losses['66'] = str(val).strip(); wh_losses['132'] = str(val).strip(); wh_losses['220'] = str(val).strip(); trace.match(wh_losses['220'])
 
             except: pass
             
@@ -102,13 +110,14 @@ def extract_losses_all(jsonl_path, target_year="2025-26"):
     print(f"Extracted InSTS Loss: {insts_loss}")
     return wh_losses, insts_loss
 
+@traced
 def extract_wheeling_charges(jsonl_path, target_year="2025-26"):
     charges = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
     if not jsonl_path or not os.path.exists(jsonl_path): return charges
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 # Table 7-7: Wheeling Charges approved
                 if "wheeling charges approved" in heading:
@@ -117,16 +126,16 @@ def extract_wheeling_charges(jsonl_path, target_year="2025-26"):
                     if not col:
                         # From inspection Table 7-7: FY 2025-26 Wheeling is in Column_12
                         col = "Column_12"
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         val = row.get(col)
                         if not val: continue
                         clean = re.sub(r'[^\d\.]', '', str(val))
                         if not clean: continue
                         if "high tension" in row_txt and "extra" not in row_txt:
-                            charges['11'] = clean; charges['33'] = clean
+                            charges['11'] = clean; charges['33'] = clean; trace.match(clean)
                         elif "extra high" in row_txt or "eht" in row_txt or row_txt.strip() == "eht":
-                            charges['66'] = clean; charges['132'] = clean; charges['220'] = clean
+                            charges['66'] = clean; charges['132'] = clean; charges['220'] = clean; trace.match(clean)
             except: pass
     
     # Fallback to Table 7-3 if still NA
@@ -134,31 +143,32 @@ def extract_wheeling_charges(jsonl_path, target_year="2025-26"):
         with open(jsonl_path, 'r', encoding='utf-8') as f:
             for line in f:
                 try:
-                    data = json.loads(line)
+                    data = trace.table(json.loads(line))
                     if "summary of wheeling charges" in data.get("table_heading", "").lower():
                         rows = data.get("rows", [])
-                        for row in rows:
+                        for row in trace.rows(rows):
                             rt = str(row).lower()
                             val = row.get("Column_2")
                             if val and re.match(r'0\.\d+', str(val)):
-                                if "high tension" in rt: charges['11'] = str(val); charges['33'] = str(val)
-                                elif "extra high" in rt: charges['66'] = str(val); charges['132'] = str(val); charges['220'] = str(val)
+                                if "high tension" in rt: charges['11'] = str(val); charges['33'] = str(val); trace.match(charges['33'])
+                                elif "extra high" in rt: charges['66'] = str(val); charges['132'] = str(val); charges['220'] = str(val); trace.match(charges['220'])
                 except: pass
 
     print(f"Extracted WH Charges: {charges}")
     return charges
 
+@traced
 def extract_css_charges(jsonl_path, target_year="2025-26"):
     charges = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
     if not jsonl_path or not os.path.exists(jsonl_path): return charges
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 if "cross subsidy surcharge approved" in heading and target_year in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         row_txt = str(row).lower()
                         # Final CSS is in Column_13 (Line 467)
                         val = row.get("Column_13") or row.get("Final")
@@ -170,37 +180,40 @@ def extract_css_charges(jsonl_path, target_year="2025-26"):
                              clean = re.sub(r'[^\d\.]', '', str(val))
                              if clean:
                                  if "high tension" in row_txt and "extra" not in row_txt:
-                                     charges['11'] = clean; charges['33'] = clean
+                                     charges['11'] = clean; charges['33'] = clean; trace.match(clean)
                                  elif "extra high" in row_txt or "eht" in row_txt:
-                                     charges['66'] = clean; charges['132'] = clean; charges['220'] = clean
+                                     charges['66'] = clean; charges['132'] = clean; charges['220'] = clean; trace.match(clean)
             except: pass
     print(f"Extracted CSS: {charges}")
     return charges
 
+@traced
 def extract_additional_surcharge(jsonl_path, target_year="2025-26"):
     add_s = "NA"
     if not jsonl_path or not os.path.exists(jsonl_path): return add_s
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 heading = data.get("table_heading", "").lower()
                 # Table 7-9 Additional Surcharge approved
                 if "additional surcharge approved" in heading:
                     rows = data.get("rows", [])
-                    for row in rows:
+                    for row in trace.rows(rows):
                         if "additional surcharge" in str(row).lower():
                             if row.get("Column_1") and re.match(r'1\.\d+', str(row["Column_1"])):
                                 add_s = str(row["Column_1"])
+                                trace.match(add_s)
                             else:
                                 for v in row.values():
                                     try:
-                                        if v and float(str(v).replace(',', '')) == 1.45: add_s = "1.45"
+                                        if v and float(str(v).replace(',', '')) == 1.45: add_s = "1.45"; trace.match(add_s)
                                     except: pass
             except: pass
     print(f"Extracted Add Surcharge: {add_s}")
     return add_s
 
+@traced
 def extract_fixed_energy_charges(jsonl_path, target_fy="2025-26"):
     fixed = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
     energy = {'11': "NA", '33': "NA", '66': "NA", '132': "NA", '220': "NA"}
@@ -209,11 +222,11 @@ def extract_fixed_energy_charges(jsonl_path, target_fy="2025-26"):
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 rows = data.get("rows", [])
                 if not rows: continue
                 
-                for row in rows:
+                for row in trace.rows(rows):
                     cat_raw = row.get("Consumer Category") or row.get("Category") or row.get("Column")
                     if not cat_raw: continue
                     cat = str(cat_raw).lower().replace('\n', ' ')
@@ -231,11 +244,11 @@ def extract_fixed_energy_charges(jsonl_path, target_fy="2025-26"):
                     ec = ec_m.group(1) if ec_m else None
                     
                     if ("hts-iv" in cat or "hts - iv" in cat) and "industries" in cat :
-                        if fc: fixed['11'] = fc; fixed['33'] = fc
-                        if ec: energy['11'] = ec; energy['33'] = ec
+                        if fc: fixed['11'] = fc; fixed['33'] = fc; trace.match(fc)
+                        if ec: energy['11'] = ec; energy['33'] = ec; trace.match(ec)
                     elif ("ehts-ii" in cat or "ehts - ii" in cat) and "industries" in cat:
-                        if fc: fixed['66'] = fc; fixed['132'] = fc; fixed['220'] = fc
-                        if ec: energy['66'] = ec; energy['132'] = ec; energy['220'] = ec
+                        if fc: fixed['66'] = fc; fixed['132'] = fc; fixed['220'] = fc; trace.match(fc)
+                        if ec: energy['66'] = ec; energy['132'] = ec; energy['220'] = ec; trace.match(ec)
             except: pass
             
     print(f"Extracted Fixed: {fixed}")
@@ -326,44 +339,47 @@ def update_excel(excel_path, data_dict):
     wb.save(excel_path)
 
 if __name__ == "__main__":
-    target_fy = "2025-26"
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        target_fy = "2025-26"
+        base_dir = workspace_root()
     
-    # 1. Dynamic Search for Puducherry Extraction folder
-    extraction_root = os.path.join(base_dir, "Extraction")
-    input_dir = os.path.join(extraction_root, "Puducherry")
+        # 1. Dynamic Search for Puducherry Extraction folder
+        extraction_root = os.path.join(base_dir, "Extraction")
+        input_dir = os.path.join(extraction_root, "Puducherry")
     
-    if not os.path.exists(input_dir) and os.path.exists(extraction_root):
-        for d in os.listdir(extraction_root):
-            if "puducherry" in d.lower() or "podu" in d.lower():
-                input_dir = os.path.join(extraction_root, d)
-                break
+        if not os.path.exists(input_dir) and os.path.exists(extraction_root):
+            for d in os.listdir(extraction_root):
+                if "puducherry" in d.lower() or "podu" in d.lower():
+                    input_dir = os.path.join(extraction_root, d)
+                    break
 
-    excel_file = os.path.join(base_dir, "Puducherry.xlsx")
-    ists_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
+        excel_file = os.path.join(base_dir, "Puducherry.xlsx")
+        ists_file = os.path.join(base_dir, "ists_extracted", "ists_loss.json")
     
-    jsonl_file = None
-    if os.path.exists(input_dir):
-        jsonl_file = next((os.path.join(input_dir, f) for f in os.listdir(input_dir) if f.endswith(".jsonl")), None)
+        jsonl_file = None
+        if os.path.exists(input_dir):
+            jsonl_file = next((os.path.join(input_dir, f) for f in os.listdir(input_dir) if f.endswith(".jsonl")), None)
     
-    if jsonl_file:
-        res = {}
-        if os.path.exists(ists_file):
-            with open(ists_file, 'r') as f: 
-                d = json.load(f)
-                res['ists_loss'] = d.get("All India transmission Loss (in %)", "NA")
-                if "%" not in str(res['ists_loss']): res['ists_loss'] = f"{res['ists_loss']}%"
-        else: res['ists_loss'] = "NA"
+        if jsonl_file:
+            res = {}
+            if os.path.exists(ists_file):
+                with open(ists_file, 'r') as f: 
+                    d = json.load(f)
+                    res['ists_loss'] = d.get("All India transmission Loss (in %)", "NA")
+                    if "%" not in str(res['ists_loss']): res['ists_loss'] = f"{res['ists_loss']}%"
+            else: res['ists_loss'] = "NA"
             
-        res['wh_losses'], res['insts_loss'] = extract_losses_all(jsonl_file, target_fy)
-        res['wh_charges'] = extract_wheeling_charges(jsonl_file, target_fy)
-        res['css_charges'] = extract_css_charges(jsonl_file, target_fy)
-        res['additional_surcharge'] = extract_additional_surcharge(jsonl_file, target_fy)
-        res['fixed_charges'], res['energy_charges'] = extract_fixed_energy_charges(jsonl_file, target_fy)
-        res['insts_charges'] = extract_transmission_charges(jsonl_file)
-        res['ists_charges'] = "NA"
+            res['wh_losses'], res['insts_loss'] = extract_losses_all(jsonl_file, target_fy)
+            res['wh_charges'] = extract_wheeling_charges(jsonl_file, target_fy)
+            res['css_charges'] = extract_css_charges(jsonl_file, target_fy)
+            res['additional_surcharge'] = extract_additional_surcharge(jsonl_file, target_fy)
+            res['fixed_charges'], res['energy_charges'] = extract_fixed_energy_charges(jsonl_file, target_fy)
+            res['insts_charges'] = extract_transmission_charges(jsonl_file)
+            res['ists_charges'] = "NA"
         
-        update_excel(excel_file, res)
-        print("Verification run completed.")
-    else:
-        print(f"Error: No JSONL file found for Puducherry in {input_dir}")
+            update_excel(excel_file, res)
+            print("Verification run completed.")
+        else:
+            print(f"Error: No JSONL file found for Puducherry in {input_dir}")
+    finally:
+        write_report("Puducherry")
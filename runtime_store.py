@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ---------- CONFIGURATION ----------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# "local": the agent runs inside the Flask process (python app.py)
+# "shared": runtime state lives in SQLite and pipeline_worker.py runs the agent,
+#           so the dashboard can be served by several WSGI worker processes
+RUNTIME_MODE = os.getenv("AGENT_RUNTIME", "local").lower()
+SHARED = RUNTIME_MODE == "shared"
+RUNTIME_DB = os.getenv("AGENT_RUNTIME_DB", os.path.join(BASE_DIR, "database", "runtime.db"))
+POLL_SECONDS = float(os.getenv("AGENT_RUNTIME_POLL", 0.25))
+# The web tier treats the pipeline worker as gone when it has not written for this long
+WORKER_STALE_SECONDS = float(os.getenv("AGENT_WORKER_STALE", 10))
+
+_local = threading.local()
+_schema_ready = set()
+
+
+def _connect(path=RUNTIME_DB):
+    """One connection per thread and database; WAL lets readers run while the worker writes"""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if path not in _schema_ready:
+            init_runtime(conn)
+            _schema_ready.add(path)
+        conns[path] = conn
+    return conn
+
+
+def init_runtime(conn):
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS logs (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            line TEXT
+        );
+        CREATE TABLE IF NOT EXISTS runtime (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            data TEXT
+        );
+        CREATE TABLE IF NOT EXISTS commands (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT,
+            payload TEXT,
+            result TEXT,
+            created_at REAL,
+            done_at REAL
+        );
+    ''')
+
+
+class SharedLogStore:
+    """
+    LogStore (log_store.py) backed by SQLite, so the pipeline worker appends and
+    every web process reads the same sequence numbers. The AUTOINCREMENT key
+    keeps counting up across resets, like LogStore's sequence; it starts at 1,
+    so a line's seq is its key - 1 and the first line is 0 as in LogStore.
+    """
+
+    def __init__(self, maxlen=1000, path=RUNTIME_DB):
+        self.maxlen = maxlen
+        self.path = path
+        self._changed = threading.Condition()
+        self._waiters = 0     # wait() calls blocked right now
+        self._seen = None     # next_seq as last read by the watcher
+        self._watcher = None
+
+    def append(self, line):
+        conn = _connect(self.path)
+        key = conn.execute("INSERT INTO logs (line) VALUES (?)", (line,)).lastrowid
+        if key % 100 == 0:
+            conn.execute("DELETE FROM logs WHERE seq <= ?", (key - self.maxlen,))
+        return key - 1
+
+    def reset(self, first_line=None):
+        _connect(self.path).execute("DELETE FROM logs")
+        if first_line is not None:
+            self.append(first_line)
+
+    @property
+    def next_seq(self):
+        row = _connect(self.path).execute("SELECT seq FROM sqlite_sequence WHERE name = 'logs'").fetchone()
+        return row["seq"] if row else 0
+
+    def since(self, after=0):
+        """Same contract as LogStore.since: (lines [(seq, line)], next_seq, missed)"""
+        conn = _connect(self.path)
+        next_seq = self.next_seq
+        if after > next_seq:
+            after = 0
+        first = conn.execute("SELECT MIN(seq) - 1 AS seq FROM logs").fetchone()["seq"]
+        if first is None:
+            first = next_seq
+        rows = conn.execute("SELECT seq - 1 AS seq, line FROM logs WHERE seq > ? ORDER BY seq LIMIT ?",
+                            (after, self.maxlen)).fetchall()
+        return [(r["seq"], r["line"]) for r in rows], next_seq, max(0, first - after)
+
+    def wait(self, after, timeout=None):
+        """Blocks until a line with seq >= after exists or timeout seconds have passed"""
+        deadline = time.monotonic() + (timeout if timeout is not None else float("inf"))
+        next_seq = self.next_seq
+        if next_seq > after or after > next_seq:
+            return self.since(after)
+        with self._changed:
+            self._waiters += 1
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, daemon=True)
+                self._watcher.start()
+            try:
+                while True:
+                    seen = self._seen
+                    if seen is not None and (seen > after or after > seen):
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._changed.wait(None if timeout is None else remaining)
+            finally:
+                self._waiters -= 1
+        return self.since(after)
+
+    def _watch(self):
+        """
+        The one thread per process that polls for new lines while any stream is
+        waiting, and wakes them all; idle SSE clients do not each query SQLite.
+        """
+        while True:
+            with self._changed:
+                if not self._waiters:
+                    self._watcher = None
+                    self._seen = None
+                    return
+            next_seq = self.next_seq
+            with self._changed:
+                if next_seq != self._seen:
+                    self._seen = next_seq
+                    self._changed.notify_all()
+            time.sleep(POLL_SECONDS)
+
+    def __len__(self):
+        return _connect(self.path).execute("SELECT COUNT(*) AS n FROM logs").fetchone()["n"]
+
+
+class RuntimeStore:
+    """
+    Agent state shared between pipeline_worker.py and the web processes:
+    progress and job snapshots written by the worker, and a command table
+    through which the web tier asks it to start or cancel runs.
+    """
+
+    def __init__(self, path=RUNTIME_DB):
+        self.path = path
+
+    # ---------- worker side ----------
+    def publish(self, progress, jobs):
+        """Replaces the progress snapshot and upserts the given job dicts"""
+        conn = _connect(self.path)
+        progress = dict(progress, updated_at=time.time())
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO runtime (key, value) VALUES ('progress', ?)", (json.dumps(progress),))
+            conn.executemany("INSERT OR REPLACE INTO jobs (id, data) VALUES (?, ?)",
+                             [(j["id"], json.dumps(j)) for j in jobs])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def abandon_jobs(self):
+        """Marks jobs left queued or running by a worker that exited as failed; returns their ids"""
+        conn = _connect(self.path)
+        abandoned = []
+        for row in conn.execute("SELECT id, data FROM jobs").fetchall():
+            job = json.loads(row["data"])
+            if job["status"] in ("queued", "running"):
+                job["status"] = "failed"
+                for step in job.get("steps", []):
+                    if step["status"] in ("queued", "running"):
+                        step["status"] = "failed"
+                conn.execute("UPDATE jobs SET data = ? WHERE id = ?", (json.dumps(job), row["id"]))
+                abandoned.append(row["id"])
+        return abandoned
+
+    def next_job_id(self):
+        row = _connect(self.path).execute("SELECT MAX(id) AS id FROM jobs").fetchone()
+        return (row["id"] or 0) + 1
+
+    def take_commands(self):
+        """[(id, kind, payload)] not handled yet, oldest first"""
+        rows = _connect(self.path).execute(
+            "SELECT id, kind, payload FROM commands WHERE done_at IS NULL ORDER BY id").fetchall()
+        return [(r["id"], r["kind"], json.loads(r["payload"])) for r in rows]
+
+    def complete_command(self, command_id, result):
+        _connect(self.path).execute("UPDATE commands SET result = ?, done_at = ? WHERE id = ?",
+                                    (json.dumps(result), time.time(), command_id))
+
+    def prune(self, keep_jobs=50, keep_seconds=3600):
+        conn = _connect(self.path)
+        conn.execute("DELETE FROM jobs WHERE id <= (SELECT MAX(id) FROM jobs) - ?", (keep_jobs,))
+        conn.execute("DELETE FROM commands WHERE done_at < ?", (time.time() - keep_seconds,))
+        # Metrics of processes that exited (or were recycled by the WSGI server); a live
+        # process republishes its whole snapshot with its next request
+        for row in conn.execute("SELECT key, value FROM runtime WHERE key LIKE 'metrics:%'").fetchall():
+            if json.loads(row["value"]).get("updated_at", 0) < time.time() - keep_seconds:
+                conn.execute("DELETE FROM runtime WHERE key = ?", (row["key"],))
+
+    # ---------- both sides ----------
+    def publish_metrics(self, snapshot):
+        """Stores this process's metrics.snapshot() so /metrics in any web process can sum it in"""
+        _connect(self.path).execute("INSERT OR REPLACE INTO runtime (key, value) VALUES (?, ?)",
+                                    (f"metrics:{os.getpid()}", json.dumps({"updated_at": time.time(), "snapshot": snapshot})))
+
+    def metric_snapshots(self):
+        """Snapshots published by the other processes (the pipeline worker and the other web workers)"""
+        rows = _connect(self.path).execute("SELECT key, value FROM runtime WHERE key LIKE 'metrics:%' AND key != ?",
+                                           (f"metrics:{os.getpid()}",)).fetchall()
+        return [json.loads(r["value"])["snapshot"] for r in rows]
+
+    # ---------- web side ----------
+    def progress(self):
+        row = _connect(self.path).execute("SELECT value FROM runtime WHERE key = 'progress'").fetchone()
+        progress = json.loads(row["value"]) if row else {}
+        progress["worker_alive"] = time.time() - progress.get("updated_at", 0) < WORKER_STALE_SECONDS
+        return progress
+
+    def jobs(self, limit=50):
+        rows = _connect(self.path).execute("SELECT data FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [json.loads(r["data"]) for r in rows]
+
+    def job(self, job_id):
+        row = _connect(self.path).execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def call(self, kind, payload, timeout=5):
+        """
+        Queues a command for the pipeline worker and waits for its result.
+        Returns None when no worker is alive or it did not answer in time.
+        """
+        if not self.progress()["worker_alive"]:
+            return None
+        conn = _connect(self.path)
+        command_id = conn.execute("INSERT INTO commands (kind, payload, created_at) VALUES (?, ?, ?)",
+                                  (kind, json.dumps(payload), time.time())).lastrowid
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            row = conn.execute("SELECT result FROM commands WHERE id = ? AND done_at IS NOT NULL",
+                               (command_id,)).fetchone()
+            if row:
+                return json.loads(row["result"])
+            time.sleep(POLL_SECONDS / 2)
+        # Not picked up in time: withdraw it so it does not run later unexpectedly
+        conn.execute("DELETE FROM commands WHERE id = ? AND done_at IS NULL", (command_id,))
+        return None
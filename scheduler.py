@@ -0,0 +1,212 @@
+import os
+import random
+import sys
+import threading
+from datetime import datetime, timedelta
+
+# ---------- CONFIGURATION ----------
+# Semicolon-separated "<minute> <hour> <day of month> <month> <day of week> [targets]" entries.
+# targets is a comma-separated list of Download/ state names, ISTS for the ISTS steps
+# only, or * / nothing for every state, e.g.
+#   AGENT_SCHEDULE=30 2 * * * ISTS; 0 3 * * 1 Assam,Bihar; 0 4 * * 1 *
+# Every trigger queues an incremental run (unchanged states are skipped).
+SCHEDULE = os.getenv("AGENT_SCHEDULE", "")
+# Each trigger fires a random 0..JITTER seconds after its cron time, so runs do not
+# hit the regulator sites at the same minute every day
+JITTER_SECONDS = float(os.getenv("AGENT_SCHEDULE_JITTER", 300))
+SCHEDULE_MODE = os.getenv("AGENT_SCHEDULE_MODE", "incremental").lower()
+
+# (name, first, last) of the five cron fields; day of week 0 and 7 are Sunday
+FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)]
+
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/", 1)
+            step = int(step)
+            if step < 1:
+                raise ValueError(f"Bad step in {text!r}")
+        if part == "*":
+            first, last = low, high
+        elif "-" in part:
+            first, last = (int(v) for v in part.split("-", 1))
+        else:
+            first = int(part)
+            last = high if step > 1 else first
+        if not low <= first <= last <= high:
+            raise ValueError(f"{text!r} is outside {low}-{high}")
+        values.update(range(first, last + 1, step))
+    return values
+
+
+class CronSchedule:
+    """A five-field cron expression; next_after() is the first matching minute after a datetime"""
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Expected 5 cron fields, got {expression!r}")
+        self.expression = expression
+        fields = [_parse_field(p, low, high) for p, (_, low, high) in zip(parts, FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = {d % 7 for d in weekdays}
+        # As in cron: when both day fields are restricted a day matches either of them
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    def _day_matches(self, dt):
+        weekday = (dt.weekday() + 1) % 7  # cron counts from Sunday
+        if self.any_day or self.any_weekday:
+            return dt.day in self.days and weekday in self.weekdays
+        return dt.day in self.days or weekday in self.weekdays
+
+    def next_after(self, dt):
+        dt = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"{self.expression!r} never matches")
+
+
+class ScheduleEntry:
+    """One AGENT_SCHEDULE entry: when it fires and which states it runs (None = all)"""
+
+    def __init__(self, text):
+        parts = text.split()
+        self.text = " ".join(parts)
+        self.cron = CronSchedule(" ".join(parts[:5]))
+        targets = [t.strip() for t in " ".join(parts[5:]).split(",") if t.strip() and t.strip() != "*"]
+        self.states = targets or None
+        self.next_at = None
+
+    @property
+    def label(self):
+        return ", ".join(self.states) if self.states else "all states"
+
+    def plan(self, now, jitter=JITTER_SECONDS):
+        """Sets next_at to the next cron time after now plus a random jitter"""
+        self.next_at = self.cron.next_after(now) + timedelta(seconds=random.uniform(0, jitter))
+        return self.next_at
+
+
+def parse_schedule(text=SCHEDULE, validate=None):
+    """
+    ScheduleEntry list of an AGENT_SCHEDULE value. Malformed entries and
+    entries that never fire (e.g. "0 0 31 2 *") are reported and left out;
+    validate(states) may return an error message for unknown targets
+    (pipeline.validate_selection).
+    """
+    entries = []
+    for chunk in text.split(";"):
+        if not chunk.strip():
+            continue
+        try:
+            entry = ScheduleEntry(chunk)
+            entry.cron.next_after(datetime.now())
+            error = validate(entry.states) if validate else None
+            if error:
+                raise ValueError(error)
+        except ValueError as e:
+            print(f"Ignoring schedule entry {chunk.strip()!r}: {e}")
+            continue
+        entries.append(entry)
+    return entries
+
+
+class Scheduler:
+    """
+    Background thread that calls submit(mode, states, stages) when an entry is due.
+    Triggers missed while the process was asleep or busy fire once, not once per
+    missed slot, and a trigger that arrives while a run is already queued is
+    merged into it by JobQueue.submit; a running run is never started twice.
+    """
+
+    def __init__(self, entries, submit, mode=SCHEDULE_MODE, jitter=JITTER_SECONDS):
+        self.entries = list(entries)
+        self.submit = submit
+        self.mode = mode
+        self.jitter = jitter
+        self._stop = threading.Event()
+        self._thread = None
+
+    def due(self, now):
+        """Entries whose time has come; each is re-planned from now, so missed slots collapse into one"""
+        due = []
+        for entry in self.entries:
+            if entry.next_at is None:
+                entry.plan(now, self.jitter)
+            elif entry.next_at <= now:
+                due.append(entry)
+                entry.plan(now, self.jitter)
+        return due
+
+    def fire(self, entries):
+        if not entries:
+            return None
+        # Entries due together become one run over the union of their states
+        states = None
+        if all(e.states for e in entries):
+            states = sorted({s for e in entries for s in e.states})
+        result = self.submit(self.mode, states, None)
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Scheduled run for {', '.join(e.label for e in entries)}: {result}")
+        return result
+
+    def run(self):
+        while not self._stop.is_set():
+            now = datetime.now()
+            try:
+                self.fire(self.due(now))
+            except Exception as e:
+                print(f"Scheduled run failed to start: {e}")
+            upcoming = min(e.next_at for e in self.entries)
+            # Wake at the next trigger, and at least every minute in case the clock jumps
+            self._stop.wait(max(1, min(60, (upcoming - datetime.now()).total_seconds())))
+
+    def start(self):
+        if self.entries and self._thread is None:
+            for entry in list(self.entries):
+                try:
+                    print(f"Schedule {entry.text!r}: next run at {entry.plan(datetime.now(), self.jitter):%Y-%m-%d %H:%M}")
+                except ValueError as e:
+                    print(f"Ignoring schedule entry {entry.text!r}: {e}")
+                    self.entries.remove(entry)
+            if not self.entries:
+                return self
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_scheduler(submit, text=SCHEDULE):
+    """Starts a Scheduler for the AGENT_SCHEDULE entries; None when nothing is scheduled"""
+    from pipeline import validate_selection
+    entries = parse_schedule(text, validate=validate_selection)
+    return Scheduler(entries, submit).start() if entries else None
+
+
+if __name__ == "__main__":
+    # python scheduler.py [count]: the next trigger times of every AGENT_SCHEDULE entry
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    from pipeline import validate_selection
+    for entry in parse_schedule(validate=validate_selection):
+        at = datetime.now()
+        times = []
+        for _ in range(count):
+            at = entry.cron.next_after(at)
+            times.append(f"{at:%a %Y-%m-%d %H:%M}")
+        print(f"{entry.text}  ({entry.label})\n    " + "\n    ".join(times))
@@ -3,8 +3,15 @@ import json
 import os
 import shutil
 import stat
+import time
 from collections import defaultdict
 
+import metrics
+from workspace import workspace_root
+
+# Optionally load every extracted table into the SQLite FTS5 search index
+BUILD_TABLE_INDEX = os.getenv("SCRAPER_BUILD_INDEX", "False").lower() == "true"
+
 
 def remove_readonly(func, path, _):
     os.chmod(path, stat.S_IWRITE)
@@ -52,8 +59,13 @@ def get_nearest_text_heading(page, table_top, max_distance=80):
         return ""
 
 
-def scrape_pdf_tables_to_jsonl():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+def scrape_pdf_tables_to_jsonl(build_index=BUILD_TABLE_INDEX, states=None):
+    """
+    Extracts every table of Download/**.pdf into Extraction/**.jsonl.
+    With states (list of Download sub-folder names) only those folders are
+    scraped and only their Extraction folders are replaced.
+    """
+    base_dir = workspace_root()
     input_root = os.path.join(base_dir, "Download")
     output_root = os.path.join(base_dir, "Extraction")
 
@@ -61,12 +73,25 @@ def scrape_pdf_tables_to_jsonl():
         print(f"Error: Folder not found -> {input_root}")
         return
 
-    if os.path.exists(output_root):
-        shutil.rmtree(output_root, onerror=remove_readonly)
+    if states is None:
+        input_dirs = [input_root]
+        if os.path.exists(output_root):
+            shutil.rmtree(output_root, onerror=remove_readonly)
+    else:
+        input_dirs = []
+        for state in states:
+            state_output = os.path.join(output_root, state)
+            if os.path.exists(state_output):
+                shutil.rmtree(state_output, onerror=remove_readonly)
+            state_input = os.path.join(input_root, state)
+            if os.path.isdir(state_input):
+                input_dirs.append(state_input)
+            else:
+                print(f"No downloads for {state}")
 
     os.makedirs(output_root, exist_ok=True)
 
-    for root, _, files in os.walk(input_root):
+    for root, _, files in (entry for d in input_dirs for entry in os.walk(d)):
         pdf_files = [f for f in files if f.lower().endswith(".pdf")]
         if not pdf_files:
             continue
@@ -74,6 +99,8 @@ def scrape_pdf_tables_to_jsonl():
         rel_path = os.path.relpath(root, input_root)
         output_dir = os.path.join(output_root, rel_path)
         os.makedirs(output_dir, exist_ok=True)
+        # Download/<State>/... -> per-state scrape rates
+        state = rel_path.split(os.sep)[0]
 
         for pdf_file in sorted(pdf_files):
             pdf_path = os.path.join(root, pdf_file)
@@ -82,8 +109,10 @@ def scrape_pdf_tables_to_jsonl():
             )
 
             print(f"\nProcessing: {pdf_path}")
+            started = time.monotonic()
 
             with pdfplumber.open(pdf_path) as pdf, open(output_path, "w", encoding="utf-8") as f_out:
+                page_count = len(pdf.pages)
 
                 for page_num, page in enumerate(pdf.pages, start=1):
                     tables = page.find_tables()
@@ -134,7 +163,28 @@ def scrape_pdf_tables_to_jsonl():
                         f_out.write(json.dumps(record, ensure_ascii=False) + "\n")
 
             print("✔ Completed")
+            metrics.SCRAPE_PDF_SECONDS.observe(time.monotonic() - started, state=state)
+            metrics.SCRAPED_PDFS.inc(state=state)
+            metrics.SCRAPED_PAGES.inc(page_count, state=state)
+
+    if build_index:
+        try:
+            if states is None:
+                from database.table_index import build_index as build_table_index
+                build_table_index(output_root)
+            else:
+                from database.table_index import index_states
+                index_states(output_root, states)
+        except Exception as e:
+            print(f"Table index build failed: {e}")
 
 
 if __name__ == "__main__":
-    scrape_pdf_tables_to_jsonl()
+    import sys
+    # Optional: python scraper.py --states "Assam,Bihar" scrapes only those Download folders
+    selected = None
+    if "--states" in sys.argv:
+        idx = sys.argv.index("--states")
+        if idx + 1 < len(sys.argv):
+            selected = [s.strip() for s in sys.argv[idx + 1].split(",") if s.strip()]
+    scrape_pdf_tables_to_jsonl(build_index=BUILD_TABLE_INDEX or "--index" in sys.argv, states=selected)
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import openpyxl
+
+from status_registry import excel_variants
+from workspace import read_root
+
+# ---------- CONFIGURATION ----------
+# "excel" reads the state's .xlsx, "db" serves the same payload from tariff_data
+STATE_DATA_SOURCE = os.getenv("STATE_DATA_SOURCE", "excel").lower()
+SHEET_CACHE_SIZE = int(os.getenv("SHEET_CACHE_SIZE", 64))
+
+_cache = OrderedDict()  # path -> (mtime_ns, size, rows, etag)
+_lock = threading.Lock()
+
+
+def find_state_excel(state, base_dir=None):
+    """The state's Excel output in base_dir, by default the folder readers use (see workspace.read_root)"""
+    base_dir = base_dir or read_root()
+    for v in excel_variants(state):
+        path = os.path.join(base_dir, v)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_sheet_rows(path):
+    """Non-empty rows of the active sheet as strings, read in streaming (read-only) mode"""
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = wb.active
+        data = []
+        for row in sheet.iter_rows(values_only=True):
+            if any(cell is not None for cell in row):
+                data.append([str(c) if c is not None else "" for c in row])
+        return data
+    finally:
+        wb.close()
+
+
+def get_sheet(path):
+    """(rows, etag) for an Excel file, parsed once per (path, mtime, size)"""
+    st = os.stat(path)
+    with _lock:
+        hit = _cache.get(path)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            _cache.move_to_end(path)
+            return hit[2], hit[3]
+    rows = read_sheet_rows(path)
+    etag = "xlsx-" + hashlib.sha1(f"{path}|{st.st_mtime_ns}|{st.st_size}".encode()).hexdigest()[:16]
+    with _lock:
+        _cache[path] = (st.st_mtime_ns, st.st_size, rows, etag)
+        _cache.move_to_end(path)
+        while len(_cache) > SHEET_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return rows, etag
+
+
+def get_state_data(state, source=None):
+    """(rows, etag) for a state's dashboard table from the Excel file or SQLite, or (None, None)"""
+    if (source or STATE_DATA_SOURCE) == "db":
+        from database.database_utils import get_state_rows
+        rows, last_updated = get_state_rows(state)
+        if not rows or len(rows) < 2:
+            return None, None
+        etag = "db-" + hashlib.sha1(f"{state.lower()}|{last_updated}|{len(rows)}".encode()).hexdigest()[:16]
+        return rows, etag
+    path = find_state_excel(state)
+    if not path:
+        return None, None
+    return get_sheet(path)
@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+# Full re-scan at most this often, to pick up Excel files changed outside the pipeline
+STATUS_REFRESH_SECONDS = float(os.getenv("STATUS_REFRESH_SECONDS", 60))
+
+
+def excel_variants(state):
+    """File names a state's Excel output may have (with/without spaces, lowercase/original)"""
+    return [
+        f"{state}.xlsx",
+        f"{state.lower()}.xlsx",
+        f"{state.replace(' ', '')}.xlsx",
+        f"{state.replace(' ', '').lower()}.xlsx"
+    ]
+
+
+class StatusRegistry:
+    """
+    In-memory {state: has_file} for the dashboard. Pipeline events call
+    refresh(state) when a state's output may have changed; readers get the
+    cached map plus a version that only changes when a value does, for ETags.
+    base_dir may be a callable, for a folder that moves (workspace.read_root).
+    """
+
+    def __init__(self, states, base_dir, max_age=STATUS_REFRESH_SECONDS):
+        self.states = list(states)
+        self.base_dir = base_dir
+        self.max_age = max_age
+        self._status = {}
+        self._version = 0
+        self._scanned_at = 0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _has_file(self, state):
+        base_dir = self.base_dir() if callable(self.base_dir) else self.base_dir
+        return any(os.path.exists(os.path.join(base_dir, v)) for v in excel_variants(state))
+
+    def refresh(self, state=None):
+        """Re-checks one state (or all of them); returns True if anything changed"""
+        targets = [state] if state else self.states
+        found = {s: self._has_file(s) for s in targets if s in self.states}
+        with self._lock:
+            changed = any(self._status.get(s) != v for s, v in found.items())
+            self._status.update(found)
+            if changed:
+                self._version += 1
+            if state is None:
+                self._scanned_at = time.monotonic()
+        return changed
+
+    def snapshot(self):
+        """(status dict, version), re-scanning first if the last full scan is older than max_age"""
+        if time.monotonic() - self._scanned_at > self.max_age:
+            self.refresh()
+        with self._lock:
+            return dict(self._status), self._version
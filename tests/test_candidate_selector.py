@@ -0,0 +1,74 @@
+from candidate_selector import BestPerKey, TopK
+
+
+def test_topk_keeps_highest_ranks_best_first():
+    top = TopK(k=2)
+    for rank, value in [(1, "a"), (5, "b"), (3, "c"), (4, "d")]:
+        top.offer(rank, value)
+    assert top.ranked() == [(5, "b"), (4, "d")]
+    assert top.best() == "b"
+    assert len(top) == 2
+
+
+def test_topk_first_offered_wins_ties():
+    top = TopK(k=2)
+    assert top.offer(1, "first")
+    assert top.offer(1, "second")
+    assert not top.offer(1, "third")
+    assert top.ranked() == [(1, "first"), (1, "second")]
+
+
+def test_topk_empty_best_returns_default():
+    assert TopK(k=1).best("empty") == "empty"
+
+
+def test_topk_matches_stable_reverse_sort():
+    candidates = [((2, 1), "a"), ((3, 0), "b"), ((2, 1), "c"), ((3, 0), "d"), ((1, 9), "e")]
+    top = TopK(k=3)
+    for rank, value in candidates:
+        top.offer(rank, value)
+    expected = sorted(candidates, key=lambda c: c[0], reverse=True)[:3]
+    assert top.ranked() == expected
+
+
+def test_topk_done_once_every_slot_has_max_rank():
+    top = TopK(k=2, max_rank=10)
+    top.offer(10, "a")
+    assert not top.done
+    top.offer(7, "b")
+    assert not top.done
+    top.offer(10, "c")
+    assert top.done
+    assert not TopK(k=1).done
+
+
+def test_best_per_key_strictly_higher_replaces():
+    best = BestPerKey()
+    assert best.offer("11", 1, "first")
+    assert not best.offer("11", 1, "tie")
+    assert best.offer("11", 2, "better")
+    assert not best.offer("11", 0, "worse")
+    assert best.get("11") == "better"
+    assert best.rank("11") == 2
+    assert best.get("33", "NA") == "NA"
+    assert "11" in best and "33" not in best
+
+
+def test_best_per_key_offer_many_and_values():
+    best = BestPerKey()
+    best.offer("11", 3, "eleven")
+    assert best.offer_many(["11", "33"], 2, "common")
+    assert best.values() == {"11": "eleven", "33": "common"}
+    assert not best.offer_many(["11", "33"], 1, "lower")
+
+
+def test_best_per_key_done_when_every_key_settled():
+    best = BestPerKey(keys=["11", "33"], max_rank=2)
+    best.offer("11", 2, "a")
+    assert best.is_settled("11") and not best.is_settled("33")
+    assert not best.done
+    best.offer("33", 1, "b")
+    assert not best.done
+    best.offer("33", 2, "c")
+    assert best.done
+    assert not BestPerKey(max_rank=2).done
@@ -0,0 +1,115 @@
+import itertools
+import types
+
+import pytest
+
+import extraction_cache
+import extractor_trace
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "CACHE_PATH", str(tmp_path / "cache" / "extractor_cache.db"))
+    monkeypatch.setattr(extraction_cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(extractor_trace, "TRACE_ENABLED", False)
+    # A clock that always moves forward, so LRU order does not depend on timer resolution
+    clock = itertools.count(1000)
+    monkeypatch.setattr(extraction_cache, "time", types.SimpleNamespace(time=lambda: next(clock)))
+    return extraction_cache
+
+
+def _counting_extractor(cache, version="1"):
+    calls = []
+
+    @cache.cached_extractor(version)
+    def extract(path, discom=None):
+        calls.append((path, discom))
+        return ("value", len(calls))
+
+    return extract, calls
+
+
+def test_hit_on_same_content_and_arguments(cache, tmp_path):
+    doc = tmp_path / "order.jsonl"
+    doc.write_text("table")
+    extract, calls = _counting_extractor(cache)
+    assert extract(str(doc)) == ("value", 1)
+    assert extract(str(doc)) == ("value", 1)  # tuples survive the JSON round trip
+    assert len(calls) == 1
+    assert extract(str(doc), discom="APDCL") == ("value", 2)
+    assert extract(str(doc), discom="APDCL") == ("value", 2)
+    assert len(calls) == 2
+
+
+def test_key_follows_content_not_path(cache, tmp_path):
+    a, b = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    a.write_text("same")
+    b.write_text("same")
+    extract, calls = _counting_extractor(cache)
+    extract(str(a))
+    extract(str(b))
+    assert len(calls) == 1
+    a.write_text("changed content")
+    extract(str(a))
+    assert len(calls) == 2
+
+
+def test_version_bump_invalidates(cache, tmp_path):
+    doc = tmp_path / "order.jsonl"
+    doc.write_text("table")
+    v1, v1_calls = _counting_extractor(cache, "1")
+    v2, v2_calls = _counting_extractor(cache, "2")
+    v1(str(doc))
+    v2(str(doc))
+    assert len(v1_calls) == len(v2_calls) == 1
+
+
+def test_missing_file_and_disabled_cache_bypass(cache, tmp_path, monkeypatch):
+    extract, calls = _counting_extractor(cache)
+    extract(str(tmp_path / "missing.jsonl"))
+    extract(str(tmp_path / "missing.jsonl"))
+    assert len(calls) == 2
+    doc = tmp_path / "order.jsonl"
+    doc.write_text("table")
+    monkeypatch.setattr(extractor_trace, "TRACE_ENABLED", True)
+    extract(str(doc))
+    extract(str(doc))
+    assert len(calls) == 4
+
+
+def test_least_recently_used_entries_are_evicted(cache, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_MAX_ENTRIES", 2)
+    cache.cache_put("a", "m.f", 1)
+    cache.cache_put("b", "m.f", 2)
+    assert cache.cache_get("a") == (True, 1)  # a is now newer than b
+    cache.cache_put("c", "m.f", 3)
+    assert cache.cache_get("b") == (False, None)
+    assert cache.cache_get("a") == (True, 1)
+    assert cache.cache_get("c") == (True, 3)
+
+
+def test_clear_by_extractor_prefix(cache):
+    cache.cache_put("a", "Assam.extract_x", 1)
+    cache.cache_put("b", "bihar.extract_y", 2)
+    cache.clear_cache("Assam.")
+    assert cache.cache_get("a") == (False, None)
+    assert cache.cache_get("b") == (True, 2)
+
+
+def test_schema_is_created_once_per_cache_file(cache, tmp_path, monkeypatch):
+    statements = []
+    connect = cache.sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(cache.sqlite3, "connect", traced_connect)
+    doc = tmp_path / "order.jsonl"
+    doc.write_text("table")
+    extract, calls = _counting_extractor(cache)
+    for _ in range(3):
+        extract(str(doc))
+    assert len(calls) == 1
+    assert sum("CREATE" in s for s in statements) == 2  # table and index, on first use only
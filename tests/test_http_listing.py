@@ -0,0 +1,121 @@
+import pytest
+
+from http_listing import parse_listing
+
+BASE = "https://regulator.example/pages/orders"
+
+
+def test_links_are_absolute_and_text_is_collapsed():
+    listing = parse_listing('''
+        <a href="/files/order.pdf" class="aaa bbb">  Tariff
+           Order </a>
+        <a href="javascript:__doPostBack('x','')">Previous Years</a>
+        <a href="#top">Top</a>
+        <a>No href</a>
+    ''', BASE)
+    assert [(l["text"], l["url"], l["class"]) for l in listing.links] == [
+        ("Tariff Order", "https://regulator.example/files/order.pdf", "aaa bbb"),
+        ("Previous Years", None, ""),
+        ("Top", None, ""),
+        ("No href", None, ""),
+    ]
+    assert listing.links[1]["href"].startswith("javascript:")
+
+
+def test_rows_cells_and_their_links():
+    listing = parse_listing('''
+        <table>
+          <tr><th>Date</th><th>Subject</th><th>File</th></tr>
+          <tr><td>01.04.2025</td><td>Tariff Order APDCL</td><td><a href="a.pdf">View</a></td></tr>
+        </table>
+    ''', BASE)
+    assert len(listing.rows) == 1  # header rows without a <td> are left out, like //tr[td]
+    row = listing.rows[0]
+    assert row["text"] == "01.04.2025 Tariff Order APDCL View"
+    assert [c["text"] for c in row["cells"]] == ["01.04.2025", "Tariff Order APDCL", "View"]
+    assert row["cells"][2]["links"][0]["url"] == "https://regulator.example/pages/a.pdf"
+    assert row["links"] == row["cells"][2]["links"]
+    assert row["cells"][0]["links"] == []
+
+
+def test_optional_end_tags():
+    listing = parse_listing('''
+        <table>
+          <tr><td>one<td>two
+          <tr><td>three
+        </table>
+        <p>after</p>
+    ''', BASE)
+    assert [[c["text"] for c in r["cells"]] for r in listing.rows] == [["one", "two"], ["three"]]
+
+
+def test_nested_tables_keep_outer_row():
+    listing = parse_listing('''
+        <table><tr><td>outer
+          <table><tr><td>inner</td></tr></table>
+        </td><td>last</td></tr></table>
+    ''', BASE)
+    texts = sorted(r["text"] for r in listing.rows)
+    assert texts == ["inner", "outer inner last"]
+
+
+def test_script_and_style_text_is_ignored():
+    listing = parse_listing("<table><tr><td>a<script>var x = '<td>';</script><style>td{}</style>b</td></tr></table>", BASE)
+    assert listing.rows[0]["text"] == "ab"
+
+
+def _automation():
+    # Automation.py needs Selenium at import time for its browser fallback
+    pytest.importorskip("selenium")
+    import Automation
+    return Automation
+
+
+def test_select_assam_picks_newest_apdcl_order():
+    automation = _automation()
+    listing = parse_listing('''
+        <a href="?year=2024">2024</a><a href="?year=2025">2025</a><a href="?type=x">All</a>
+        <table>
+          <tr><td>15.03.2024</td><td>Tariff Order APDCL FY 24-25</td><td><a href="old.pdf">PDF</a></td></tr>
+          <tr><td>20.03.2025 &amp; 21.03.2025</td><td>Tariff Order APDCL FY 25-26</td><td><a href="new.pdf">PDF</a></td></tr>
+          <tr><td>25.03.2025</td><td>Tariff Order AEGCL</td><td><a href="other.pdf">PDF</a></td></tr>
+          <tr><td>26.03.2025</td><td>Tariff Order APDCL</td><td>no file</td></tr>
+        </table>
+    ''', automation.AERC_ORDERS_URL)
+    assert [year for year, _ in automation.assam_years(listing)] == [2025, 2024]
+    target = automation.select_assam(listing)
+    assert target["url"].endswith("/new.pdf")
+    assert target["date_str"] == "20.03.2025 & 21.03.2025"
+    assert automation.select_assam(None) is None
+
+
+def test_select_up_skips_scanned_copies_and_other_classes():
+    automation = _automation()
+    listing = parse_listing('''
+        <a class="bbb" href="x.pdf">State DISCOMs Tariff Order</a>
+        <a class="aaa" href="scan.pdf">State DISCOMs Tariff Order (Scanned)</a>
+        <a class="aaa" href="order.aspx">State DISCOMs Tariff Order</a>
+        <a class="aaa" href="order.pdf">State DISCOMs Tariff Order FY 2025-26</a>
+    ''', automation.UPERC_ORDERS_URL)
+    assert automation.select_up(listing)["url"].endswith("/order.pdf")
+
+
+def test_select_meghalaya_skips_corrigendum():
+    automation = _automation()
+    listing = parse_listing('''
+        <a href="c.pdf">Corrigendum to Aggregate Revenue Requirement order</a>
+        <a href="arr.pdf">Aggregate Revenue Requirement FY 2025-26</a>
+    ''', automation.MSERC_ORDERS_URL)
+    assert automation.select_meghalaya(listing)["url"].endswith("/arr.pdf")
+
+
+def test_select_odisha_needs_discom_and_skips_petitions():
+    automation = _automation()
+    listing = parse_listing('''
+        <table>
+          <tr><td>Aggregate Revenue Requirement petition of DISCOMs</td><td><a href="p.pdf">PDF</a></td></tr>
+          <tr><td>Aggregate Revenue Requirement of GRIDCO</td><td><a href="g.pdf">PDF</a></td></tr>
+          <tr><td>Aggregate Revenue Requirement FY 2025-26</td><td><a href="DISCOM_TARIFF_ORDER.pdf">PDF</a></td></tr>
+        </table>
+    ''', automation.OERC_ORDERS_URL)
+    assert automation.select_odisha(listing)["url"].endswith("/DISCOM_TARIFF_ORDER.pdf")
@@ -0,0 +1,102 @@
+import threading
+
+from job_queue import JobQueue
+
+
+class BlockingRunner:
+    """Runner that holds each job until release() so tests can queue behind it"""
+
+    def __init__(self):
+        self.started = threading.Semaphore(0)
+        self.gate = threading.Event()
+        self.ran = []
+
+    def __call__(self, job):
+        self.ran.append((job.id, job.mode, job.states, job.stages))
+        self.started.release()
+        self.gate.wait(5)
+        return True
+
+    def release(self):
+        self.gate.set()
+
+
+def _wait_until_idle(queue):
+    for _ in range(500):
+        if not queue.busy:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("queue did not drain")
+
+
+def test_submissions_during_a_run_coalesce_into_one_follow_up():
+    runner = BlockingRunner()
+    queue = JobQueue(runner)
+    first, coalesced = queue.submit("per_state", ["Assam"], None)
+    assert not coalesced
+    assert runner.started.acquire(timeout=5)
+
+    second, coalesced = queue.submit("per_state", ["Bihar"], ["download"])
+    assert not coalesced
+    third, coalesced = queue.submit("per_state", ["Assam", "Odisha"], ["scrape"])
+    assert coalesced and third is second
+    assert second.states == ["Bihar", "Assam", "Odisha"]
+    assert second.stages == ["download", "scrape"]
+    assert second.coalesced == 1
+
+    runner.release()
+    _wait_until_idle(queue)
+    assert [r[0] for r in runner.ran] == [first.id, second.id]
+    assert first.status == second.status == "done"
+
+
+def test_none_selection_widens_and_mixed_modes_clear_mode():
+    runner = BlockingRunner()
+    queue = JobQueue(runner)
+    queue.submit("stage")
+    assert runner.started.acquire(timeout=5)
+    queued, _ = queue.submit("incremental", ["Assam"], ["extract"])
+    queue.submit("per_state", None, ["sync"])
+    assert queued.states is None
+    assert queued.stages == ["extract", "sync"]
+    assert queued.mode is None
+    runner.release()
+    _wait_until_idle(queue)
+
+
+def test_cancel_queued_job_keeps_running_one():
+    runner = BlockingRunner()
+    queue = JobQueue(runner)
+    running, _ = queue.submit("stage")
+    assert runner.started.acquire(timeout=5)
+    queued, _ = queue.submit("stage", ["Assam"])
+    assert queue.cancel(queued.id) == [queued]
+    assert queued.status == "cancelled"
+    assert queue.get(queued.id) is queued
+    runner.release()
+    _wait_until_idle(queue)
+    assert running.status == "done"
+    assert len(runner.ran) == 1
+
+
+def test_failing_runner_marks_job_and_open_steps_failed():
+    class Task:
+        def __init__(self, name):
+            self.name, self.display, self.stage = name, name, "extract"
+
+    done = threading.Event()
+
+    def runner(job):
+        job.set_steps([Task("a"), Task("b")])
+        job.step_started("a")
+        job.step_finished("a", "done")
+        job.step_started("b")
+        done.set()
+        raise RuntimeError("boom")
+
+    queue = JobQueue(runner)
+    job, _ = queue.submit("stage")
+    assert done.wait(5)
+    _wait_until_idle(queue)
+    assert job.status == "failed"
+    assert [s["status"] for s in job.to_dict()["steps"]] == ["done", "failed"]
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import manifest
+
+SCRIPT = "Assam.py"
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    path = str(tmp_path / "pipeline_manifest.json")
+    # Both defaults are bound at import; keep the test away from the real manifest
+    monkeypatch.setattr(manifest.load_manifest, "__defaults__", (path,))
+    monkeypatch.setattr(manifest.save_manifest, "__defaults__", (path,))
+    (tmp_path / "Download" / "Assam" / "2025").mkdir(parents=True)
+    (tmp_path / "Download" / "Assam" / "2025" / "order.pdf").write_bytes(b"%PDF-1 order")
+    (tmp_path / "Download" / "Assam" / "notes.txt").write_text("not a pdf")
+    (tmp_path / "Assam.xlsx").write_bytes(b"excel")
+    return str(tmp_path)
+
+
+def test_pdf_hashes_are_relative_and_content_based(root):
+    hashes = manifest.pdf_hashes("Assam", root)
+    assert list(hashes) == ["2025/order.pdf"]
+    assert hashes["2025/order.pdf"] == manifest.file_hash(os.path.join(root, "Download", "Assam", "2025", "order.pdf"))
+    assert manifest.pdf_hashes("Bihar", root) == {}
+
+
+def test_extractor_version_depends_on_the_script():
+    assert manifest.extractor_version("Assam.py") == manifest.extractor_version("Assam.py")
+    assert manifest.extractor_version("Assam.py") != manifest.extractor_version("bihar.py")
+
+
+def test_unchanged_after_record(root):
+    assert not manifest.is_unchanged("Assam", SCRIPT, root=root)
+    manifest.record_state("Assam", SCRIPT, root)
+    assert manifest.is_unchanged("Assam", SCRIPT, root=root)
+
+
+def test_new_pdf_is_a_change(root):
+    manifest.record_state("Assam", SCRIPT, root)
+    with open(os.path.join(root, "Download", "Assam", "corrigendum.pdf"), "wb") as f:
+        f.write(b"%PDF-1 corrigendum")
+    assert not manifest.is_unchanged("Assam", SCRIPT, root=root)
+
+
+def test_rewritten_output_is_a_change(root):
+    manifest.record_state("Assam", SCRIPT, root)
+    excel = os.path.join(root, "Assam.xlsx")
+    stat = os.stat(excel)
+    os.utime(excel, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert not manifest.is_unchanged("Assam", SCRIPT, root=root)
+
+
+def test_missing_output_or_pdfs_is_never_unchanged(root):
+    manifest.record_state("Assam", SCRIPT, root)
+    os.remove(os.path.join(root, "Assam.xlsx"))
+    assert not manifest.is_unchanged("Assam", SCRIPT, root=root)
+
+
+def test_ists_losses_are_an_input(root):
+    manifest.record_state("Assam", SCRIPT, root)
+    os.makedirs(os.path.join(root, "ists_extracted"))
+    with open(os.path.join(root, "ists_extracted", "ists_loss.json"), "w") as f:
+        f.write('{"All India transmission Loss (in %)": 3.1}')
+    assert not manifest.is_unchanged("Assam", SCRIPT, root=root)
@@ -0,0 +1,50 @@
+import pytest
+
+from log_store import LogStore
+from runtime_store import SharedLogStore
+
+
+@pytest.fixture(params=["local", "shared"])
+def store(request, tmp_path):
+    if request.param == "local":
+        return LogStore(maxlen=5)
+    return SharedLogStore(maxlen=5, path=str(tmp_path / "runtime.db"))
+
+
+def test_fresh_client_reads_the_whole_log_without_missed_lines(store):
+    assert store.since(0) == ([], 0, 0)
+    store.reset("Agent started")
+    store.append("second")
+
+    lines, next_seq, missed = store.since(0)
+    assert lines == [(0, "Agent started"), (1, "second")]
+    assert next_seq == 2
+    assert missed == 0
+
+
+def test_cursor_resumes_after_the_last_line_read(store):
+    first = store.append("a")
+    store.append("b")
+    _, next_seq, _ = store.since(0)
+    store.append("c")
+
+    lines, _, missed = store.since(next_seq)
+    assert first == 0
+    assert lines == [(2, "c")]
+    assert missed == 0
+
+
+def test_reset_keeps_counting_and_reports_cleared_lines_as_missed(store):
+    store.append("old run")
+    store.reset("new run")
+
+    lines, next_seq, missed = store.since(0)
+    assert lines == [(1, "new run")]
+    assert next_seq == 2
+    assert missed == 1
+
+
+def test_wait_returns_as_soon_as_a_line_exists(store):
+    store.append("ready")
+    lines, _, _ = store.wait(0, timeout=5)
+    assert lines == [(0, "ready")]
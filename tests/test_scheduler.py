@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from scheduler import CronSchedule, ScheduleEntry, Scheduler, parse_schedule
+
+
+def test_next_after_is_strictly_later():
+    cron = CronSchedule("30 2 * * *")
+    assert cron.next_after(datetime(2025, 1, 1, 1, 0)) == datetime(2025, 1, 1, 2, 30)
+    assert cron.next_after(datetime(2025, 1, 1, 2, 30)) == datetime(2025, 1, 2, 2, 30)
+    assert cron.next_after(datetime(2025, 1, 1, 2, 29, 59)) == datetime(2025, 1, 1, 2, 30)
+
+
+def test_next_after_rolls_over_month_and_year():
+    cron = CronSchedule("0 0 1 * *")
+    assert cron.next_after(datetime(2025, 12, 15)) == datetime(2026, 1, 1)
+
+
+def test_steps_ranges_and_lists():
+    cron = CronSchedule("*/15 9-10 * * *")
+    assert cron.next_after(datetime(2025, 3, 3, 9, 50)) == datetime(2025, 3, 3, 10, 0)
+    assert cron.next_after(datetime(2025, 3, 3, 10, 45)) == datetime(2025, 3, 4, 9, 0)
+    assert CronSchedule("0 6,18 * * *").next_after(datetime(2025, 3, 3, 7)) == datetime(2025, 3, 3, 18)
+
+
+def test_weekday_counts_from_sunday_and_seven_is_sunday():
+    # 2025-03-03 is a Monday
+    assert CronSchedule("0 3 * * 1").next_after(datetime(2025, 3, 3, 4)) == datetime(2025, 3, 10, 3)
+    assert CronSchedule("0 3 * * 0").next_after(datetime(2025, 3, 3)) == datetime(2025, 3, 9, 3)
+    assert CronSchedule("0 3 * * 7").next_after(datetime(2025, 3, 3)) == datetime(2025, 3, 9, 3)
+
+
+def test_restricted_day_and_weekday_match_either():
+    # The 15th or any Monday, whichever comes first
+    cron = CronSchedule("0 0 15 * 1")
+    assert cron.next_after(datetime(2025, 3, 11)) == datetime(2025, 3, 15)
+    assert cron.next_after(datetime(2025, 3, 15)) == datetime(2025, 3, 17)
+
+
+def test_leap_day():
+    assert CronSchedule("0 0 29 2 *").next_after(datetime(2025, 1, 1)) == datetime(2028, 2, 29)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "5-1 * * * *"])
+def test_malformed_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_impossible_date_never_matches():
+    with pytest.raises(ValueError, match="never matches"):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2025, 1, 1))
+
+
+def test_entry_targets():
+    assert ScheduleEntry("30 2 * * * ISTS").states == ["ISTS"]
+    assert ScheduleEntry("0 3 * * 1 Assam, Bihar").states == ["Assam", "Bihar"]
+    assert ScheduleEntry("0 4 * * 1 *").states is None
+    assert ScheduleEntry("0 4 * * 1").label == "all states"
+
+
+def test_parse_schedule_drops_bad_entries():
+    entries = parse_schedule("30 2 * * * ISTS; nonsense; 0 0 31 2 *; ; 0 3 * * 1 Assam",
+                             validate=lambda states: "unknown" if states == ["Nowhere"] else None)
+    assert [e.text for e in entries] == ["30 2 * * * ISTS", "0 3 * * 1 Assam"]
+    assert parse_schedule("0 3 * * * Nowhere", validate=lambda states: "unknown") == []
+
+
+def test_missed_slots_fire_once_and_due_entries_merge():
+    submitted = []
+    entries = [ScheduleEntry("0 * * * * Assam"), ScheduleEntry("0 * * * * Bihar")]
+    scheduler = Scheduler(entries, lambda mode, states, stages: submitted.append((mode, states)), jitter=0)
+    start = datetime(2025, 1, 1, 0, 30)
+    assert scheduler.due(start) == []
+    # Five hourly slots passed while asleep: one trigger, re-planned after now
+    later = start + timedelta(hours=5)
+    due = scheduler.due(later)
+    assert due == entries
+    assert all(e.next_at == datetime(2025, 1, 1, 6, 0) for e in entries)
+    scheduler.fire(due)
+    assert submitted == [(scheduler.mode, ["Assam", "Bihar"])]
+    assert scheduler.due(later) == []
+
+
+def test_all_states_entry_widens_merged_run():
+    submitted = []
+    entries = [ScheduleEntry("0 * * * * Assam"), ScheduleEntry("0 * * * *")]
+    Scheduler(entries, lambda mode, states, stages: submitted.append(states)).fire(entries)
+    assert submitted == [None]
+
+
+def test_start_skips_entries_that_never_fire():
+    scheduler = Scheduler([ScheduleEntry("0 0 31 2 *")], lambda *a: None).start()
+    assert scheduler.entries == []
+    assert scheduler._thread is None
@@ -0,0 +1,26 @@
+import sys
+
+from worker_pool import WorkerPool
+
+PROBE = """
+import extractor_trace
+extractor_trace._records.append({"label": "probe"})
+print("trace", extractor_trace.TRACE_ENABLED, len(extractor_trace._records))
+"""
+
+
+def test_each_job_reimports_project_modules_with_its_own_env(tmp_path):
+    script = tmp_path / "probe.py"
+    script.write_text(PROBE)
+    pool = WorkerPool(size=1, python_exe=sys.executable)
+    try:
+        runs = []
+        for env in ({"EXTRACTOR_TRACE": "True"}, {}, {"EXTRACTOR_TRACE": "True"}):
+            lines = []
+            assert pool.run(str(script), on_line=lines.append, env=env) == 0
+            runs.append([line for line in lines if line.startswith("trace")])
+        assert pool.spawned == 1
+    finally:
+        pool.close()
+
+    assert runs == [["trace True 1"], ["trace False 1"], ["trace True 1"]]
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+import workspace
+import workspace_gc
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    runs = tmp_path / "runs"
+    monkeypatch.setattr(workspace, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(workspace, "RUNS_DIR", str(runs))
+    monkeypatch.setattr(workspace, "CURRENT_POINTER", str(runs / "CURRENT"))
+    monkeypatch.setattr(workspace, "RUN_WORKSPACES", True)
+    monkeypatch.setattr(workspace_gc, "TRASH_DIR", str(tmp_path / ".trash"))
+    (tmp_path / "Download" / "Assam").mkdir(parents=True)
+    (tmp_path / "Download" / "Assam" / "order.pdf").write_bytes(b"%PDF")
+    (tmp_path / "Assam.xlsx").write_bytes(b"excel")
+    (tmp_path / "~$Assam.xlsx").write_bytes(b"lock file")
+    return tmp_path
+
+
+def test_readers_use_the_repository_until_a_run_is_promoted(repo):
+    assert workspace.current_run() is None
+    assert workspace.read_root() == str(repo)
+
+
+def test_create_seeds_the_run_from_the_current_snapshot(repo):
+    root = workspace.create(1)
+    assert root == workspace.run_dir(1)
+    pdf = os.path.join(root, "Download", "Assam", "order.pdf")
+    assert open(pdf, "rb").read() == b"%PDF"
+    assert os.path.isdir(os.path.join(root, "Extraction"))
+    assert workspace.excel_outputs(root) == ["Assam.xlsx"]
+
+
+def test_excel_is_copied_not_linked(repo):
+    root = workspace.create(1)
+    with open(os.path.join(root, "Assam.xlsx"), "wb") as f:
+        f.write(b"rewritten by run 1")
+    assert (repo / "Assam.xlsx").read_bytes() == b"excel"
+
+
+def test_promote_switches_readers_and_next_run_seeds_from_it(repo):
+    first = workspace.create(1)
+    with open(os.path.join(first, "Download", "Assam", "new.pdf"), "wb") as f:
+        f.write(b"%PDF new")
+    workspace.promote(1)
+    assert workspace.current_run() == "1"
+    assert workspace.read_root() == first
+    second = workspace.create(2)
+    assert os.path.exists(os.path.join(second, "Download", "Assam", "new.pdf"))
+
+
+def test_workspaces_off_always_reads_the_repository(repo, monkeypatch):
+    workspace.create(1)
+    workspace.promote(1)
+    monkeypatch.setattr(workspace, "RUN_WORKSPACES", False)
+    assert workspace.read_root() == str(repo)
+
+
+def test_discard_never_trashes_the_current_run(repo):
+    workspace.create(1)
+    workspace.promote(1)
+    workspace.create(2)
+    workspace.discard(1)
+    workspace.discard(2)
+    assert os.path.isdir(workspace.run_dir(1))
+    assert not os.path.exists(workspace.run_dir(2))
+
+
+def test_prune_keeps_current_and_newest(repo):
+    for run_id in range(1, 6):
+        workspace.create(run_id)
+    workspace.promote(2)
+    assert sorted(workspace.prune(keep=2), key=int) == ["1", "3"]
+    assert sorted(n for n in os.listdir(repo / "runs") if n.isdigit()) == ["2", "4", "5"]
@@ -0,0 +1,54 @@
+import os
+import time
+
+import pytest
+
+import workspace_gc
+
+
+@pytest.fixture
+def trash_dir(tmp_path, monkeypatch):
+    path = tmp_path / ".trash"
+    monkeypatch.setattr(workspace_gc, "TRASH_DIR", str(path))
+    return path
+
+
+def _folder(parent, name, files=("a.pdf",)):
+    folder = parent / name
+    folder.mkdir(parents=True)
+    for f in files:
+        (folder / f).write_text(f)
+    return folder
+
+
+def test_move_aside_leaves_an_empty_folder(tmp_path, trash_dir):
+    folder = _folder(tmp_path, "Download", ["a.pdf", "b.pdf"])
+    target = workspace_gc.move_aside(str(folder))
+    assert os.listdir(folder) == []
+    assert sorted(os.listdir(target)) == ["a.pdf", "b.pdf"]
+    assert os.path.dirname(target) == str(trash_dir)
+    assert os.path.basename(target).startswith("Download-")
+
+
+def test_move_aside_skips_missing_and_empty_folders(tmp_path, trash_dir):
+    (tmp_path / "Empty").mkdir()
+    assert workspace_gc.move_aside(str(tmp_path / "Empty")) is None
+    assert workspace_gc.move_aside(str(tmp_path / "Missing")) is None
+    assert not trash_dir.exists()
+
+
+def test_collect_garbage_applies_retention_and_item_cap(tmp_path, trash_dir):
+    trashed = [workspace_gc.trash(str(_folder(tmp_path, f"run{i}"))) for i in range(4)]
+    now = time.time()
+    for i, path in enumerate(trashed):
+        os.utime(path, (now - i * 60, now - i * 60))  # run0 newest
+    old = trashed[3]
+    os.utime(old, (now - 48 * 3600, now - 48 * 3600))
+
+    assert workspace_gc.collect_garbage(retention_hours=24, max_items=10) == 1
+    assert not os.path.exists(old)
+    assert workspace_gc.collect_garbage(retention_hours=24, max_items=2) == 1
+    assert [os.path.basename(p) for p, _ in workspace_gc.trash_entries()] == \
+        [os.path.basename(p) for p in trashed[:2]]
+    assert workspace_gc.collect_garbage(retention_hours=0, max_items=0) == 2
+    assert workspace_gc.trash_entries() == []
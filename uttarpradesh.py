@@ -9,18 +9,22 @@ try:
     DB_SUCCESS = True
 except ImportError:
     DB_SUCCESS = False
+import extractor_trace as trace
+from extractor_trace import traced, write_report
+from workspace import workspace_root
 from datetime import datetime
 
+@traced
 def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constraint=lambda x: True):
     if not jsonl_path or not os.path.exists(jsonl_path): return "NA"
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             try:
-                data = json.loads(line)
+                data = trace.table(json.loads(line))
                 h = data.get("table_heading", "").lower()
                 heading_match = all(k.lower() in h for k in table_keywords)
                 if heading_match:
-                    for row in data.get("rows", []):
+                    for row in trace.rows(data.get("rows", [])):
                         row_txt = str(row).lower()
                         if all(k.lower() in row_txt for k in row_keywords):
                             for v in list(row.values())[::-1]:
@@ -30,11 +34,13 @@ def find_value_in_jsonl(jsonl_path, table_keywords, row_keywords, value_constrai
                                     if clean:
                                         f_v = float(clean)
                                         if value_constraint(f_v):
+                                            trace.match(str(v).strip())
                                             return str(v).strip()
                                 except: pass
             except: pass
     return "NA"
 
+@traced
 def extract_transmission_charges_from_dir(input_dir):
     if not input_dir: return "NA"
     for jsonl_path in input_dir.glob("**/*.jsonl"):
@@ -48,6 +54,7 @@ def get_float_val(val_str):
     try: return float(clean)
     except: return None
 
+@traced
 def extract_ists_loss(json_path):
     try:
         if os.path.exists(json_path):
@@ -60,6 +67,7 @@ def extract_ists_loss(json_path):
         print(f"Error extracting ISTS loss: {e}")
     return "NA"
 
+@traced
 def extract_discom_names(input_dir):
     discom_names = set()
     table_keywords = ["discom", "distribution companies"] 
@@ -81,7 +89,7 @@ def extract_discom_names(input_dir):
             with open(jsonl_path, 'r', encoding='utf-8') as f:
                 for line in f:
                     try:
-                        data = json.loads(line)
+                        data = trace.table(json.loads(line))
                         heading = data.get("table_heading", data.get("heading", "")).lower()
                         
                         if any(k in heading for k in table_keywords):
@@ -100,7 +108,7 @@ def extract_discom_names(input_dir):
                             headers = data.get("headers", [])
                             discom_keys = [h for h in headers if h and "discom" in str(h).lower()]
                             if discom_keys:
-                                for row in data.get("rows", []):
+                                for row in trace.rows(data.get("rows", [])):
                                     for k in discom_keys:
                                         val = row.get(k)
                                         if val and isinstance(val, str):
@@ -114,8 +122,9 @@ def extract_discom_names(input_dir):
                     except: pass
     return sorted(list(discom_names))
 
+@traced
 def extract_discoms():
-    base_path = Path(__file__).resolve().parent
+    base_path = Path(workspace_root())
     
     # Dynamic Search for Extraction folder
     extraction_root = base_path / "Extraction"
@@ -235,7 +244,7 @@ def extract_discoms():
         for jf in input_dir.glob("**/*.jsonl"):
             with open(jf, "r", encoding="utf-8") as f:
                 for line in f:
-                    try: table = json.loads(line)
+                    try: table = trace.table(json.loads(line))
                     except: continue
                     heading = table.get("heading", table.get("table_heading", "")).upper()
                     rows = table.get("rows", [])
@@ -247,18 +256,18 @@ def extract_discoms():
 
                     # 1. Energy Balance / Sales
                     if "ENERGY BALANCE" in full_text:
-                        for row in rows:
+                        for row in trace.rows(rows):
                             txt = str(row).upper()
                             if "RETAIL SALES" in txt:
                                 for d in known:
                                     v = find_val(row, d); 
-                                    if v: retail_sales[d] = get_float_val(v)
+                                    if v: retail_sales[d] = get_float_val(v); trace.match(retail_sales[d], note="retail_sales")
                                 # Fallback if names are in Column
                                 if not retail_sales:
                                     for k, v in row.items():
                                         if any(d in k.upper() for d in known) and v:
                                             for d in known:
-                                                if d in k.upper(): retail_sales[d] = get_float_val(v)
+                                                if d in k.upper(): retail_sales[d] = get_float_val(v); trace.match(retail_sales[d], note="retail_sales")
                             if "INTRA-STATE TRANS" in txt and "LOSS" in txt:
                                 v = get_val_numeric(row)
                                 if v:
@@ -267,8 +276,8 @@ def extract_discoms():
                                     
                                     # Check if specific Discom row
                                     d_match = next((d for d in known if d in txt), None)
-                                    if d_match: insts_loss[d_match] = s_v
-                                    else: insts_loss['DEFAULT'] = s_v
+                                    if d_match: insts_loss[d_match] = s_v; trace.match(s_v, note="insts_loss")
+                                    else: insts_loss['DEFAULT'] = s_v; trace.match(s_v, note="insts_loss")
 
                     # 2. Transmission Charges (InSTS / STU)
                     if any(k in full_text for k in ["INTRA-STATE TRANSMISSION SYSTEM CHARGES", "STU CHARGES", "STU TRANSMISSION CHARGES", "TRANSMISSION CHARGES", "INTRA-STATE TRANSMISSION CHARGE"]):
@@ -279,24 +288,24 @@ def extract_discoms():
                             is_rate = any(u in full_text for u in ["RS./KWH", "RS. / KWH", "INR/KWH", "PAISE/KWH"])
                             is_cost = "RS. CRORE" in full_text or "RS. CR" in full_text
                             
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 d_match = next((d for d in known if d in txt), None)
                                 
                                 if is_rate:
                                     v = get_val_numeric(row, [f_curr, "approved"])
                                     if v:
-                                        if d_match: insts_direct[d_match] = v
-                                        else: insts_direct['DEFAULT'] = v
+                                        if d_match: insts_direct[d_match] = v; trace.match(v, note="insts_direct")
+                                        else: insts_direct['DEFAULT'] = v; trace.match(v, note="insts_direct")
                                 
                                 elif is_cost: # Fallback to calculation flow
                                     if d_match:
                                         v = get_val_numeric(row, ["approved", "net"])
-                                        if v: insts_cr[d_match] = get_float_val(v)
+                                        if v: insts_cr[d_match] = get_float_val(v); trace.match(insts_cr[d_match], note="insts_cr")
 
                     # 3. Transmission Loss Table (Override if found deeper)
                     if "TRANSMISSION LOSSES" in full_text:
-                        for row in rows:
+                        for row in trace.rows(rows):
                             txt = str(row).upper()
                             v = get_val_numeric(row)
                             if v:
@@ -304,15 +313,15 @@ def extract_discoms():
                                     s_v = str(v).strip()
                                     if "%" not in s_v: s_v += "%"
                                     d_match = next((d for d in known if d in txt), None)
-                                    if d_match: insts_loss[d_match] = s_v
-                                    else: insts_loss['DEFAULT'] = s_v
+                                    if d_match: insts_loss[d_match] = s_v; trace.match(s_v, note="insts_loss")
+                                    else: insts_loss['DEFAULT'] = s_v; trace.match(s_v, note="insts_loss")
 
                     # 5. Distribution Loss / Wheeling Loss
                     if any(k in full_text for k in ["WHEELING LOSS", "DISCOM LOSS", "DISTRIBUTION LOSS", "VOLTAGE WISE LOSS", "DIFFERENT VOLTAGE LEVELS"]):
                         # SKIP PETITIONER TABLES FOR ACCURACY
                         if "petitioner" in heading: pass 
                         else:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 
                                 # Priority: Explicit "Loss Levels" column
@@ -334,15 +343,15 @@ def extract_discoms():
                                     
                                     if ("132" in txt or "66" in txt or "ABOVE 33" in txt or "EHT" in txt) and "KV" in txt:
                                         if d_match: 
-                                            loss_132kv[d_match] = s_v; loss_66kv[d_match] = s_v
+                                            loss_132kv[d_match] = s_v; loss_66kv[d_match] = s_v; trace.match(s_v, note="loss_66kv")
                                         else: 
-                                            loss_132kv['DEFAULT'] = s_v; loss_66kv['DEFAULT'] = s_v
+                                            loss_132kv['DEFAULT'] = s_v; loss_66kv['DEFAULT'] = s_v; trace.match(s_v, note="loss_66kv")
                                     elif "33" in txt and "KV" in txt:
-                                        if d_match: loss_33kv[d_match] = s_v
-                                        else: loss_33kv['DEFAULT'] = s_v
+                                        if d_match: loss_33kv[d_match] = s_v; trace.match(s_v, note="loss_33kv")
+                                        else: loss_33kv['DEFAULT'] = s_v; trace.match(s_v, note="loss_33kv")
                                     elif "11" in txt and "KV" in txt and "BELOW" not in txt: # Exclude Below 11kV
-                                        if d_match: loss_11kv[d_match] = s_v
-                                        else: loss_11kv['DEFAULT'] = s_v
+                                        if d_match: loss_11kv[d_match] = s_v; trace.match(s_v, note="loss_11kv")
+                                        else: loss_11kv['DEFAULT'] = s_v; trace.match(s_v, note="loss_11kv")
 
                     # 5b. Approved Loss Table (Accurate Values Priority)
                     if "approved" in heading and ("loss" in heading or "distribution" in heading):
@@ -358,7 +367,7 @@ def extract_discoms():
                                  d_map[d] = headers[idx] 
                          
                          if d_map:
-                             for row in rows:
+                             for row in trace.rows(rows):
                                  v_key = next((k for k in row.keys() if any(x in str(k).upper() for x in ["VOLTAGE", "LEVEL", "SYSTEM"])), None)
                                  if v_key:
                                      v_txt = str(row[v_key]).upper()
@@ -383,7 +392,7 @@ def extract_discoms():
                     if any(k in full_text for k in ["WHEELING CHARGE", "WHEELING CHARGES", "DISCOM CHARGES", "DISTRIBUTION CHARGES", "VOLTAGE WISE CHARGES"]):
                          is_rate = any(u in full_text for u in ["RS./KWH", "RS. / KWH", "INR/KWH", "PAISE/KWH"])
                          if is_rate:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 # Dynamic Year Check
                                 v = get_val_numeric(row, [f_curr, "approved"])
@@ -392,20 +401,20 @@ def extract_discoms():
                                     d_match = next((d for d in known if d in txt), None)
                                     
                                     if "132" in txt or "66" in txt or "ABOVE 33" in txt or "EHT" in txt:
-                                        if d_match: charge_132kv[d_match] = v; charge_66kv[d_match] = v
-                                        else: charge_132kv['DEFAULT'] = v; charge_66kv['DEFAULT'] = v
+                                        if d_match: charge_132kv[d_match] = v; charge_66kv[d_match] = v; trace.match(v, note="charge_66kv")
+                                        else: charge_132kv['DEFAULT'] = v; charge_66kv['DEFAULT'] = v; trace.match(v, note="charge_66kv")
                                     elif "33" in txt:
-                                        if d_match: charge_33kv[d_match] = v
-                                        else: charge_33kv['DEFAULT'] = v
+                                        if d_match: charge_33kv[d_match] = v; trace.match(v, note="charge_33kv")
+                                        else: charge_33kv['DEFAULT'] = v; trace.match(v, note="charge_33kv")
                                     elif "11" in txt:
-                                        if d_match: charge_11kv[d_match] = v
-                                        else: charge_11kv['DEFAULT'] = v
+                                        if d_match: charge_11kv[d_match] = v; trace.match(v, note="charge_11kv")
+                                        else: charge_11kv['DEFAULT'] = v; trace.match(v, note="charge_11kv")
 
                     # 7. CSS - Only from TABLE 10-14
                     if "TABLE 10-14" in heading and any(k in full_text for k in ["CSS", "CROSS SUBSIDY"]):
                          is_rate = any(u in full_text for u in ["RS./KWH", "RS. /KWH", "RS /KWH", "INR/KWH", "PAISE/KWH", "/KWH"])
                          if is_rate:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 # Find the Approved column specifically
                                 v = None
@@ -427,13 +436,18 @@ def extract_discoms():
                                     if hv2:
                                         if ("SUPPLY AT 11" in category or "AT 11 KV" in category) and "ABOVE" not in category: 
                                             css_11kv[d_key] = v
+                                            trace.match(v, note="css_11kv")
                                         elif "ABOVE 11" in category and ("66" in category or "UP TO 66" in category):
                                             css_33kv[d_key] = v
+                                            trace.match(v, note="css_33kv")
                                             css_66kv[d_key] = v
+                                            trace.match(v, note="css_66kv")
                                         elif "ABOVE 66" in category and ("132" in category or "UP TO 132" in category):
                                             css_132kv[d_key] = v
+                                            trace.match(v, note="css_132kv")
                                         elif ("ABOVE 132 KV" in category or ("ABOVE 132" in category and "KV" in category)) and "66" not in category:
                                             css_220kv[d_key] = v
+                                            trace.match(v, note="css_220kv")
                                     else:
                                         # Standard fallback: only if not already set by HV-2
                                         target = None
@@ -450,7 +464,7 @@ def extract_discoms():
                     if any(k in full_text for k in ["AS CHARGES", "ADDITIONAL SURCHARGE"]):
                          is_rate = any(u in full_text for u in ["RS./KWH", "RS. /KWH", "RS /KWH", "INR/KWH", "PAISE/KWH", "/KWH"])
                          if is_rate:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 # Find the value with year validation
                                 v = None
@@ -465,10 +479,11 @@ def extract_discoms():
                                     d_match = next((d for d in known if d in txt), None)
                                     d_key = d_match if d_match else 'DEFAULT'
                                     additional_surcharge[d_key] = v
+                                    trace.match(v, note="additional_surcharge")
 
                     # 9. Fixed Charges
                     if any(k in full_text for k in ["FIXED CHARGES", "FIXED CHARGE", "DEMAND CHARGES", "DEMAND CHARGE", "RATE SCHEDULE", "TARIFF SCHEDULE", "URBAN SCHEDULE"]):
-                         for row in rows:
+                         for row in trace.rows(rows):
                              txt = str(row).upper()
                              # Only process if row mentions FIXED or DEMAND
                              if "FIXED" in txt or "DEMAND" in txt:
@@ -508,18 +523,23 @@ def extract_discoms():
                                      # Match voltage levels
                                      if "220 KV" in txt or "220KV" in txt:
                                          fixed_220kv[d_key] = v
+                                         trace.match(v, note="fixed_220kv")
                                      elif "132 KV" in txt or "132KV" in txt:
                                          fixed_132kv[d_key] = v
+                                         trace.match(v, note="fixed_132kv")
                                      elif "66 KV" in txt or "66KV" in txt:
                                          fixed_66kv[d_key] = v
+                                         trace.match(v, note="fixed_66kv")
                                      elif "33 KV" in txt or "33KV" in txt:
                                          fixed_33kv[d_key] = v
+                                         trace.match(v, note="fixed_33kv")
                                      elif "11 KV" in txt or "11KV" in txt:
                                          fixed_11kv[d_key] = v
+                                         trace.match(v, note="fixed_11kv")
 
                     # 10. Energy Charges
                     if any(k in full_text for k in ["ENERGY CHARGES", "ENERGY CHARGE", "VARIABLE CHARGES", "VARIABLE CHARGE", "URBAN SCHEDULE"]):
-                         for row in rows:
+                         for row in trace.rows(rows):
                              txt = str(row).upper()
                              # Only process if row mentions ENERGY or VARIABLE
                              if "ENERGY" in txt or "VARIABLE" in txt:
@@ -561,25 +581,30 @@ def extract_discoms():
                                      if "220 KV" in txt or "220KV" in txt:
                                          if is_hv_industrial or d_key not in energy_220kv:
                                              energy_220kv[d_key] = v
+                                             trace.match(v, note="energy_220kv")
                                      elif "132 KV" in txt or "132KV" in txt:
                                          if is_hv_industrial or d_key not in energy_132kv:
                                              energy_132kv[d_key] = v
+                                             trace.match(v, note="energy_132kv")
                                      elif "66 KV" in txt or "66KV" in txt:
                                          if is_hv_industrial or d_key not in energy_66kv:
                                              energy_66kv[d_key] = v
+                                             trace.match(v, note="energy_66kv")
                                      elif "33 KV" in txt or "33KV" in txt:
                                          if is_hv_industrial or d_key not in energy_33kv:
                                              energy_33kv[d_key] = v
+                                             trace.match(v, note="energy_33kv")
                                      elif "11 KV" in txt or "11KV" in txt:
                                          if is_hv_industrial or d_key not in energy_11kv:
                                              energy_11kv[d_key] = v
+                                             trace.match(v, note="energy_11kv")
 
                     # 11. Fuel Surcharge
                     fs_kws = ["FUEL ADJUSTMENT COST", "FUEL", "FPPPA", "FUEL SURCHARGE", "FPPCA", "ECA", "FPPAS"]
                     if any(k in full_text for k in fs_kws):
                          is_rate = any(u in full_text for u in ["RS./KWH", "RS. /KWH", "RS /KWH", "INR/KWH", "PAISE/KWH", "/KWH"])
                          if is_rate:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 # Extract value with year validation
                                 v = None
@@ -595,13 +620,14 @@ def extract_discoms():
                                     d_match = next((d for d in known if d in txt), None)
                                     d_key = d_match if d_match else 'DEFAULT'
                                     fuel_surcharge[d_key] = v
+                                    trace.match(v, note="fuel_surcharge")
 
                     # 12. Power Factor Adjustment Rebate
                     pf_kws = ["POWER FACTOR ADJUSTMENT REBATE", "POWER FACTOR ADJUSTMENT DISCOUNT", "POWER FACTOR ADJUSTMENT"]
                     if any(k in full_text for k in pf_kws):
                          is_rate = any(u in full_text for u in ["RS./KWH", "RS. /KWH", "RS /KWH", "INR/KWH", "PAISE/KWH", "/KWH"])
                          if is_rate:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 v = None
                                 for k, val in row.items():
@@ -615,13 +641,14 @@ def extract_discoms():
                                     d_match = next((d for d in known if d in txt), None)
                                     d_key = d_match if d_match else 'DEFAULT'
                                     pf_rebate[d_key] = v
+                                    trace.match(v, note="pf_rebate")
 
                     # 13. Load Factor Incentive
                     lf_kws = ["LOAD FACTOR INCENTIVE", "LOAD FACTOR DISCOUNT", "LOAD FACTOR"]
                     if any(k in full_text for k in lf_kws):
                          is_rate = any(u in full_text for u in ["RS./KWH", "RS. /KWH", "RS /KWH", "INR/KWH", "PAISE/KWH", "/KWH"])
                          if is_rate:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 v = None
                                 for k, val in row.items():
@@ -635,13 +662,14 @@ def extract_discoms():
                                     d_match = next((d for d in known if d in txt), None)
                                     d_key = d_match if d_match else 'DEFAULT'
                                     lf_incentive[d_key] = v
+                                    trace.match(v, note="lf_incentive")
 
                     # 14. Grid Support / Parallel Operation
                     gs_kws = ["GRID SUPPORT", "PARALLEL OPERATION"]
                     if any(k in full_text for k in gs_kws):
                          is_rate = any(u in full_text for u in ["RS./KWH", "RS. /KWH", "RS /KWH", "INR/KWH", "PAISE/KWH", "/KWH"])
                          if is_rate:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 v = None
                                 for k, val in row.items():
@@ -655,13 +683,14 @@ def extract_discoms():
                                     d_match = next((d for d in known if d in txt), None)
                                     d_key = d_match if d_match else 'DEFAULT'
                                     grid_support[d_key] = v
+                                    trace.match(v, note="grid_support")
 
                     # 15. HT, EHV Rebates
                     ehv_kws = ["HT REBATE", "EHV REBATE", "HT DISCOUNT", "EHV DISCOUNT"]
                     if any(k in full_text for k in ehv_kws):
                          is_rate = any(u in full_text for u in ["RS./KWH", "RS. /KWH", "RS /KWH", "INR/KWH", "PAISE/KWH", "/KWH"])
                          if is_rate:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 v = None
                                 for k, val in row.items():
@@ -676,15 +705,17 @@ def extract_discoms():
                                     d_key = d_match if d_match else 'DEFAULT'
                                     if any(x in txt for x in ["132", "220"]):
                                         ehv_rebate_132_above[d_key] = v
+                                        trace.match(v, note="ehv_rebate_132_above")
                                     elif any(x in txt for x in ["33", "66"]):
                                         ehv_rebate_33_66[d_key] = v
+                                        trace.match(v, note="ehv_rebate_33_66")
 
                     # 16. Bulk Consumption Rebate
                     bulk_kws = ["BULK CONSUMPTION REBATE", "BULK CONSUMPTION DISCOUNT", "BULK CONSUMPTION"]
                     if any(k in full_text for k in bulk_kws):
                          is_rate = any(u in full_text for u in ["RS./KWH", "RS. /KWH", "RS /KWH", "INR/KWH", "PAISE/KWH", "/KWH"])
                          if is_rate:
-                            for row in rows:
+                            for row in trace.rows(rows):
                                 txt = str(row).upper()
                                 v = None
                                 for k, val in row.items():
@@ -698,6 +729,7 @@ def extract_discoms():
                                     d_match = next((d for d in known if d in txt), None)
                                     d_key = d_match if d_match else 'DEFAULT'
                                     bulk_rebate[d_key] = v
+                                    trace.match(v, note="bulk_rebate")
 
     insts_final, insts_final = {}, {}
     
@@ -859,4 +891,8 @@ def extract_discoms():
         print(f"Update Success: {excel_path}")
     except Exception as e: print(f"Update Error: {e}")
 
-if __name__ == "__main__": extract_discoms()
+if __name__ == "__main__":
+    try:
+        extract_discoms()
+    finally:
+        write_report("Uttar Pradesh")
@@ -0,0 +1,323 @@
+import importlib
+import json
+import os
+import queue
+import runpy
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import uuid
+
+from job_queue import process_group_kwargs
+
+# ---------- CONFIGURATION ----------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+POOL_ENABLED = os.getenv("AGENT_WORKER_POOL", "False").lower() == "true"
+POOL_SIZE = int(os.getenv("AGENT_WORKER_POOL_SIZE", os.getenv("AGENT_MAX_PARALLEL", 4)))
+# Workers are replaced after this many scripts so leaked module state cannot pile up
+MAX_JOBS_PER_WORKER = int(os.getenv("AGENT_WORKER_MAX_JOBS", 20))
+
+# Imported once per worker; missing optional packages are skipped. The repo's own
+# modules among them are re-imported by every script (see _drop_project_modules),
+# so only their third-party imports stay warm.
+PRELOAD_MODULES = [
+    "openpyxl", "pdfplumber", "pandas", "numpy", "requests", "dotenv",
+    "selenium.webdriver", "webdriver_manager.chrome", "chromedriver_cache", "http_listing",
+    "extraction_cache", "extractor_trace", "candidate_selector",
+    "database.database_utils", "database.table_index",
+]
+
+READY_MARKER = "__WORKER_READY__"
+DONE_MARKER = "__WORKER_DONE__"
+
+
+def default_python():
+    """The virtual environment's python if it exists, otherwise "python" (same rule as app.run_script)"""
+    python_exe = os.path.join(BASE_DIR, ".venv", "Scripts", "python.exe")
+    return python_exe if os.path.exists(python_exe) else "python"
+
+
+def preload(modules=PRELOAD_MODULES):
+    loaded = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            pass
+    return loaded
+
+
+# ---------- WORKER SIDE ----------
+def _is_project_module(module):
+    path = getattr(module, "__file__", None)
+    if not path:
+        return False
+    try:
+        relative = os.path.relpath(os.path.abspath(path), BASE_DIR)
+    except ValueError:  # another drive on Windows
+        return False
+    return not relative.startswith(os.pardir) and not relative.startswith(".venv")
+
+
+def _drop_project_modules():
+    """
+    Forgets the repo's modules so the next import runs them again. They read
+    their settings from os.environ at import time (SCRAPER_BUILD_INDEX,
+    EXTRACTOR_TRACE, ...) and keep module state such as the trace records,
+    neither of which may carry over from one script to the next.
+    """
+    for name, module in list(sys.modules.items()):
+        if name != "__main__" and _is_project_module(module):
+            del sys.modules[name]
+
+
+def run_job(script, args=(), env=None):
+    """Runs script as __main__ in this process with env added to os.environ, returns its exit code"""
+    path = script if os.path.isabs(script) else os.path.join(BASE_DIR, script)
+    old_argv, old_path = sys.argv, list(sys.path)
+    old_env = {k: os.environ.get(k) for k in env or {}}
+    os.environ.update(env or {})
+    sys.argv = [path, *args]
+    sys.path.insert(0, os.path.dirname(path))
+    _drop_project_modules()
+    try:
+        runpy.run_path(path, run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.argv, sys.path[:] = old_argv, old_path
+        for key, value in old_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        _drop_project_modules()
+        sys.stdout.flush()
+
+
+def serve():
+    """Worker loop: preload, then run one JSON job per stdin line"""
+    token = os.environ.get("WORKER_TOKEN", "")
+    sys.path.insert(0, BASE_DIR)
+    start = time.perf_counter()
+    loaded = preload()
+    print(f"{READY_MARKER} {token} {time.perf_counter() - start:.3f} {','.join(loaded)}", flush=True)
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        code = run_job(job["script"], job.get("args", []), job.get("env"))
+        # Leading newline in case the script's last print had no line end
+        sys.stdout.write(f"\n{DONE_MARKER} {token} {code}\n")
+        sys.stdout.flush()
+
+
+# ---------- PARENT SIDE ----------
+class Worker:
+    def __init__(self, python_exe=None, env=None):
+        self.token = uuid.uuid4().hex
+        env = dict(env or os.environ)
+        env["WORKER_TOKEN"] = self.token
+        env.setdefault("PYTHONIOENCODING", "utf-8")
+        self.process = subprocess.Popen(
+            [python_exe or default_python(), "-u", os.path.abspath(__file__), "--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            encoding="utf-8",
+            errors="replace",
+            env=env,
+            **process_group_kwargs()
+        )
+        self.jobs = 0
+        self.preload_seconds = None
+        for line in self.process.stdout:
+            if line.startswith(f"{READY_MARKER} {self.token}"):
+                self.preload_seconds = float(line.split()[2])
+                break
+        else:
+            raise RuntimeError("Worker exited before it was ready")
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def run(self, script, args=(), on_line=print, env=None):
+        """Runs one script, passes every output line to on_line; returns the exit code or None if the worker died"""
+        self.jobs += 1
+        try:
+            self.process.stdin.write(json.dumps({"script": script, "args": list(args), "env": env or {}}) + "\n")
+            self.process.stdin.flush()
+        except OSError:
+            return None
+        done = f"{DONE_MARKER} {self.token} "
+        held_blank = False
+        for line in self.process.stdout:
+            line = line.rstrip("\r\n")
+            if line.startswith(done):
+                return int(line[len(done):])
+            # The newline printed before the marker must not show up as a log line
+            if held_blank:
+                on_line("")
+            held_blank = line == ""
+            if not held_blank:
+                on_line(line)
+        return None
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+
+
+class WorkerPool:
+    """Long-lived python processes with the heavy modules imported, each running one script at a time"""
+
+    def __init__(self, size=POOL_SIZE, python_exe=None, env=None, max_jobs=MAX_JOBS_PER_WORKER):
+        self.size = max(1, size)
+        self.python_exe = python_exe
+        self.env = env
+        self.max_jobs = max_jobs
+        self.idle = queue.LifoQueue()
+        self.spawned = 0
+        self.lock = threading.Lock()
+
+    def _spawn(self):
+        return Worker(self.python_exe, self.env)
+
+    def warm(self):
+        """Starts every worker now (in parallel) instead of on first use"""
+        with self.lock:
+            missing = self.size - self.spawned
+            self.spawned += missing
+        workers = []
+        threads = [threading.Thread(target=lambda: workers.append(self._spawn())) for _ in range(missing)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        for w in workers:
+            self.idle.put(w)
+        with self.lock:
+            self.spawned -= missing - len(workers)
+
+    def _acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            can_spawn = self.spawned < self.size
+            if can_spawn:
+                self.spawned += 1
+        if can_spawn:
+            try:
+                return self._spawn()
+            except Exception:
+                with self.lock:
+                    self.spawned -= 1
+                raise
+        return self.idle.get()
+
+    def _release(self, worker, healthy):
+        if healthy and worker.alive() and worker.jobs < self.max_jobs:
+            self.idle.put(worker)
+            return
+        worker.close()
+        with self.lock:
+            self.spawned -= 1
+
+    def run(self, script, args=(), on_line=print, on_process=None, env=None):
+        """
+        Runs script on an idle worker; returns its exit code (-1 if the worker
+        process died, e.g. because it was killed on timeout or cancel).
+        on_process(popen) receives the worker process before the script starts;
+        env holds extra environment variables for this script only.
+        """
+        worker = self._acquire()
+        if on_process: on_process(worker.process)
+        code = None
+        try:
+            code = worker.run(script, args, on_line, env)
+        finally:
+            self._release(worker, code is not None)
+        return -1 if code is None else code
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self.lock:
+            self.spawned = 0
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+        return _pool
+
+
+def benchmark(steps=14):
+    """Cold `python -u script.py` start vs. a warm worker for a script importing the usual modules"""
+    import tempfile
+    probe = tempfile.NamedTemporaryFile("w", suffix=".py", delete=False)
+    probe.write("".join(f"try:\n    import {m}\nexcept Exception:\n    pass\n" for m in PRELOAD_MODULES))
+    probe.write("print('probe done')\n")
+    probe.close()
+    env = dict(os.environ, PYTHONPATH=BASE_DIR)
+    try:
+        cold = []
+        for _ in range(steps):
+            start = time.perf_counter()
+            subprocess.run([default_python(), "-u", probe.name], env=env, stdout=subprocess.DEVNULL, check=True)
+            cold.append(time.perf_counter() - start)
+
+        pool = WorkerPool(size=1, env=env, max_jobs=steps + 1)
+        start = time.perf_counter()
+        pool.warm()
+        warm_up = time.perf_counter() - start
+        warm = []
+        for _ in range(steps):
+            start = time.perf_counter()
+            pool.run(probe.name, on_line=lambda line: None)
+            warm.append(time.perf_counter() - start)
+        pool.close()
+    finally:
+        os.unlink(probe.name)
+
+    cold_ms = sum(cold) / len(cold) * 1000
+    warm_ms = sum(warm) / len(warm) * 1000
+    print(f"Preloaded modules: {', '.join(preload())}")
+    print(f"Cold start per step : {cold_ms:8.1f} ms")
+    print(f"Warm worker per step: {warm_ms:8.1f} ms (one-off pool start {warm_up * 1000:.1f} ms)")
+    print(f"Saved per run of {steps} steps: {(cold_ms - warm_ms) * steps / 1000:.2f} s")
+
+
+if __name__ == "__main__":
+    if "--serve" in sys.argv:
+        serve()
+    elif "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        print("Usage: python worker_pool.py --benchmark")
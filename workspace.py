@@ -0,0 +1,122 @@
+import os
+import shutil
+import sys
+
+# ---------- CONFIGURATION ----------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNS_DIR = os.path.join(BASE_DIR, "runs")
+CURRENT_POINTER = os.path.join(RUNS_DIR, "CURRENT")
+# Opt-in: each agent run works in runs/<run_id>/ and is promoted to runs/CURRENT when it succeeds
+RUN_WORKSPACES = os.getenv("AGENT_RUN_WORKSPACES", "False").lower() == "true"
+# Promoted runs kept besides the current one; older ones go to the trash (workspace_gc.py)
+KEEP_RUNS = int(os.getenv("AGENT_KEEP_RUNS", 2))
+# Set by the app for the scripts of a run; unset means the repository folder, as before
+WORKSPACE_ENV = "PIPELINE_WORKSPACE"
+
+# What a run workspace holds; everything else (code, caches, the database) stays shared
+WORKSPACE_FOLDERS = ["Download", "Extraction", "ists_pdf", "ists_charge_pdf", "ists_extracted"]
+# Files that are replaced rather than rewritten in place can be hard-linked into the next run
+LINKABLE_SUFFIXES = (".pdf", ".jsonl")
+
+
+def workspace_root():
+    """Folder a pipeline script reads and writes its data in (Download/, Extraction/, *.xlsx)"""
+    return os.environ.get(WORKSPACE_ENV) or BASE_DIR
+
+
+def run_dir(run_id):
+    return os.path.join(RUNS_DIR, str(run_id))
+
+
+def current_run():
+    """Id of the promoted run, or None"""
+    try:
+        with open(CURRENT_POINTER, 'r', encoding='utf-8') as f:
+            run_id = f.read().strip()
+    except OSError:
+        return None
+    return run_id if run_id and os.path.isdir(run_dir(run_id)) else None
+
+
+def read_root():
+    """
+    Folder readers (dashboard, /get-state-data) should use: the last promoted
+    run, so they never see a run that is still writing, or the repository
+    folder when run workspaces are off or nothing was promoted yet.
+    """
+    if RUN_WORKSPACES:
+        run_id = current_run()
+        if run_id:
+            return run_dir(run_id)
+    return BASE_DIR
+
+
+def _link_or_copy(src, dst):
+    if src.lower().endswith(LINKABLE_SUFFIXES):
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
+def excel_outputs(root):
+    return [name for name in os.listdir(root) if name.lower().endswith(".xlsx") and not name.startswith("~$")]
+
+
+def create(run_id):
+    """
+    Makes runs/<run_id>/ and seeds it with the current snapshot, so steps the
+    run skips (other states, unselected stages) still find their inputs.
+    PDFs and JSONL are hard-linked (scripts delete and recreate them); Excel
+    and JSON files, which are edited in place, are copied with their mtimes.
+    """
+    target = run_dir(run_id)
+    source = read_root()
+    os.makedirs(target, exist_ok=True)
+    for folder in WORKSPACE_FOLDERS:
+        src = os.path.join(source, folder)
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(target, folder), copy_function=_link_or_copy, dirs_exist_ok=True)
+        else:
+            os.makedirs(os.path.join(target, folder), exist_ok=True)
+    for name in excel_outputs(source):
+        shutil.copy2(os.path.join(source, name), os.path.join(target, name))
+    return target
+
+
+def promote(run_id):
+    """Points runs/CURRENT at the run; the pointer is swapped with a single atomic rename"""
+    tmp = f"{CURRENT_POINTER}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(str(run_id))
+    os.replace(tmp, CURRENT_POINTER)
+
+
+def discard(run_id):
+    """Moves a run that will not be promoted to the trash"""
+    from workspace_gc import trash
+    if str(run_id) != current_run():
+        trash(run_dir(run_id))
+
+
+def prune(keep=KEEP_RUNS):
+    """Moves all but the current run and the newest keep other runs to the trash"""
+    from workspace_gc import trash
+    if not os.path.isdir(RUNS_DIR):
+        return []
+    current = current_run()
+    runs = sorted((n for n in os.listdir(RUNS_DIR) if n.isdigit() and n != current), key=int, reverse=True)
+    removed = runs[keep:]
+    for name in removed:
+        trash(run_dir(name))
+    return removed
+
+
+if __name__ == "__main__":
+    print(f"Run workspaces: {'on' if RUN_WORKSPACES else 'off'} (AGENT_RUN_WORKSPACES)")
+    print(f"Current run   : {current_run() or '-'}")
+    print(f"Readers use   : {read_root()}")
+    if "--prune" in sys.argv:
+        print(f"Trashed runs  : {', '.join(prune()) or '-'}")
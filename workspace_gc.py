@@ -0,0 +1,140 @@
+import os
+import shutil
+import stat
+import sys
+import threading
+import time
+import uuid
+
+# ---------- CONFIGURATION ----------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRASH_DIR = os.path.join(BASE_DIR, ".trash")
+# Off by default: the pipeline clears Download/ and Extraction/ itself when a run needs it
+STARTUP_CLEANUP = os.getenv("STARTUP_CLEANUP", "False").lower() == "true"
+STARTUP_CLEANUP_FOLDERS = ["Extraction", "Download", "ists_pdf", "ists_charge_pdf", "ists_extracted"]
+# Trashed folders are deleted once they are older than this, or beyond the newest TRASH_MAX_ITEMS
+TRASH_RETENTION_HOURS = float(os.getenv("TRASH_RETENTION_HOURS", 24))
+TRASH_MAX_ITEMS = int(os.getenv("TRASH_MAX_ITEMS", 10))
+
+_gc_lock = threading.Lock()
+
+
+def remove_readonly(func, path, _):
+    """Clear read-only bit and retry."""
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+def delete_folder_contents(folder_path):
+    if os.path.exists(folder_path):
+        for filename in os.listdir(folder_path):
+            file_path = os.path.join(folder_path, filename)
+            try:
+                if os.path.isfile(file_path) or os.path.islink(file_path):
+                    os.chmod(file_path, stat.S_IWRITE)
+                    os.unlink(file_path)
+                elif os.path.isdir(file_path):
+                    shutil.rmtree(file_path, onerror=remove_readonly)
+            except Exception as e:
+                print(f"Failed to delete {file_path}. Reason: {e}")
+
+
+def trash(path):
+    """
+    Renames path into .trash/ (a single rename on the same disk). Raises
+    OSError when the rename is refused, e.g. by a Windows file lock.
+    """
+    os.makedirs(TRASH_DIR, exist_ok=True)
+    name = f"{os.path.basename(path)}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    target = os.path.join(TRASH_DIR, name)
+    os.replace(path, target)
+    os.utime(target)  # retention counts from when it was trashed
+    return target
+
+
+def move_aside(folder_path):
+    """
+    Empties folder_path in constant time: the folder is moved to the trash
+    and an empty one is created in its place. Falls back to deleting the
+    contents when the rename is refused. Returns the trash path, or None.
+    """
+    if not os.path.isdir(folder_path) or not os.listdir(folder_path):
+        return None
+    try:
+        target = trash(folder_path)
+    except OSError as e:
+        print(f"Could not move {folder_path} aside ({e}), deleting its contents instead")
+        delete_folder_contents(folder_path)
+        return None
+    os.makedirs(folder_path, exist_ok=True)
+    return target
+
+
+def trash_entries():
+    """[(path, mtime)] of trashed folders, newest first"""
+    if not os.path.isdir(TRASH_DIR):
+        return []
+    entries = []
+    for name in os.listdir(TRASH_DIR):
+        path = os.path.join(TRASH_DIR, name)
+        try:
+            entries.append((path, os.path.getmtime(path)))
+        except OSError:
+            pass
+    return sorted(entries, key=lambda e: e[1], reverse=True)
+
+
+def collect_garbage(retention_hours=TRASH_RETENTION_HOURS, max_items=TRASH_MAX_ITEMS):
+    """Deletes trashed folders past the retention policy; returns how many were removed"""
+    if not _gc_lock.acquire(blocking=False):
+        return 0  # another collection is already running
+    try:
+        cutoff = time.time() - retention_hours * 3600
+        removed = 0
+        for i, (path, mtime) in enumerate(trash_entries()):
+            if i < max_items and mtime >= cutoff:
+                continue
+            try:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path, onerror=remove_readonly)
+                else:
+                    os.unlink(path)
+                removed += 1
+            except Exception as e:
+                print(f"Failed to delete {path}. Reason: {e}")
+        return removed
+    finally:
+        _gc_lock.release()
+
+
+def collect_garbage_async():
+    thread = threading.Thread(target=collect_garbage, daemon=True)
+    thread.start()
+    return thread
+
+
+def start_background_cleanup(base_dir=BASE_DIR, folders=STARTUP_CLEANUP_FOLDERS, clear=STARTUP_CLEANUP):
+    """
+    Startup housekeeping off the request path: optionally moves the previous
+    run's folders aside (STARTUP_CLEANUP=True), then collects old trash.
+    """
+    def work():
+        if clear:
+            for folder in folders:
+                move_aside(os.path.join(base_dir, folder))
+        collect_garbage()
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    if "--gc" in sys.argv:
+        print(f"Removed {collect_garbage()} trashed folder(s)")
+    elif "--purge" in sys.argv:
+        print(f"Removed {collect_garbage(retention_hours=0, max_items=0)} trashed folder(s)")
+    else:
+        for path, mtime in trash_entries():
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(mtime))}  {os.path.basename(path)}")
+        print("Usage: python workspace_gc.py [--gc | --purge]")
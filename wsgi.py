@@ -0,0 +1,13 @@
+import os
+
+from dotenv import load_dotenv
+
+# Entry point for a multi-process WSGI server, e.g.
+#   gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 wsgi:app      (Linux)
+#   waitress-serve --threads 32 --listen 0.0.0.0:5000 wsgi:app         (Windows)
+# together with one `python pipeline_worker.py`. Web processes share the agent
+# state through the runtime store, so they default to AGENT_RUNTIME=shared.
+load_dotenv()
+os.environ.setdefault("AGENT_RUNTIME", "shared")
+
+from app import app  # noqa: E402